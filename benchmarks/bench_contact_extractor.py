@@ -0,0 +1,105 @@
+# benchmarks/bench_contact_extractor.py
+# Single-pass ContactExtractor vs the original two-regex _contacts on
+# multi-megabyte comment text, plus adversarial inputs.
+#   python -m benchmarks.bench_contact_extractor [--mb 4]
+
+import argparse
+import json
+import random
+import re
+import time
+from typing import Dict, List, Optional
+
+from common.contact_extractor import ContactExtractor
+
+
+def legacy_contacts(text: Optional[str]) -> Dict[str, List[str]]:
+    """_contacts from reddit_scraper_meta before the shared extractor (baseline)."""
+    if not text:
+        return {"emails": [], "phones": []}
+    emails = list({m.group(0) for m in re.finditer(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)})
+    phones = list({m.group(0) for m in re.finditer(r"\+?\d[\d\s().\-]{8,}\d", text)})
+    return {"emails": emails, "phones": phones}
+
+
+_WORDS = ("the", "post", "thanks", "reply", "anyone", "know", "price", "deal", "contact", "shipping", "edit")
+
+
+def comment_text(mb: float, seed: int = 11) -> str:
+    """Reddit-comment-like text with a sprinkling of real contacts, dates and timestamps."""
+    rnd = random.Random(seed)
+    target = int(mb * 1024 * 1024)
+    parts, size = [], 0
+    while size < target:
+        roll = rnd.random()
+        if roll < 0.002:
+            s = f"mail me at user{rnd.randrange(10**4)}@example.com"
+        elif roll < 0.004:
+            s = f"call +1 (415) 555-{rnd.randrange(10**4):04d}"
+        elif roll < 0.010:
+            s = f"edited 2024-0{rnd.randrange(1, 9)}-1{rnd.randrange(9)} 12:3{rnd.randrange(9)} ts 17{rnd.randrange(10**8):08d}"
+        else:
+            s = " ".join(rnd.choice(_WORDS) for _ in range(12))
+        parts.append(s)
+        size += len(s) + 1
+    return "\n".join(parts)
+
+
+ADVERSARIAL = {
+    "digit_space_run": lambda n: "1 " * (n // 2),
+    "paren_digit_run": lambda n: "(1) " * (n // 4),
+    "long_digits": lambda n: "9" * n,
+    "at_run": lambda n: "a@" * (n // 2),
+    "dotted_domain": lambda n: "x@" + "a." * (n // 2),
+}
+
+
+def _timed(fn, text):
+    started = time.perf_counter()
+    out = fn(text)
+    return time.perf_counter() - started, out
+
+
+def run(mb: float = 4.0, adversarial_kb: int = 1024) -> Dict:
+    extractor = ContactExtractor()
+    text = comment_text(mb)
+    legacy_s, legacy_out = _timed(legacy_contacts, text)
+    new_s, new_out = _timed(extractor.extract, text)
+
+    # the legacy patterns are quadratic on some of these, so they only get the
+    # small sizes; growth = t(16 KB) / t(4 KB): ~4 is linear, ~16 quadratic
+    adversarial = {}
+    for name, make in ADVERSARIAL.items():
+        small, large = make(4 * 1024), make(16 * 1024)
+        legacy_small, legacy_large = _timed(legacy_contacts, small)[0], _timed(legacy_contacts, large)[0]
+        new_small, new_large = _timed(extractor.extract, small)[0], _timed(extractor.extract, large)[0]
+        adversarial[name] = {
+            "legacy_16kb_s": round(legacy_large, 4),
+            "legacy_growth": round(legacy_large / max(legacy_small, 1e-9), 1),
+            "new_16kb_s": round(new_large, 4),
+            "new_growth": round(new_large / max(new_small, 1e-9), 1),
+            f"new_{adversarial_kb}kb_s": round(_timed(extractor.extract, make(adversarial_kb * 1024))[0], 4),
+        }
+
+    return {
+        "benchmark": "contact_extractor",
+        "text_mb": round(len(text) / 1024 / 1024, 2),
+        "legacy_s": round(legacy_s, 3),
+        "new_s": round(new_s, 3),
+        "legacy_mb_per_s": round(mb / legacy_s, 1),
+        "new_mb_per_s": round(mb / new_s, 1),
+        "legacy_phones": len(legacy_out["phones"]),
+        "new_phones": len(new_out["phones"]),
+        "new_emails": len(new_out["emails"]),
+        "new_urls": len(new_out["urls"]),
+        "adversarial": adversarial,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mb", type=float, default=4.0)
+    parser.add_argument("--adversarial-kb", type=int, default=1024,
+                        help="input size for the new extractor's adversarial run")
+    args = parser.parse_args()
+    print(json.dumps(run(args.mb, args.adversarial_kb)))
@@ -0,0 +1,110 @@
+# benchmarks/bench_html_parser.py
+# _parse_visible on each installed HTML backend (selectolax / lxml / bs4),
+# plus how long the event loop stalls when parsing inline vs off-loop.
+#   python -m benchmarks.bench_html_parser [--comments 2000] [--pages 20]
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from common.html_parser import available_backends
+from scraper_types.reddit_scraper_visible_text import _parse_off_loop, _parse_visible
+
+_WORDS = ("the", "post", "thanks", "reply", "anyone", "know", "price", "deal", "contact", "shipping", "edit")
+
+
+def thread_page(comments: int, seed: int = 5) -> str:
+    """A reddit-like post page with `comments` nested comment blocks."""
+    rnd = random.Random(seed)
+    body = []
+    for i in range(comments):
+        text = " ".join(rnd.choice(_WORDS) for _ in range(30))
+        if i % 97 == 0:
+            text += f" mail user{i}@example.com or https://shop{i}.example.com/item"
+        body.append(
+            f'<div class="comment" style="margin-left:{(i % 6) * 16}px">'
+            f'<a data-click-id="user" href="/user/u{i}">u{i}</a><p>{text}</p></div>'
+        )
+    return (
+        "<html><head><title>t</title><script>var x = 1;</script><style>p{}</style></head><body>"
+        "<a data-testid='subreddit-name' href='/r/test'>r/test</a>"
+        "<a data-testid='post_author_link' href='/user/op'>op</a>"
+        "<h1 data-test-id='post-title'>Selling a bike, DM or call +1 415 555 0100</h1>"
+        "<div data-test-id='post-content'><p>Details in the comments.</p><p>Cash only.</p></div>"
+        "<div class='_1rZYMD_4xY3gRcSS3p8ODO'>1.2k</div>"
+        "<span class='FHCV02u6Cp2zYL0fhQPsO'>345 comments</span>"
+        + "".join(body)
+        + "</body></html>"
+    )
+
+
+async def _loop_stall(parse_mode: str, html: str, pages: int, backend: str,
+                      executor: Optional[ProcessPoolExecutor]) -> float:
+    """Worst gap (ms) seen by a 1ms ticker while `pages` pages are parsed."""
+    worst = 0.0
+    stop = False
+
+    async def _ticker():
+        nonlocal worst
+        last = time.perf_counter()
+        while not stop:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            worst = max(worst, (now - last) * 1000)
+            last = now
+
+    ticker = asyncio.create_task(_ticker())
+    await asyncio.sleep(0.01)
+    for i in range(pages):
+        if parse_mode == "inline":
+            _parse_visible(f"https://www.reddit.com/r/t/comments/{i}/", html, backend)
+            await asyncio.sleep(0)
+        else:
+            await _parse_off_loop(f"https://www.reddit.com/r/t/comments/{i}/", html, backend, executor)
+    stop = True
+    await ticker
+    return round(worst, 1)
+
+
+def run(comments: int = 2000, pages: int = 20) -> Dict:
+    html = thread_page(comments)
+    backends = {}
+    for name in available_backends():
+        _parse_visible("warmup", html, name)
+        started = time.perf_counter()
+        for i in range(pages):
+            rec = _parse_visible(f"p{i}", html, name)
+        elapsed = time.perf_counter() - started
+        backends[name] = {
+            "ms_per_page": round(elapsed * 1000 / pages, 2),
+            "pages_per_s": round(pages / elapsed, 1),
+            "emails": len(rec["emails"]),
+            "external_links": len(rec["external_links"]),
+        }
+
+    fastest = min(backends, key=lambda n: backends[n]["ms_per_page"])
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        stall = {
+            mode: asyncio.run(_loop_stall(mode, html, pages, fastest, pool if mode == "process" else None))
+            for mode in ("inline", "thread", "process")
+        }
+    return {
+        "benchmark": "html_parser",
+        "page_kb": round(len(html) / 1024, 1),
+        "pages": pages,
+        "backends": backends,
+        "fastest": fastest,
+        "max_loop_stall_ms": stall,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--pages", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.comments, args.pages), indent=2))
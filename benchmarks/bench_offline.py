@@ -0,0 +1,291 @@
+# benchmarks/bench_offline.py
+# Offline end-to-end benchmark: fixtures served by a local stand-in server,
+# add_leads against an in-memory DB. No live Reddit, no Mongo.
+#   python -m benchmarks.bench_offline [--posts 200] [--fixtures DIR] [--out run.json]
+#   python -m benchmarks.bench_offline --baseline last_release.json   # exit 1 on regression
+#
+# Per stage: wall time, throughput, p50/p95 per-URL latency, peak RSS and
+# bytes transferred, as one JSON document. Each stage runs in its own
+# subprocess (--stage NAME), so ru_maxrss is that stage's high-water mark and
+# not whatever an earlier stage left behind; rss_delta_mb is the growth over
+# the process baseline (imports + fixtures) taken right before the stage.
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.fixtures import Fixture, get_fixtures
+from benchmarks.memory_db import MemoryDB
+from benchmarks.standin_server import ServerProfile, StandinServer
+from common.db_utils import add_leads
+from common.rate_limiter import HostScheduler, set_scheduler
+from scraper_types.reddit_scraper_json import _map_post, _post_data
+from scraper_types.reddit_scraper_visible_text import _parse_visible, scrape_reddit_visible_text_seq
+from scrapers.reddit_scraper import _merge_records, _to_schema, main
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return round(ordered[idx], 2)
+
+
+def _rss_peak_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KiB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+_RSS_START_MB = 0.0
+
+
+def _mark_rss_start() -> None:
+    global _RSS_START_MB
+    _RSS_START_MB = _rss_peak_mb()
+
+
+def _stage(name: str, items: int, wall_s: float, latencies_ms: List[float],
+           server: Optional[StandinServer] = None, **extra) -> Dict[str, Any]:
+    row = {
+        "stage": name,
+        "items": items,
+        "wall_s": round(wall_s, 3),
+        "items_per_s": round(items / wall_s, 1) if wall_s > 0 else None,
+        "p50_ms": _percentile(latencies_ms, 0.50),
+        "p95_ms": _percentile(latencies_ms, 0.95),
+        "rss_peak_mb": _rss_peak_mb(),
+    }
+    row["rss_delta_mb"] = round(row["rss_peak_mb"] - _RSS_START_MB, 1)
+    if server is not None:
+        row["wire"] = server.stats()
+    row.update(extra)
+    print(f"[bench] {name}: {row['items_per_s']} items/s p95={row['p95_ms']}ms", file=sys.stderr)
+    return row
+
+
+def _fresh_scheduler(host_rate: float) -> None:
+    # every network stage starts with the same, un-penalised pacing
+    set_scheduler(HostScheduler(initial_rate=host_rate, burst=host_rate, max_rate=max(host_rate, 50.0)))
+
+
+def bench_main(server: StandinServer, host_rate: float, concurrency: int) -> Dict[str, Any]:
+    """Full tiered pipeline via scrapers.reddit_scraper.main()."""
+    server.reset()
+    _fresh_scheduler(host_rate)
+    urls = server.urls()
+    started = time.perf_counter()
+    docs = asyncio.run(main(urls, headless=True, http_concurrency=concurrency))
+    wall = time.perf_counter() - started
+    ok = sum(1 for d in docs if d["post"]["title"] and d["profile"]["username"])
+    return _stage("main_tiered", len(urls), wall, server.post_spans_ms(), server, docs_ok=ok)
+
+
+def bench_visible_seq(server: StandinServer, limit: int) -> Dict[str, Any]:
+    """requests + HTML parser, one URL at a time (no pacing: it predates the scheduler)."""
+    server.reset()
+    urls = server.urls()[:limit]
+    started = time.perf_counter()
+    recs = scrape_reddit_visible_text_seq(urls)
+    wall = time.perf_counter() - started
+    return _stage("visible_text_seq", len(urls), wall, server.post_spans_ms(), server,
+                  errors=sum(1 for r in recs if r.get("error")))
+
+
+async def _extract_post_async(urls: List[str]) -> Dict[str, Any]:
+    from playwright.async_api import async_playwright
+    from scraper_types.reddit_scraper_meta import _extract_post
+
+    latencies: List[float] = []
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page()
+            started = time.perf_counter()
+            for url in urls:
+                t0 = time.perf_counter()
+                await page.goto(url, wait_until="domcontentloaded")
+                await _extract_post(page, url)
+                latencies.append((time.perf_counter() - t0) * 1000)
+            wall = time.perf_counter() - started
+        finally:
+            await browser.close()
+    return {"wall": wall, "latencies": latencies}
+
+
+def bench_extract_post(server: StandinServer, limit: int) -> Dict[str, Any]:
+    """Browser navigation + _extract_post per URL; skipped when Chromium is unavailable."""
+    server.reset()
+    urls = server.urls()[:limit]
+    try:
+        out = asyncio.run(_extract_post_async(urls))
+    except Exception as e:  # playwright missing / browser not installed
+        return {"stage": "extract_post", "skipped": f"{type(e).__name__}: {e}"}
+    return _stage("extract_post", len(urls), out["wall"], out["latencies"], server)
+
+
+def _raw_records(fixtures: List[Fixture]) -> List[Dict[str, Any]]:
+    link = "https://www.reddit.com/r/{}/comments/{}/"
+    recs = []
+    for f in fixtures:
+        url = link.format(f.subreddit, f.post_id)
+        post = _post_data(json.loads(f.payload))
+        if post:
+            recs.append(_map_post(url, post))
+        recs.append(_parse_visible(url, f.html.decode("utf-8")))
+    return recs
+
+
+def _timed_calls(fn: Callable[[], Any], repeat: int) -> List[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def bench_merge(fixtures: List[Fixture], repeat: int = 5) -> Dict[str, Any]:
+    """_merge_records over JSON + HTML records for every fixture (CPU only)."""
+    recs = _raw_records(fixtures)
+    per_run = _timed_calls(lambda: _merge_records(recs, []), repeat)
+    wall = sum(per_run) / 1000
+    return _stage("merge_records", len(recs) * repeat, wall, per_run, records_per_run=len(recs))
+
+
+def bench_add_leads(fixtures: List[Fixture]) -> Dict[str, Any]:
+    """add_leads twice into an empty MemoryDB: first pass inserts, second is all unchanged."""
+    docs = [_to_schema(m) for m in _merge_records(_raw_records(fixtures), [])]
+    db = MemoryDB()
+    latencies, results = [], []
+    started = time.perf_counter()
+    for _ in range(2):
+        t0 = time.perf_counter()
+        results.append(add_leads(db, docs, "reddit"))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    wall = time.perf_counter() - started
+    return _stage("add_leads", len(docs) * 2, wall, latencies,
+                  passes=[{k: r[k] for k in ("inserted", "changed", "unchanged")} for r in results],
+                  db=db.stats())
+
+
+# metric -> True if higher is better
+_COMPARED = {"items_per_s": True, "p95_ms": False, "rss_delta_mb": False}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """Human-readable regressions of `current` vs `baseline` beyond `tolerance`."""
+    old = {s["stage"]: s for s in baseline.get("stages", [])}
+    regressions = []
+    for stage in current.get("stages", []):
+        prev = old.get(stage["stage"])
+        if not prev or "skipped" in stage or "skipped" in prev:
+            continue
+        for metric, higher_better in _COMPARED.items():
+            a, b = prev.get(metric), stage.get(metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            if (higher_better and change < -tolerance) or (not higher_better and change > tolerance):
+                regressions.append(f"{stage['stage']}.{metric}: {a} -> {b} ({change:+.0%})")
+    return regressions
+
+
+STAGES = ("main_tiered", "visible_text_seq", "extract_post", "merge_records", "add_leads")
+_SERVER_STAGES = ("main_tiered", "visible_text_seq", "extract_post")
+
+
+def run_stage(name: str, posts: int = 200, fixtures_dir: Optional[str] = None, host_rate: float = 20.0,
+              concurrency: int = 8, seq_limit: int = 50, browser_limit: int = 20,
+              profile: Optional[ServerProfile] = None) -> Dict[str, Any]:
+    """One stage in this process (its own stand-in server if it needs one)."""
+    fixtures = get_fixtures(fixtures_dir, posts)
+    if name not in _SERVER_STAGES:
+        _mark_rss_start()
+        return bench_merge(fixtures) if name == "merge_records" else bench_add_leads(fixtures)
+    with StandinServer(fixtures, profile or ServerProfile()) as server:
+        _mark_rss_start()
+        if name == "main_tiered":
+            return bench_main(server, host_rate, concurrency)
+        if name == "visible_text_seq":
+            return bench_visible_seq(server, seq_limit)
+        return bench_extract_post(server, browser_limit)
+
+
+def _stage_subprocess(name: str, **kwargs) -> Dict[str, Any]:
+    profile = kwargs.pop("profile")
+    cmd = [sys.executable, "-m", "benchmarks.bench_offline", "--stage", name,
+           "--config", json.dumps({**kwargs, "profile": profile.as_dict()})]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, text=True)
+    if proc.returncode != 0:
+        return {"stage": name, "skipped": f"stage process exited with {proc.returncode}"}
+    return json.loads(proc.stdout)
+
+
+def run(posts: int = 200, fixtures_dir: Optional[str] = None, host_rate: float = 20.0,
+        concurrency: int = 8, seq_limit: int = 50, browser_limit: int = 20,
+        profile: Optional[ServerProfile] = None, isolate: bool = True) -> Dict[str, Any]:
+    """All STAGES, each in a fresh subprocess unless isolate=False (then RSS figures are not per stage)."""
+    profile = profile or ServerProfile()
+    kwargs = dict(posts=posts, fixtures_dir=fixtures_dir, host_rate=host_rate, concurrency=concurrency,
+                  seq_limit=seq_limit, browser_limit=browser_limit, profile=profile)
+    stages = [_stage_subprocess(name, **kwargs) if isolate else run_stage(name, **kwargs) for name in STAGES]
+    return {
+        "benchmark": "offline",
+        "created_at": int(time.time()),
+        "python": platform.python_version(),
+        "posts": len(get_fixtures(fixtures_dir, posts)),
+        "fixtures": fixtures_dir or "synthetic",
+        "server_profile": profile.as_dict(),
+        "host_rate": host_rate,
+        "stages": stages,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark (stand-in server + in-memory DB).")
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--fixtures", default=None, help="directory of recorded <post_id>.html/.json pairs")
+    parser.add_argument("--host-rate", type=float, default=20.0, help="initial per-host request rate")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rate-429", type=float, default=0.01)
+    parser.add_argument("--slow-fraction", type=float, default=0.02)
+    parser.add_argument("--out", default=None, help="also write the JSON result here")
+    parser.add_argument("--baseline", default=None, help="earlier result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    parser.add_argument("--in-process", action="store_true", help="run all stages in this process (RSS not per stage)")
+    parser.add_argument("--stage", choices=STAGES, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--config", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        # child of _stage_subprocess: one stage, its row as JSON on stdout
+        config = json.loads(args.config)
+        config["profile"] = ServerProfile(**config["profile"])
+        print(json.dumps(run_stage(args.stage, **config)))
+        sys.exit(0)
+
+    result = run(
+        posts=args.posts,
+        fixtures_dir=args.fixtures,
+        host_rate=args.host_rate,
+        concurrency=args.concurrency,
+        profile=ServerProfile(latency_ms=args.latency_ms, rate_429=args.rate_429, slow_fraction=args.slow_fraction),
+        isolate=not args.in_process,
+    )
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            result["regressions"] = compare(result, json.load(f), args.tolerance)
+    print(json.dumps(result, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    sys.exit(1 if result.get("regressions") else 0)
@@ -0,0 +1,122 @@
+# benchmarks/bench_schema_projector.py
+# Compiled schema projector vs the original per-item filter_by_schema.
+#   python -m benchmarks.bench_schema_projector [--records 100000]
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional
+
+from common.db_utils import SCHEMA
+from common.schema_projector import compile_schema
+
+ALIAS = {
+    "url": ["url", "reddit_link"],
+    "profile.username": ["author", "profile.username"],
+    "profile.bio": ["bio"],
+    "contact.emails": ["emails", "contact.emails"],
+    "contact.phone_numbers": ["phones", "contact.phone_numbers"],
+    "contact.websites": ["external_links"],
+    "content.caption": ["title"],
+    "content.author_name": ["author"],
+}
+
+# top-level only, as the original function could not address nested paths
+FLAT_ALIAS = {
+    "url": ["url", "reddit_link"],
+    "contact": ["contact"],
+    "profile": ["profile"],
+}
+
+
+def legacy_filter_by_schema(
+    data: Dict[str, Any],
+    schema_obj: Dict[str, Any],
+    *,
+    fill_missing: bool = True,
+    alias: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, Any]:
+    """filter_by_schema as it was before the compiled projector (kept verbatim as the baseline)."""
+    if alias is None:
+        alias = {}
+
+    out: Dict[str, Any] = {}
+    for out_key in schema_obj.keys():
+        in_keys = alias.get(out_key, [out_key])
+        vals = []
+        for k in in_keys:
+            if k in data and data[k] is not None:
+                vals.append(data[k])
+
+        uniq = []
+        for v in vals:
+            if v not in uniq:
+                uniq.append(v)
+
+        if uniq:
+            out[out_key] = uniq[0] if len(uniq) == 1 else uniq
+        elif fill_missing:
+            out[out_key] = None
+    return out
+
+
+def make_records(n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rnd = random.Random(seed)
+    recs = []
+    for i in range(n):
+        emails = [f"user{rnd.randrange(1000)}@example.com" for _ in range(rnd.randrange(4))]
+        recs.append({
+            "reddit_link": f"https://www.reddit.com/r/sub/comments/{i:x}/post/",
+            "url": f"https://www.reddit.com/r/sub/comments/{i:x}/post/" if i % 3 else None,
+            "title": f"Post {i}",
+            "author": f"user{i % 977}",
+            "emails": emails,
+            "phones": ["+15550100" + str(i % 100).zfill(2)] if i % 5 == 0 else [],
+            "external_links": [f"https://site{j}.example" for j in range(rnd.randrange(3))],
+            "contact": {"emails": emails[:1] + ["ops@example.com"]},
+            "profile": {"username": f"user{i % 977}"},
+        })
+    return recs
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(records: int = 100_000) -> Dict[str, Any]:
+    data = make_records(records)
+
+    # same work: top-level keys only, identical output to the legacy function
+    flat_schema = {k: None for k in SCHEMA}
+    flat = compile_schema(flat_schema, FLAT_ALIAS)
+    legacy_out = [legacy_filter_by_schema(d, SCHEMA, alias=FLAT_ALIAS) for d in data[:1000]]
+    assert flat.project_many(data[:1000]) == legacy_out, "flat projector diverged from legacy output"
+
+    legacy_s = _timed(lambda: [legacy_filter_by_schema(d, SCHEMA, alias=FLAT_ALIAS) for d in data])
+    flat_s = _timed(lambda: flat.project_many(data))
+
+    # full nested projection (every SCHEMA leaf, list merging, defaults)
+    compile_s = _timed(lambda: compile_schema(SCHEMA, ALIAS, use_defaults=True))
+    nested = compile_schema(SCHEMA, ALIAS, use_defaults=True)
+    nested_s = _timed(lambda: nested.project_many(data))
+
+    return {
+        "benchmark": "schema_projector",
+        "records": records,
+        "compile_once_ms": round(compile_s * 1000, 3),
+        "legacy_flat_s": round(legacy_s, 3),
+        "compiled_flat_s": round(flat_s, 3),
+        "flat_speedup": round(legacy_s / flat_s, 2),
+        "compiled_nested_s": round(nested_s, 3),
+        "compiled_nested_records_per_s": round(records / nested_s),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.records)))
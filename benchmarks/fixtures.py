@@ -0,0 +1,157 @@
+# benchmarks/fixtures.py
+# Reddit post fixtures for the offline benchmarks: one HTML page and one
+# /comments/<id>.json payload per post.
+#   - load_fixtures(dir) reads recorded pairs (<post_id>.html / <post_id>.json)
+#   - synthetic_fixtures(n) builds deterministic stand-ins when none are recorded
+#   - record_fixtures(urls, dir) saves live pages once, for later offline runs
+
+import json
+import os
+import random
+import re
+from typing import Dict, List, Optional
+
+_WORDS = ("the", "post", "thanks", "reply", "anyone", "know", "price", "deal", "contact", "shipping", "edit")
+_POST_ID_RE = re.compile(r"/comments/([a-z0-9]+)")
+
+
+class Fixture:
+    """One post: id, subreddit, slug and the two recorded bodies."""
+
+    def __init__(self, post_id: str, subreddit: str, slug: str, html: str, payload: str):
+        self.post_id = post_id
+        self.subreddit = subreddit
+        self.slug = slug
+        self.html = html.encode("utf-8")
+        self.payload = payload.encode("utf-8")
+
+    def path(self) -> str:
+        # "reddit" in the path keeps the HTML tier from retrying on old.reddit
+        return f"/reddit/r/{self.subreddit}/comments/{self.post_id}/{self.slug}/"
+
+
+def _post_html(post: Dict, comments: List[str]) -> str:
+    body = "".join(
+        f"<div class='comment'><a data-click-id='user' href='/user/c{i}'>c{i}</a><p>{c}</p></div>"
+        for i, c in enumerate(comments)
+    )
+    paras = "".join(f"<p>{line}</p>" for line in post["selftext"].split("\n") if line)
+    return (
+        "<html><head><title>{title}</title><script>window.__r = {{}};</script></head><body>"
+        "<a data-testid='subreddit-name' href='/r/{sub}'>{prefixed}</a>"
+        "<a data-testid='post_author_link' href='/user/{author}'>{author}</a>"
+        "<h1 data-test-id='post-title'>{title}</h1>"
+        "<div data-test-id='post-content'>{paras}</div>"
+        "<div class='_1rZYMD_4xY3gRcSS3p8ODO'>{score}</div>"
+        "<span class='FHCV02u6Cp2zYL0fhQPsO'>{n} comments</span>"
+        "{body}</body></html>"
+    ).format(
+        title=post["title"], sub=post["subreddit"], prefixed=post["subreddit_name_prefixed"],
+        author=post["author"], paras=paras, score=post["score"], n=post["num_comments"], body=body,
+    )
+
+
+def synthetic_fixtures(n: int = 200, comments: int = 40, seed: int = 7) -> List[Fixture]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        post_id = f"b{i:05x}"
+        sub = rnd.choice(("forhire", "slavelabour", "smallbusiness", "bikes"))
+        text = [" ".join(rnd.choice(_WORDS) for _ in range(25)) for _ in range(3)]
+        if i % 5 == 0:
+            text.append(f"reach me at seller{i}@example.com or +1 415 555 {i % 10000:04d}")
+        post = {
+            "id": post_id,
+            "title": f"Post {i}: " + " ".join(rnd.choice(_WORDS) for _ in range(6)),
+            "selftext": "\n".join(text),
+            "author": f"user{i}",
+            "subreddit": sub,
+            "subreddit_name_prefixed": f"r/{sub}",
+            "created_utc": 1_700_000_000 + i * 60,
+            "score": rnd.randrange(5000),
+            "num_comments": comments,
+            "url": f"https://www.reddit.com/r/{sub}/comments/{post_id}/",
+        }
+        comment_bodies = [" ".join(rnd.choice(_WORDS) for _ in range(20)) for _ in range(comments)]
+        payload = [
+            {"kind": "Listing", "data": {"children": [{"kind": "t3", "data": post}]}},
+            {"kind": "Listing", "data": {"children": [
+                {"kind": "t1", "data": {"id": f"c{j}", "author": f"c{j}", "body": c}}
+                for j, c in enumerate(comment_bodies)
+            ]}},
+        ]
+        out.append(Fixture(post_id, sub, f"post_{i}", _post_html(post, comment_bodies), json.dumps(payload)))
+    return out
+
+
+def load_fixtures(directory: str) -> List[Fixture]:
+    """Recorded pairs from `directory`; posts missing either file are skipped."""
+    out = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        post_id = name[:-5]
+        html_path = os.path.join(directory, post_id + ".html")
+        if not os.path.exists(html_path):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            payload = f.read()
+        with open(html_path, encoding="utf-8") as f:
+            html = f.read()
+        try:
+            sub = json.loads(payload)[0]["data"]["children"][0]["data"].get("subreddit") or "unknown"
+        except (ValueError, KeyError, IndexError, TypeError):
+            sub = "unknown"
+        out.append(Fixture(post_id, sub, "recorded", html, payload))
+    return out
+
+
+def get_fixtures(directory: Optional[str] = None, n: int = 200) -> List[Fixture]:
+    if directory:
+        recorded = load_fixtures(directory)
+        if recorded:
+            return (recorded * (n // len(recorded) + 1))[:n] if n > len(recorded) else recorded[:n]
+        print(f"[WARN] no recorded fixtures in {directory}, using synthetic ones")
+    return synthetic_fixtures(n)
+
+
+def record_fixtures(urls: List[str], directory: str) -> int:
+    """Fetch each post's HTML and JSON once (live) and save them as fixtures."""
+    import requests
+    from common.http_client import DEFAULT_HEADERS
+    from scraper_types.reddit_scraper_json import _json_url
+
+    os.makedirs(directory, exist_ok=True)
+    saved = 0
+    with requests.Session() as session:
+        session.headers.update(DEFAULT_HEADERS)
+        for url in urls:
+            m = _POST_ID_RE.search(url)
+            if not m:
+                continue
+            try:
+                html = session.get(url, timeout=20)
+                payload = session.get(_json_url(url), timeout=20, headers={"Accept": "application/json"})
+            except requests.RequestException as e:
+                print(f"[ERR] {url} → {e}")
+                continue
+            if html.status_code != 200 or payload.status_code != 200:
+                print(f"[ERR] {url} → HTTP {html.status_code}/{payload.status_code}")
+                continue
+            with open(os.path.join(directory, m.group(1) + ".html"), "w", encoding="utf-8") as f:
+                f.write(html.text)
+            with open(os.path.join(directory, m.group(1) + ".json"), "w", encoding="utf-8") as f:
+                f.write(payload.text)
+            saved += 1
+    return saved
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record live Reddit posts as benchmark fixtures.")
+    parser.add_argument("urls_file")
+    parser.add_argument("out_dir")
+    args = parser.parse_args()
+    with open(args.urls_file, encoding="utf-8") as f:
+        print(f"[OK] recorded {record_fixtures([l.strip() for l in f if l.strip()], args.out_dir)} posts")
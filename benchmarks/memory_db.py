@@ -0,0 +1,129 @@
+# benchmarks/memory_db.py
+# In-process stand-in for the slice of the pymongo API that db_utils uses
+# (find with $in / $exists / equality, bulk_write of UpdateOne upserts, update_many,
+# create_indexes), so add_leads can be benchmarked without a server.
+# Not a general Mongo emulator: only the operators the writers emit.
+
+import copy
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def _prepare(flt: Dict[str, Any]) -> Dict[str, Any]:
+    """$in operands -> frozenset once per query, not a list scan per document."""
+    out = {}
+    for k, cond in flt.items():
+        if isinstance(cond, dict) and "$in" in cond:
+            try:
+                cond = {**cond, "$in": frozenset(cond["$in"])}
+            except TypeError:  # unhashable members: keep the list
+                pass
+        out[k] = cond
+    return out
+
+
+def _matches(doc: Dict[str, Any], flt: Dict[str, Any]) -> bool:
+    for k, cond in flt.items():
+        v = doc.get(k)
+        if isinstance(cond, dict) and "$in" in cond:
+            try:
+                hit = v in cond["$in"]
+            except TypeError:  # unhashable field value against a set
+                hit = v in list(cond["$in"])
+            if not hit:
+                return False
+        elif isinstance(cond, dict) and "$exists" in cond:
+            if (k in doc) != bool(cond["$exists"]):
+                return False
+        elif v != cond:
+            return False
+    return True
+
+
+def _project(doc: Dict[str, Any], projection: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    if not projection:
+        return copy.deepcopy(doc)
+    keep = [k for k, on in projection.items() if on and k != "_id"]
+    out = {k: copy.deepcopy(doc[k]) for k in keep if k in doc}
+    if projection.get("_id", 1) and "_id" in doc:
+        out["_id"] = doc["_id"]
+    return out
+
+
+class _BulkResult:
+    def __init__(self, upserted: int, modified: int):
+        self.upserted_count = upserted
+        self.modified_count = modified
+        self.matched_count = modified
+
+
+class MemoryCollection:
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: List[Dict[str, Any]] = []
+        self.indexes: List[str] = []
+        self.ops = {"find": 0, "bulk_write": 0, "update_many": 0, "writes": 0}
+
+    def _apply(self, doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+        doc.update(copy.deepcopy(update.get("$set", {})))
+        if inserting:
+            for k, v in update.get("$setOnInsert", {}).items():
+                doc.setdefault(k, copy.deepcopy(v))
+
+    def _update(self, flt: Dict[str, Any], update: Dict[str, Any], upsert: bool, many: bool) -> int:
+        flt = _prepare(flt)
+        hits = [d for d in self.docs if _matches(d, flt)]
+        if not many:
+            hits = hits[:1]
+        for d in hits:
+            self._apply(d, update, inserting=False)
+        if not hits and upsert:
+            doc = {k: v for k, v in flt.items() if not isinstance(v, dict)}
+            doc["_id"] = len(self.docs) + 1
+            self._apply(doc, update, inserting=True)
+            self.docs.append(doc)
+        self.ops["writes"] += max(1, len(hits))
+        return len(hits)
+
+    def find(self, flt: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, int]] = None) -> Iterable[Dict]:
+        self.ops["find"] += 1
+        flt = _prepare(flt or {})
+        return [_project(d, projection) for d in self.docs if _matches(d, flt)]
+
+    def bulk_write(self, requests: List[Any], ordered: bool = True) -> _BulkResult:
+        self.ops["bulk_write"] += 1
+        upserted = modified = 0
+        for op in requests:
+            # pymongo.UpdateOne keeps its arguments on these attributes
+            hit = self._update(op._filter, op._doc, bool(op._upsert), many=False)
+            modified += hit
+            upserted += not hit
+        return _BulkResult(upserted, modified)
+
+    def update_many(self, flt: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        self.ops["update_many"] += 1
+        return self._update(flt, update, upsert, many=True)
+
+    def create_indexes(self, models: List[Any]) -> List[str]:
+        names = [m.document.get("name", str(i)) for i, m in enumerate(models)]
+        self.indexes.extend(names)
+        return names
+
+    def count_documents(self, flt: Dict[str, Any]) -> int:
+        flt = _prepare(flt)
+        return sum(1 for d in self.docs if _matches(d, flt))
+
+
+class MemoryDB:
+    """db["collection"] -> MemoryCollection, like pymongo.database.Database."""
+
+    def __init__(self, name: str = "bench"):
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(name)
+        return self._collections[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: {"docs": len(c.docs), **c.ops} for name, c in self._collections.items()}
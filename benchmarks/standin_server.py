@@ -0,0 +1,167 @@
+# benchmarks/standin_server.py
+# Local HTTP stand-in for reddit.com that serves benchmark fixtures.
+#   - post page (HTML) at Fixture.path(), its JSON at the same path + ".json"
+#   - simulated base latency + jitter, a fraction of slow responses, and a
+#     fraction of 429s with Retry-After
+#   - counts requests / bytes and records each post's wire time
+
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from benchmarks.fixtures import Fixture
+from common.reddit_urls import register_post_host
+
+_POST_ID_RE = re.compile(r"/comments/([a-z0-9]+)")
+
+
+class ServerProfile:
+    """How the stand-in misbehaves; all fractions are per request."""
+
+    def __init__(
+        self,
+        latency_ms: float = 20.0,
+        jitter_ms: float = 10.0,
+        slow_fraction: float = 0.02,
+        slow_ms: float = 1500.0,
+        rate_429: float = 0.01,
+        retry_after_s: int = 1,
+        seed: int = 3,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_fraction = slow_fraction
+        self.slow_ms = slow_ms
+        self.rate_429 = rate_429
+        self.retry_after_s = retry_after_s
+        self.seed = seed
+
+    def as_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+class StandinServer:
+    """
+    Threaded fixture server on 127.0.0.1 (random free port by default).
+      with StandinServer(fixtures, profile) as srv:
+          urls = srv.urls()
+    """
+
+    def __init__(self, fixtures: List[Fixture], profile: Optional[ServerProfile] = None, port: int = 0):
+        self.fixtures = {f.post_id: f for f in fixtures}
+        self.profile = profile or ServerProfile()
+        self._rnd = random.Random(self.profile.seed)
+        self._lock = threading.Lock()
+        self._spans: Dict[str, List[float]] = {}
+        self.counters = {"requests": 0, "bytes_out": 0, "bytes_in": 0, "status_429": 0, "slow": 0, "not_found": 0}
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def urls(self) -> List[str]:
+        return [self.base_url + f.path() for f in self.fixtures.values()]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._spans.clear()
+            for k in self.counters:
+                self.counters[k] = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self.counters)
+
+    def post_spans_ms(self) -> List[float]:
+        """Per post: first request start -> last response end, in ms."""
+        with self._lock:
+            return [(end - start) * 1000 for start, end in self._spans.values()]
+
+    def _decide(self):
+        p = self.profile
+        with self._lock:
+            roll = self._rnd.random()
+            delay = max(0.0, p.latency_ms + self._rnd.uniform(-p.jitter_ms, p.jitter_ms))
+            if roll < p.rate_429:
+                return 429, delay
+            if roll < p.rate_429 + p.slow_fraction:
+                return 200, delay + p.slow_ms
+            return 200, delay
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                started = time.perf_counter()
+                path = self.path.split("?", 1)[0]
+                m = _POST_ID_RE.search(path)
+                fixture = server.fixtures.get(m.group(1)) if m else None
+                status, delay_ms = server._decide()
+                time.sleep(delay_ms / 1000)
+
+                headers = {}
+                if fixture is None:
+                    status, body, ctype = 404, b"not found", "text/plain"
+                elif status == 429:
+                    body, ctype = b"too many requests", "text/plain"
+                    headers["Retry-After"] = str(server.profile.retry_after_s)
+                elif path.endswith(".json"):
+                    body, ctype = fixture.payload, "application/json"
+                else:
+                    body, ctype = fixture.html, "text/html; charset=utf-8"
+
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in headers.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+                ended = time.perf_counter()
+                with server._lock:
+                    c = server.counters
+                    c["requests"] += 1
+                    c["bytes_out"] += len(body)
+                    c["bytes_in"] += len(self.requestline) + sum(len(k) + len(v) + 4 for k, v in self.headers.items())
+                    c["status_429"] += status == 429
+                    c["slow"] += delay_ms > server.profile.latency_ms + server.profile.jitter_ms
+                    c["not_found"] += status == 404
+                    if fixture is not None:
+                        span = server._spans.setdefault(fixture.post_id, [started, ended])
+                        span[0] = min(span[0], started)
+                        span[1] = max(span[1], ended)
+
+        return Handler
+
+    def start(self) -> "StandinServer":
+        # its /reddit/r/<sub>/comments/<id>/ paths must parse as posts (post_id keying, harvester)
+        register_post_host(self._httpd.server_address[0])
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StandinServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
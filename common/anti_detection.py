@@ -1,7 +1,10 @@
 # common/anti_detection.py
 import asyncio
 import random
+import time
 from playwright.async_api import TimeoutError as PlaywrightTimeout
+from .metrics import inc, log, span
+from .rate_limiter import get_scheduler, parse_retry_after
 
 DEFAULT_USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -16,39 +19,69 @@ DEFAULT_USER_AGENTS = [
 ]
 
 
-async def goto_resilient(page, url: str, retries: int = 3, timeout: int = 30000):
+class RetryableStatus(Exception):
+    """Navigation returned 429/5xx; the scheduler has already backed off."""
+
+
+async def goto_resilient(page, url: str, retries: int = 3, timeout: int = 30000, scheduler=None):
     """
     Robust navigation helper:
-      - retries on timeout/errors
-      - small randomized sleeps to mimic human behaviour
+      - paced by the per-host HostScheduler shared with the HTTP client
+        (no fixed post-navigation sleep: pages go out as fast as the host allows)
+      - 429/5xx and timeouts feed back into the scheduler (Retry-After honoured)
+        and are retried; other errors get a short randomized pause
+      - timed as the "navigate" stage; retries/timeouts are counted
     """
+    scheduler = scheduler or get_scheduler()
+    with span("navigate"):
+        await _goto_attempts(page, url, retries, timeout, scheduler)
+
+
+async def _goto_attempts(page, url: str, retries: int, timeout: int, scheduler):
     for attempt in range(retries):
+        await scheduler.acquire(url)
+        started = time.monotonic()
         try:
-            await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
-            await asyncio.sleep(random.uniform(1.2, 3.0))
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            status = response.status if response is not None else 200
+            retry_after = None
+            if response is not None and (status == 429 or status >= 500):
+                retry_after = parse_retry_after(await response.header_value("retry-after"))
+            scheduler.record(url, status, time.monotonic() - started, retry_after, kind="nav")
+            if status == 429 or status >= 500:
+                raise RetryableStatus(f"HTTP {status}")
             return
         except PlaywrightTimeout:
+            scheduler.record(url, None)
+            inc("timeouts_total", stage="navigate")
             if attempt < retries - 1:
-                wait = 2 ** attempt
-                print(f"⚠️ Timeout navigating {url}. Retrying in {wait}s... ({attempt+1}/{retries})")
-                await asyncio.sleep(wait + random.uniform(0, 1))
+                inc("retries_total", stage="navigate", reason="timeout")
+                log("navigate_retry", "warn", url=url, reason="timeout", attempt=attempt + 1, retries=retries)
+            else:
+                raise
+        except RetryableStatus as e:
+            if attempt < retries - 1:
+                inc("retries_total", stage="navigate", reason="status")
+                log("navigate_retry", "warn", url=url, reason=str(e), attempt=attempt + 1, retries=retries)
             else:
                 raise
         except Exception as e:
             if attempt < retries - 1:
-                print(f"⚠️ Navigation error ({e}) for {url}. Retrying... ({attempt+1}/{retries})")
-                await asyncio.sleep(1.5 + random.uniform(0, 1))
+                inc("retries_total", stage="navigate", reason="error")
+                log("navigate_retry", "warn", url=url, reason=str(e), attempt=attempt + 1, retries=retries)
+                await asyncio.sleep(0.5 + random.uniform(0, 1))
             else:
                 raise
 
 
-async def create_stealth_context(browser, *, locale="en-US"):
+async def create_stealth_context(browser, *, locale="en-US", router=None):
     """
     Create a stealth browser context with:
       - randomized UA
       - randomized viewport
       - timezone and extra headers
       - small navigator spoofing
+      - optional ResourceRouter (common.request_router) to abort unneeded requests
     Returns the Playwright context (call .new_page() on it).
     """
     user_agent = random.choice(DEFAULT_USER_AGENTS)
@@ -79,5 +112,8 @@ async def create_stealth_context(browser, *, locale="en-US"):
         """
     )
 
-    print(f"[stealth] UA={user_agent[:80]}... viewport={width}x{height} tz={timezone}")
+    if router is not None:
+        await router.install(context)
+
+    log("stealth_context", "debug", user_agent=user_agent[:80], viewport=f"{width}x{height}", tz=timezone)
     return context
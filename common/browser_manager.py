@@ -1,7 +1,12 @@
 # common/browser_manager.py
 from playwright.async_api import Playwright
 from .anti_detection import create_stealth_context
+from .metrics import inc, log
 import asyncio
+from typing import Dict, Optional
+
+# performance.memory is Chromium-only; 0 elsewhere (never triggers recycling)
+_JS_HEAP_BYTES = "() => (performance.memory && performance.memory.usedJSHeapSize) || 0"
 
 async def get_browser(playwright: Playwright, headless: bool = True, args: list = None):
     """
@@ -12,11 +17,190 @@ async def get_browser(playwright: Playwright, headless: bool = True, args: list
     browser = await playwright.chromium.launch(headless=headless, args=args)
     return browser
 
-async def get_stealth_page(browser, *, locale="en-US"):
+async def get_stealth_page(browser, *, locale="en-US", router=None):
     """
     Create a stealth context and return a page bound to it.
     Caller is responsible for closing the browser/context when done.
     """
-    context = await create_stealth_context(browser, locale=locale)
+    context = await create_stealth_context(browser, locale=locale, router=router)
     page = await context.new_page()
     return page
+
+
+class LazyBrowser:
+    """
+    Defers starting Playwright + Chromium until a browser is actually needed.
+    Use as `async with LazyBrowser(headless=True) as lazy:` and call
+    `await lazy.get()` only on the code path that needs it; if it is never
+    called, nothing is launched and exit is free.
+    If the browser process has died (crash, OOM kill), the next get()
+    relaunches it; `restarts` counts how often that happened.
+    """
+
+    def __init__(self, headless: bool = True, args: list = None):
+        self.headless = headless
+        self.args = args
+        self._pw_cm = None
+        self._browser = None
+        self._lock = asyncio.Lock()
+        self.restarts = 0
+
+    @property
+    def launched(self) -> bool:
+        return self._browser is not None
+
+    @property
+    def connected(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def get(self):
+        async with self._lock:
+            if self._browser is not None and not self._browser.is_connected():
+                self.restarts += 1
+                inc("browser_restarts_total")
+                log("browser_restart", "warn", restarts=self.restarts)
+                await self._shutdown()
+            if self._browser is None:
+                from playwright.async_api import async_playwright
+                self._pw_cm = async_playwright()
+                playwright = await self._pw_cm.__aenter__()
+                self._browser = await get_browser(playwright, headless=self.headless, args=self.args)
+            return self._browser
+
+    async def aclose(self) -> None:
+        async with self._lock:
+            await self._shutdown()
+
+    async def _shutdown(self) -> None:
+        # close browser to free resources
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+            self._browser = None
+        if self._pw_cm is not None:
+            try:
+                await self._pw_cm.__aexit__(None, None, None)
+            except Exception:
+                pass
+            self._pw_cm = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
+
+
+class PagePool:
+    """
+    Bounded pool of stealth pages on one (lazily launched) browser.
+      - up to `size` contexts, each created on first demand (or up front via warm())
+      - acquire() waits when all pages are busy
+      - a page that crashed/closed, or belongs to a browser that has since been
+        relaunched, is replaced on its next acquire()
+      - recycling bounds leaks in long-lived pools: a context is replaced after
+        `max_uses` acquires, or once its page's JS heap exceeds `max_heap_mb`
+    """
+
+    def __init__(self, lazy: LazyBrowser, size: int = 4, *, router=None,
+                 max_uses: Optional[int] = None, max_heap_mb: Optional[float] = None):
+        self.lazy = lazy
+        self.size = max(1, size)
+        self.router = router
+        self.max_uses = max_uses
+        self.max_heap_mb = max_heap_mb
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+        self._contexts = []
+        self._uses: Dict[object, int] = {}
+        self.recycled = 0
+
+    async def warm(self, n: Optional[int] = None) -> int:
+        """Pre-create up to `n` (default: all remaining) idle pages; returns how many."""
+        made = 0
+        while self._created < min(self.size, n if n is not None else self.size):
+            self._created += 1
+            try:
+                self._idle.put_nowait(await self._new_page())
+            except Exception:
+                self._created -= 1
+                raise
+            made += 1
+        return made
+
+    async def acquire(self):
+        if self._idle.empty() and self._created < self.size:
+            self._created += 1
+            try:
+                page = await self._new_page()
+            except Exception:
+                self._created -= 1
+                raise
+        else:
+            page = await self._idle.get()
+            if await self._stale(page):
+                await self._drop(page)
+                try:
+                    page = await self._new_page()
+                except Exception:
+                    self._created -= 1
+                    raise
+        self._uses[page] = self._uses.get(page, 0) + 1
+        return page
+
+    def release(self, page) -> None:
+        self._idle.put_nowait(page)
+
+    async def _stale(self, page) -> bool:
+        browser = await self.lazy.get()  # relaunches a crashed browser
+        if page.is_closed() or page.context.browser is not browser:
+            return True
+        if self.max_uses and self._uses.get(page, 0) >= self.max_uses:
+            self.recycled += 1
+            inc("context_recycles_total", reason="uses")
+            return True
+        if self.max_heap_mb:
+            try:
+                heap_mb = (await page.evaluate(_JS_HEAP_BYTES)) / 1024 / 1024
+            except Exception:
+                return True
+            if heap_mb > self.max_heap_mb:
+                self.recycled += 1
+                inc("context_recycles_total", reason="memory")
+                return True
+        return False
+
+    async def _new_page(self):
+        browser = await self.lazy.get()
+        context = await create_stealth_context(browser, router=self.router)
+        self._contexts.append(context)
+        return await context.new_page()
+
+    async def _drop(self, page) -> None:
+        self._uses.pop(page, None)
+        context = page.context
+        if context in self._contexts:
+            self._contexts.remove(context)
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": self.size,
+            "created": self._created,
+            "idle": self._idle.qsize(),
+            "recycled": self.recycled,
+            "browser_restarts": self.lazy.restarts,
+        }
+
+    async def close(self) -> None:
+        for context in self._contexts:
+            try:
+                await context.close()
+            except Exception:
+                pass
+        self._contexts = []
@@ -0,0 +1,116 @@
+# common/contact_extractor.py
+import re
+from typing import Dict, Iterable, List, Optional
+
+from .metrics import span
+
+# One alternation, one scan. Every repetition is bounded and adjacent pieces
+# use disjoint character classes, so work per start position is capped and
+# the scan stays linear on adversarial input (long digit/space/letter runs).
+_URL = r"(?P<url>https?://[^\s<>\"'()\[\]{}]{1,2048})"
+_EMAIL = (
+    r"(?P<email>(?<![\w.%+\-])[A-Za-z0-9._%+\-]{1,64}@"
+    r"(?:[A-Za-z0-9](?:[A-Za-z0-9\-]{0,61}[A-Za-z0-9])?\.){1,8}[A-Za-z]{2,24})(?![\w\-])"
+)
+_PHONE = (
+    r"(?P<phone>(?<![\w+])\+?(?:\(\d{1,4}\)|\d{1,4})"
+    r"(?:[ .\-]?(?:\(\d{1,4}\)|\d{1,4})){1,6})(?![\w\-])"
+)
+CONTACT_RE = re.compile("|".join([_URL, _EMAIL, _PHONE]))
+
+# Things the phone pattern can match that are not phones.
+_DATE_RE = re.compile(r"^(?:\d{4}[-./]\d{1,2}[-./]\d{1,2}|\d{1,2}[-./]\d{1,2}[-./]\d{2,4})$")
+_IP_RE = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}$")
+_TRAILING_PUNCT = ".,;:!?"
+
+# What a phone has to look like, beyond the digit count. Bare digit runs,
+# space-separated runs, versions (1.2.3) and ZIP+4 (12345-6789) don't qualify.
+_NANP_SHAPE = re.compile(r"^(?:1[ .\-])?(?:\(\d{3}\) ?\d{3}[ .\-]|\d{3}-\d{3}-|\d{3}\.\d{3}\.)\d{4}$")
+_GROUPED_SHAPE = re.compile(r"^(?:\(\d{2,5}\) ?|\d{2,5}-)\d{2,4}[ \-]\d{4}$")
+
+
+def _looks_like_timestamp(raw: str, digits: str) -> bool:
+    # unseparated 10/13-digit runs starting with 1 are unix epochs (s/ms);
+    # no NANP number starts with 1 at 10 digits
+    return raw == digits and len(digits) in (10, 13) and digits[0] == "1"
+
+
+class ContactExtractor:
+    """
+    Single-pass email / phone / URL extractor with validation.
+      - phones: 7-15 digits (E.164 limit) in a phone shape: a leading
+        "+<cc>", or grouped like (xxx) xxx-xxxx / xxx-xxx-xxxx / 0xx-xxxx-xxxx;
+        bare digit runs, dates, IPs, versions, ZIP+4 and single-digit
+        repeats are rejected; returned in E.164 ("+<cc><number>")
+        when the country is known (leading +, NANP 11-digit, or
+        `default_country_code`), else as bare national digits
+      - emails: lowercased domain, trailing dot stripped
+      - urls: trailing punctuation stripped
+    Results are deduped in first-seen order.
+    """
+
+    def __init__(self, default_country_code: Optional[str] = None, min_phone_digits: int = 7,
+                 max_phone_digits: int = 15):
+        self.default_country_code = (default_country_code or "").lstrip("+") or None
+        self.min_phone_digits = min_phone_digits
+        self.max_phone_digits = max_phone_digits
+
+    def normalize_phone(self, raw: str) -> Optional[str]:
+        digits = re.sub(r"\D", "", raw)
+        if not (self.min_phone_digits <= len(digits) <= self.max_phone_digits):
+            return None
+        if _DATE_RE.match(raw) or _IP_RE.match(raw) or _looks_like_timestamp(raw, digits):
+            return None
+        if len(set(digits)) == 1:
+            return None
+        if raw.startswith("+"):
+            return "+" + digits if len(digits) >= 8 else None
+        if not (_NANP_SHAPE.match(raw) or _GROUPED_SHAPE.match(raw)):
+            return None
+        if len(digits) == 11 and digits[0] == "1":
+            return "+" + digits
+        national = digits.lstrip("0")  # drop the trunk prefix
+        if self.default_country_code and len(national) <= 10:
+            return "+" + self.default_country_code + national
+        return digits
+
+    @staticmethod
+    def normalize_email(raw: str) -> str:
+        local, _, domain = raw.partition("@")
+        return f"{local}@{domain.rstrip('.').lower()}"
+
+    def extract(self, text: Optional[str]) -> Dict[str, List[str]]:
+        emails: Dict[str, None] = {}
+        phones: Dict[str, None] = {}
+        urls: Dict[str, None] = {}
+        if text:
+            for m in CONTACT_RE.finditer(text):
+                kind = m.lastgroup
+                raw = m.group(kind)
+                if kind == "url":
+                    urls[raw.rstrip(_TRAILING_PUNCT)] = None
+                elif kind == "email":
+                    emails[self.normalize_email(raw)] = None
+                else:
+                    phone = self.normalize_phone(raw.rstrip(_TRAILING_PUNCT))
+                    if phone:
+                        phones[phone] = None
+        return {"emails": list(emails), "phones": list(phones), "urls": list(urls)}
+
+    def extract_many(self, texts: Iterable[Optional[str]]) -> Dict[str, List[str]]:
+        """Extract over several texts and merge (deduped, first-seen order)."""
+        out: Dict[str, Dict[str, None]] = {"emails": {}, "phones": {}, "urls": {}}
+        for text in texts:
+            found = self.extract(text)
+            for k, vals in found.items():
+                out[k].update(dict.fromkeys(vals))
+        return {k: list(v) for k, v in out.items()}
+
+
+_DEFAULT = ContactExtractor()
+
+
+def extract_contacts(text: Optional[str]) -> Dict[str, List[str]]:
+    """Module-level shortcut using the default extractor (timed as the "contacts" stage)."""
+    with span("contacts"):
+        return _DEFAULT.extract(text)
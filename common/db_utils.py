@@ -1,42 +1,81 @@
 # scraper_types/db_utils.py
 import os
+import re
 import json
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
-from pymongo import MongoClient, ASCENDING, UpdateOne
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Any, List, Optional, Union
+from datetime import datetime, timedelta, timezone
+from pymongo import MongoClient, ASCENDING, IndexModel, UpdateOne
+from pymongo.errors import OperationFailure
 from dotenv import load_dotenv
+from .fingerprint import content_hash
+from .metrics import inc, log, span
+from .output_sinks import write_records
+from .reddit_urls import canonical_post_urls, canonicalize
+from .schema_projector import SchemaProjector, compile_schema
 
 Json = Union[Dict[str, Any], List[Dict[str, Any]]]
 
 # ---------------- MongoDB ----------------
-from pymongo import MongoClient
-from dotenv import load_dotenv
-import os
+# One MongoClient per (uri, pool settings) per process; pymongo clients are
+# thread-safe and pool their own connections, so they must be shared.
+_CLIENTS: Dict[tuple, MongoClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+_MONGO_URI: Optional[str] = None
+
+def _mongo_uri() -> str:
+    global _MONGO_URI
+    if _MONGO_URI is None:
+        load_dotenv()
+        mongo_uri = os.getenv("MONGO_URI")
+        if not mongo_uri:
+            # fallback default if env not found
+            mongo_uri = "mongodb://localhost:27017/leadgen"
+            log("mongo_uri", "warn", source="default", uri=mongo_uri)
+        else:
+            # never log the password
+            log("mongo_uri", source=".env", uri=re.sub(r"//([^:/@]+):[^@]*@", r"//\1:***@", mongo_uri))
+        _MONGO_URI = mongo_uri
+    return _MONGO_URI
+
+def get_client(
+    uri: Optional[str] = None,
+    *,
+    max_pool_size: Optional[int] = None,
+    min_pool_size: Optional[int] = None,
+) -> MongoClient:
+    """
+    Return the process-wide MongoClient for `uri` (default: MONGO_URI).
+    Pool sizing defaults come from MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE.
+    """
+    uri = uri or _mongo_uri()
+    max_pool_size = max_pool_size or int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+    min_pool_size = min_pool_size if min_pool_size is not None else int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+    key = (uri, max_pool_size, min_pool_size)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = MongoClient(uri, maxPoolSize=max_pool_size, minPoolSize=min_pool_size)
+            _CLIENTS[key] = client
+        return client
 
 def get_db():
     """
-    Initialize and return a MongoDB database connection.
-    Loads MONGO_URI from .env or falls back to localhost.
+    Return the default MongoDB database on the shared client.
+    Loads MONGO_URI from .env (once) or falls back to localhost;
+    uses 'leadgen' when the URI names no database.
     """
-    load_dotenv()
-
-    mongo_uri = os.getenv("MONGO_URI")
-    if not mongo_uri:
-        # fallback default if env not found
-        mongo_uri = "mongodb://localhost:27017/leadgen"
-        print("[WARN] MONGO_URI not found in .env, using default:", mongo_uri)
-    else:
-        print("[INFO] Using MONGO_URI from .env:", mongo_uri)
-
-    client = MongoClient(mongo_uri)
-
-    # Try to pick the default db from URI, else fallback to "leadgen"
-    db = client.get_default_database()
-    if db is None:
-        db = client["leadgen"]
-        print("[INFO] No default DB in URI, falling back to 'leadgen'")
+    return get_client().get_default_database(default="leadgen")
 
-    return db
+def close_clients() -> None:
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            client.close()
+        _CLIENTS.clear()
 
 # platform -> collection
 PLATFORM_COLLECTION = {
@@ -46,14 +85,226 @@ PLATFORM_COLLECTION = {
     # extend here (instagram, linkedin...) when needed
 }
 
-def _ensure_indexes_for(db, collection_name: str):
-    # use non-unique index by default; switch to unique if you dedupe on url
-    db[collection_name].create_index([("url", ASCENDING)], unique=False)
+# platform -> upsert key (default "url"); reddit posts are keyed on post id so
+# URL variants of one post (www./old./redd.it/tracking params) are one row
+PLATFORM_KEY = {
+    "reddit": "post_id",
+}
+
+# collection -> indexes; the single place indexes are declared
+INDEXES: Dict[str, List[IndexModel]] = {
+    "twitter_leads": [IndexModel([("url", ASCENDING)], name="url_1")],
+    "quora_leads": [IndexModel([("url", ASCENDING)], name="url_1")],
+    # reddit upserts are keyed on post_id; url is canonical, so unique as well
+    "reddit_leads": [
+        # not "url_1": older databases have a plain url_1 that _create_index replaces
+        IndexModel([("url", ASCENDING)], name="url_unique", unique=True),
+        IndexModel([("post_id", ASCENDING)], name="post_id_1", unique=True,
+                   partialFilterExpression={"post_id": {"$type": "string"}}),
+    ],
+}
+
+def _backfill_post_ids(collection) -> None:
+    """
+    Rows written before post_id keying only have a url: give each post's first
+    row its post_id so the next upsert updates it instead of inserting a twin.
+    Later duplicates of an already-keyed post are left alone (and logged).
+    """
+    pending: Dict[str, Any] = {}
+    dupes = 0
+    for row in collection.find({"post_id": {"$exists": False}}, {"url": 1}):
+        pid = canonicalize(row.get("url") or "")[0]
+        if not pid:
+            continue
+        if pid in pending:
+            dupes += 1
+            continue
+        pending[pid] = row["_id"]
+    if not pending:
+        return
+    for row in collection.find({"post_id": {"$in": list(pending)}}, {"post_id": 1, "_id": 0}):
+        pending.pop(row["post_id"], None)
+        dupes += 1
+    ops = [UpdateOne({"_id": _id}, {"$set": {"post_id": pid}}) for pid, _id in pending.items()]
+    for i in range(0, len(ops), 1000):
+        collection.bulk_write(ops[i:i + 1000], ordered=False)
+    log("post_id_backfill", collection=getattr(collection, "name", ""), updated=len(ops), duplicates=dupes)
+
+# collection -> one-off data fix run before its indexes are applied
+MIGRATIONS = {
+    "reddit_leads": _backfill_post_ids,
+}
+
+_INDEXED: set = set()
+
+def ensure_indexes(db, collection_name: str) -> None:
+    """Apply MIGRATIONS, then INDEXES, for a collection once per process (later calls are free)."""
+    key = (db.name, collection_name)
+    if key in _INDEXED:
+        return
+    migrate = MIGRATIONS.get(collection_name)
+    if migrate:
+        try:
+            migrate(db[collection_name])
+        except OperationFailure as e:
+            log("migration_failed", "warn", collection=collection_name, error=str(e))
+    for model in INDEXES.get(collection_name) or []:
+        # one at a time: a conflict on one index must not block the others
+        _create_index(db[collection_name], model)
+    _INDEXED.add(key)
+
+
+_INDEX_CONFLICT = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+
+def _create_index(collection, model: IndexModel) -> None:
+    """
+    Create one index. If an index on the same keys exists with other options
+    (e.g. a plain url_1 where url_unique should be), drop it and create the new
+    one; if that fails too (duplicate data), put the old index back.
+    """
+    spec = model.document
+    try:
+        collection.create_indexes([model])
+        return
+    except OperationFailure as e:
+        if e.code not in _INDEX_CONFLICT:
+            log("index_setup_failed", "warn", collection=collection.name, index=spec["name"], error=str(e))
+            return
+    keys = list(spec["key"].items())
+    old = {name: info for name, info in collection.index_information().items()
+           if name != "_id_" and (name == spec["name"] or list(info["key"]) == keys)}
+    try:
+        for name in old:
+            collection.drop_index(name)
+        collection.create_indexes([model])
+        log("index_replaced", collection=collection.name, index=spec["name"], dropped=sorted(old))
+    except OperationFailure as e:
+        log("index_setup_failed", "warn", collection=collection.name, index=spec["name"], error=str(e))
+        for name, info in old.items():
+            if name in collection.index_information():
+                continue
+            opts = {k: v for k, v in info.items() if k not in ("key", "v", "ns")}
+            collection.create_indexes([IndexModel(info["key"], name=name, **opts)])
+
+class AsyncMongoWriter:
+    """
+    Thread-backed async writer: bulk_write runs on a dedicated thread and the
+    caller only awaits when more than `max_pending` batches are in flight.
+    One thread keeps batches in submission order.
+    """
+
+    def __init__(self, collection, *, max_pending: int = 4):
+        self.collection = collection
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mongo-writer")
+        self._slots = asyncio.Semaphore(max_pending)
+        self._pending: set = set()
+
+    async def submit(self, fn, on_done=None) -> None:
+        """Queue a blocking `fn()` on the writer thread; `on_done(result_or_exception)` runs on completion."""
+        await self._slots.acquire()
+        loop = asyncio.get_running_loop()
+        fut = loop.run_in_executor(self._executor, fn)
+        self._pending.add(fut)
+
+        def _finish(f):
+            self._pending.discard(f)
+            self._slots.release()
+            if on_done is not None:
+                on_done(f.exception() or f.result())
+
+        fut.add_done_callback(_finish)
+
+    async def bulk_write(self, ops: List[UpdateOne], on_done=None) -> None:
+        await self.submit(partial(self.collection.bulk_write, ops, ordered=False), on_done=on_done)
+
+    async def drain(self) -> None:
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    async def aclose(self) -> None:
+        await self.drain()
+        self._executor.shutdown(wait=True)
+
+def upsert_changed(
+    collection,
+    docs: List[Dict[str, Any]],
+    *,
+    key: str = "url",
+    platform: Optional[str] = None,
+    touch_unchanged: bool = True,
+) -> Dict[str, int]:
+    """
+    Fingerprint-aware upsert (blocking; call from a thread in async code).
+      - every doc gets a `content_hash` (common.fingerprint) unless it has one
+      - stored hashes are fetched with one `$in` query per call
+      - only new or changed docs are written; `scraped_at` goes in
+        `$setOnInsert` so the first-seen time survives later updates
+      - unchanged docs get a single `update_many` bumping `last_checked_at`
+        (keeps incremental freshness checks working) unless touch_unchanged=False
+      - docs without a `key` value are skipped (and logged), never upserted on null
+    Returns counts: inserted / changed / unchanged (also in mongo_docs_total).
+    """
+    with span("mongo_write", collection=getattr(collection, "name", "")):
+        counts = _upsert_changed(collection, docs, key, platform, touch_unchanged)
+    for outcome, n in counts.items():
+        inc("mongo_docs_total", n, outcome=outcome)
+    return counts
+
+def _upsert_changed(collection, docs, key, platform, touch_unchanged) -> Dict[str, int]:
+    now = datetime.utcnow()
+    by_key: Dict[Any, Dict[str, Any]] = {}
+    keyless = 0
+    for d in docs:
+        if d.get(key) in (None, ""):
+            keyless += 1
+            continue
+        d = dict(d)
+        d.pop("_id", None)
+        if platform:
+            d.setdefault("platform", platform)
+        d["content_hash"] = d.get("content_hash") or content_hash(d)
+        by_key[d[key]] = d  # last one wins within a batch
+    if keyless:
+        log("upsert_skipped", "warn", collection=getattr(collection, "name", ""), key=key, docs=keyless)
+
+    stored = {
+        row[key]: row.get("content_hash")
+        for row in collection.find({key: {"$in": list(by_key)}}, {key: 1, "content_hash": 1, "_id": 0})
+    }
+
+    ops: List[UpdateOne] = []
+    counts = {"inserted": 0, "changed": 0, "unchanged": 0}
+    unchanged_keys = []
+    for k, d in by_key.items():
+        if k in stored and stored[k] == d["content_hash"]:
+            counts["unchanged"] += 1
+            unchanged_keys.append(k)
+            continue
+        counts["changed" if k in stored else "inserted"] += 1
+        first_seen = d.pop("scraped_at", None) or now
+        ops.append(UpdateOne(
+            {key: k},
+            {
+                "$set": {**d, "last_checked_at": now, "updated_at": now},
+                "$setOnInsert": {"scraped_at": first_seen},
+            },
+            upsert=True,
+        ))
+
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+    if touch_unchanged and unchanged_keys:
+        collection.update_many({key: {"$in": unchanged_keys}}, {"$set": {"last_checked_at": now}})
+    return counts
 
 def add_leads(db, data: Json, platform: str) -> Dict[str, Any]:
     """
     Upsert many leads into the right collection by platform.
     - data: dict or list[dict]
+    - upsert key per PLATFORM_KEY; reddit docs get post_id (from the url if
+      missing) and a canonical url, and are skipped if no post id is found
+    - unchanged docs (same content_hash as stored) are not rewritten
     """
     platform_key = platform.strip().lower()
     collection = PLATFORM_COLLECTION.get(platform_key)
@@ -61,9 +312,10 @@ def add_leads(db, data: Json, platform: str) -> Dict[str, Any]:
         raise ValueError(f"Unknown platform '{platform}'. Supported: {list(PLATFORM_COLLECTION.keys())}")
 
     items: List[Dict[str, Any]] = data if isinstance(data, list) else [data]
-    _ensure_indexes_for(db, collection)
+    key = PLATFORM_KEY.get(platform_key, "url")
+    ensure_indexes(db, collection)
 
-    ops: List[UpdateOne] = []
+    docs: List[Dict[str, Any]] = []
     skipped, errors = 0, []
     for i, d in enumerate(items):
         if not isinstance(d, dict):
@@ -78,26 +330,222 @@ def add_leads(db, data: Json, platform: str) -> Dict[str, Any]:
             errors.append(f"Item {i}: missing 'url'")
             continue
 
-        d.setdefault("platform", platform_key)
-        d.setdefault("scraped_at", datetime.utcnow())
-
-        ops.append(UpdateOne({"url": url}, {"$set": d}, upsert=True))
-
-    inserted_or_upserted = 0
-    if ops:
-        res = db[collection].bulk_write(ops, ordered=False)
-        inserted_or_upserted = (res.upserted_count or 0) + (res.modified_count or 0)
+        doc = {**d, "url": url}
+        if key == "post_id":
+            pid, canon = canonicalize(url)
+            doc["post_id"] = d.get("post_id") or pid
+            if pid:
+                doc["url"] = canon
+            if not doc["post_id"]:
+                skipped += 1
+                errors.append(f"Item {i}: no post id in '{url}'")
+                continue
+        docs.append(doc)
+
+    counts = {"inserted": 0, "changed": 0, "unchanged": 0}
+    if docs:
+        counts = upsert_changed(db[collection], docs, key=key, platform=platform_key)
 
     return {
         "platform": platform_key,
         "collection": collection,
         "total": len(items),
-        "inserted_or_upserted": inserted_or_upserted,
+        "inserted_or_upserted": counts["inserted"] + counts["changed"],
+        **counts,
         "skipped": skipped,
         "errors": errors,
     }
 
-# ---------------- Schema filtering (flat KV) ----------------
+# ---------------- Streaming sink ----------------
+class MongoBatchSink:
+    """
+    Buffered upsert sink for streamed docs.
+      - flushes a `bulk_write` every `batch_size` docs or `flush_interval` seconds,
+        whichever comes first, so a crash loses at most one batch
+      - upserts on `key` (default: PLATFORM_KEY, else "url") via upsert_changed: docs whose
+        content_hash matches the stored one are not rewritten
+      - writes go through AsyncMongoWriter, so the scrape loop only waits when
+        the DB falls several batches behind
+      - collection indexes are applied once per process on enter
+      - `on_flushed(docs)` (optional, blocking) runs on the writer thread after a
+        batch is safely written, e.g. to mark those URLs done in a Frontier;
+        a failed batch never reaches it
+    Use as `async with MongoBatchSink(db, "reddit") as sink: await sink.write(doc)`.
+    """
+
+    def __init__(
+        self,
+        db,
+        platform: str,
+        *,
+        batch_size: int = 500,
+        flush_interval: float = 5.0,
+        key: Optional[str] = None,
+        max_pending: int = 4,
+        on_flushed: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+    ):
+        platform_key = platform.strip().lower()
+        collection = PLATFORM_COLLECTION.get(platform_key)
+        if not collection:
+            raise ValueError(f"Unknown platform '{platform}'. Supported: {list(PLATFORM_COLLECTION.keys())}")
+        self.db = db
+        self.collection_name = collection
+        self.platform = platform_key
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.key = key or PLATFORM_KEY.get(platform_key, "url")
+        self.on_flushed = on_flushed
+        self.stats = {"written": 0, "skipped": 0, "flushes": 0, "errors": 0,
+                      "inserted": 0, "changed": 0, "unchanged": 0}
+        self._buffer: List[Dict[str, Any]] = []
+        self.collection = db[collection]
+        self._writer = AsyncMongoWriter(self.collection, max_pending=max_pending)
+        self._timer: Optional[asyncio.Task] = None
+
+    async def write(self, doc: Dict[str, Any]) -> None:
+        if not isinstance(doc, dict) or not doc.get(self.key):
+            self.stats["skipped"] += 1
+            return
+        self._buffer.append(doc)
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        self.stats["flushes"] += 1
+        await self._writer.submit(partial(self._write_batch, batch), on_done=partial(self._record, len(batch)))
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> Dict[str, int]:
+        counts = upsert_changed(self.collection, batch, key=self.key, platform=self.platform)
+        if self.on_flushed is not None:
+            try:
+                self.on_flushed(batch)
+            except Exception as e:
+                log("on_flushed_failed", "error", docs=len(batch), error=str(e))
+        return counts
+
+    def _record(self, n_docs: int, res) -> None:
+        if isinstance(res, BaseException):
+            self.stats["errors"] += 1
+            log("upsert_failed", "error", docs=n_docs, error=str(res))
+            return
+        self.stats["written"] += n_docs
+        for k, v in res.items():
+            self.stats[k] += v
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def __aenter__(self):
+        await asyncio.to_thread(ensure_indexes, self.db, self.collection_name)
+        self._timer = asyncio.create_task(self._tick())
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._timer is not None:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        await self._writer.aclose()
+
+# ---------------- Incremental scraping ----------------
+def split_fresh_urls(
+    db,
+    urls: List[str],
+    platform: str,
+    *,
+    max_age_seconds: float = 24 * 3600,
+    batch_size: int = 500,
+) -> Dict[str, Any]:
+    """
+    Split `urls` into those already stored with a recent `scraped_at` (skip)
+    and those that need (re)scraping, using batched `$in` lookups.
+    Input order is preserved in both lists. Reddit URLs are canonicalized and
+    matched on post_id, so any variant of a stored post counts as stored.
+    """
+    platform_key = platform.strip().lower()
+    collection = PLATFORM_COLLECTION.get(platform_key)
+    if not collection:
+        raise ValueError(f"Unknown platform '{platform}'. Supported: {list(PLATFORM_COLLECTION.keys())}")
+
+    by_post = PLATFORM_KEY.get(platform_key) == "post_id"
+    if by_post:
+        keys = {u: canonicalize(u)[0] or u for u in canonical_post_urls(urls)}
+    else:
+        keys = {u.strip(): u.strip() for u in urls if u and u.strip()}
+    links = list(keys)
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    # last_checked_at is bumped even when content is unchanged; scraped_at is a
+    # datetime from add_leads, but older docs may hold epoch seconds
+    fresh_filter = {"$or": [
+        {"last_checked_at": {"$gte": cutoff}},
+        {"scraped_at": {"$gte": cutoff}},
+        {"scraped_at": {"$gte": int(cutoff.replace(tzinfo=timezone.utc).timestamp())}},
+    ]}
+
+    field = "post_id" if by_post else "url"
+    values = list(dict.fromkeys(keys.values()))
+    fresh = set()
+    for i in range(0, len(values), batch_size):
+        batch = values[i:i + batch_size]
+        cursor = db[collection].find({field: {"$in": batch}, **fresh_filter}, {field: 1, "_id": 0})
+        fresh.update(doc[field] for doc in cursor)
+
+    return {
+        "to_scrape": [u for u in links if keys[u] not in fresh],
+        "skipped": [u for u in links if keys[u] in fresh],
+    }
+
+# ---------------- Schema filtering ----------------
+# Compiled projectors, LRU of the last _PROJECTORS_MAX keyed on frozen
+# (schema, alias, fill_missing) contents; see get_projector.
+_PROJECTORS: "OrderedDict[tuple, SchemaProjector]" = OrderedDict()
+_PROJECTORS_MAX = 64
+_PROJECTORS_LOCK = threading.Lock()
+
+def _freeze(obj: Any) -> Any:
+    """Hashable, order-independent snapshot of a schema / alias mapping (the cache key)."""
+    if isinstance(obj, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in obj.items()))
+    if isinstance(obj, (list, tuple)):
+        return ("[]",) + tuple(_freeze(v) for v in obj)
+    try:
+        hash(obj)
+        return obj
+    except TypeError:
+        return repr(obj)
+
+def get_projector(
+    schema_obj: Dict[str, Any],
+    alias: Optional[Dict[str, List[str]]] = None,
+    *,
+    fill_missing: bool = True,
+) -> SchemaProjector:
+    """
+    Compile (once) and return the projector for this schema/alias pair.
+    Keyed on the mappings' contents, so equal schemas share one projector and
+    a mutated schema gets a fresh one; the cache keeps the last _PROJECTORS_MAX.
+    """
+    key = (_freeze(schema_obj), _freeze(alias), fill_missing)
+    with _PROJECTORS_LOCK:
+        hit = _PROJECTORS.get(key)
+        if hit is not None:
+            _PROJECTORS.move_to_end(key)
+            return hit
+    hit = compile_schema(schema_obj, alias, fill_missing=fill_missing)
+    with _PROJECTORS_LOCK:
+        _PROJECTORS[key] = hit
+        while len(_PROJECTORS) > _PROJECTORS_MAX:
+            _PROJECTORS.popitem(last=False)
+    return hit
+
 def filter_by_schema(
     data: Dict[str, Any],
     schema_obj: Dict[str, Any],
@@ -106,31 +554,12 @@ def filter_by_schema(
     alias: Optional[Dict[str, List[str]]] = None
 ) -> Dict[str, Any]:
     """
-    Return a new dict restricted to keys in `schema_obj`.
-    - alias: mapping of output_key -> list of possible input keys (merge & dedupe).
+    Return a new dict restricted to the (possibly nested) keys of `schema_obj`.
+    - alias: mapping of dotted output path -> list of possible dotted input
+      paths (merge & dedupe); see common.schema_projector.compile_schema.
+    The projector is compiled once per distinct schema/alias (see get_projector).
     """
-    if alias is None:
-        alias = {}
-
-    out: Dict[str, Any] = {}
-    for out_key in schema_obj.keys():
-        in_keys = alias.get(out_key, [out_key])
-        vals = []
-        for k in in_keys:
-            if k in data and data[k] is not None:
-                vals.append(data[k])
-
-        # dedupe while preserving order
-        uniq = []
-        for v in vals:
-            if v not in uniq:
-                uniq.append(v)
-
-        if uniq:
-            out[out_key] = uniq[0] if len(uniq) == 1 else uniq
-        elif fill_missing:
-            out[out_key] = None
-    return out
+    return get_projector(schema_obj, alias, fill_missing=fill_missing).project(data)
 
 # ---------------- One-call pipeline ----------------
 def process_and_store(
@@ -146,21 +575,17 @@ def process_and_store(
     """
     1) filter to schema (with alias),
     2) insert into Mongo (by platform),
-    3) optionally write JSON to disk,
+    3) optionally stream the docs to `write_path` (format from the extension:
+       .json array, .ndjson[.gz|.zst] / .jsonl, or .parquet; see common.output_sinks),
     4) return the filtered list.
     """
     items = data if isinstance(data, list) else [data]
-    filtered = [
-        filter_by_schema(item, schema_obj, fill_missing=fill_missing, alias=alias or {})
-        for item in items
-        if isinstance(item, dict)
-    ]
+    filtered = get_projector(schema_obj, alias, fill_missing=fill_missing).project_many(items)
 
     add_leads(db, filtered, platform=platform)
 
     if write_path:
-        with open(write_path, "w", encoding="utf-8") as f:
-            json.dump(filtered, f, ensure_ascii=False, indent=2)
+        write_records(write_path, filtered)
 
     return filtered
 
@@ -225,19 +650,17 @@ SCHEMA = {
 
 import json
 from datetime import datetime
-from pymongo import MongoClient
 
 def save_to_mongo(json_list, db_name="leadgen", collection_name="map_leads"):
     """
-    Save a list of schema-shaped JSON docs into MongoDB.
+    Save a list of schema-shaped JSON docs into MongoDB (shared client, MONGO_URI).
     Defaults: db_name='leadgen', collection_name='map_leads'.
     """
     if not json_list:
         print(f"⚠️ No data to save into {collection_name}")
         return []
 
-    client = MongoClient("mongodb://localhost:27017/")
-    db = client[db_name]
+    db = get_client()[db_name]
     collection = db[collection_name]
 
     try:
@@ -253,11 +676,21 @@ def save_to_json(json_list, file_path="output.json"):
     """
     Save a list of schema-shaped JSON docs into a local JSON file.
     Includes a timestamp for when the file was written.
+    .ndjson / .jsonl (+ .gz / .zst) and .parquet paths are streamed one
+    record at a time instead (no wrapper object; see common.output_sinks).
     """
     if not json_list:
         print("⚠️ No data to save to JSON file")
         return []
 
+    if not file_path.lower().endswith(".json"):
+        try:
+            files = write_records(file_path, json_list)
+            print(f"💾 Wrote {len(json_list)} records to {', '.join(files)}")
+        except Exception as e:
+            print(f"⚠️ Failed writing output file: {e}")
+        return json_list
+
     try:
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(
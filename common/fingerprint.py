@@ -0,0 +1,39 @@
+# common/fingerprint.py
+import hashlib
+import json
+from datetime import date, datetime
+from typing import Any, Dict, Iterable
+
+# Bookkeeping fields that change on every run and must not affect the hash.
+VOLATILE_FIELDS = ("_id", "content_hash", "scraped_at", "last_checked_at", "updated_at")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        items = [_normalize(v) for v in value]
+        # scalar lists (emails, links...) are sets in practice: order must not matter
+        if all(isinstance(v, (str, int, float, bool)) or v is None for v in items):
+            return sorted(set(items), key=lambda v: (str(type(v)), str(v)))
+        return items
+    if isinstance(value, str):
+        return " ".join(value.split())
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def content_hash(doc: Dict[str, Any], exclude: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """
+    Stable hash of a doc's normalized content: key order, whitespace runs and
+    scalar-list order don't matter; `exclude`d top-level keys and
+    metadata.scraped_at are ignored.
+    """
+    skip = set(exclude)
+    body = {k: v for k, v in doc.items() if k not in skip}
+    meta = body.get("metadata")
+    if isinstance(meta, dict) and "scraped_at" in meta:
+        body["metadata"] = {k: v for k, v in meta.items() if k != "scraped_at"}
+    canonical = json.dumps(_normalize(body), sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
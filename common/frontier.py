@@ -0,0 +1,186 @@
+# common/frontier.py
+import asyncio
+import sqlite3
+import threading
+import time
+import uuid
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+
+from .metrics import log
+from .reddit_urls import canonicalize
+
+STATES = ("pending", "in_flight", "done", "failed")
+
+
+class Frontier:
+    """
+    Persistent SQLite crawl frontier.
+      - one row per URL: state (pending / in_flight / done / failed),
+        attempt count, last error
+      - enqueue is deduplicated on the canonical URL (common.reddit_urls), so
+        tracking-param / host / trailing-slash variants share one row
+      - opening a frontier moves leftover in_flight rows back to pending, so a
+        killed run resumes exactly where it stopped without redoing done URLs
+      - a failed URL is retried until it reaches `max_attempts`, on a later
+        drain() session: one session never re-offers a URL it already handed out
+    Async callers use the a* wrappers, which run the sqlite calls in a thread.
+    """
+
+    def __init__(self, path: str = ".frontier.sqlite", *, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at REAL NOT NULL,
+                run_id TEXT
+            )
+            """
+        )
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(frontier)")}
+        if "run_id" not in cols:  # frontier files from before drain sessions
+            self._conn.execute("ALTER TABLE frontier ADD COLUMN run_id TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier(state)")
+        resumed = self._conn.execute(
+            "UPDATE frontier SET state = 'pending', updated_at = ? WHERE state = 'in_flight'", (time.time(),)
+        ).rowcount
+        self._conn.commit()
+        if resumed:
+            log("frontier_resumed", in_flight=resumed, path=path)
+
+    def enqueue(self, urls: Iterable[str], chunk_size: int = 10_000) -> int:
+        """Add URLs as pending; already-known URLs are ignored. Returns how many were new."""
+        added = 0
+        chunk: List[tuple] = []
+        for u in urls:
+            link = (u or "").strip()
+            if link:
+                chunk.append((canonicalize(link)[1], time.time()))
+            if len(chunk) >= chunk_size:
+                added += self._insert(chunk)
+                chunk = []
+        if chunk:
+            added += self._insert(chunk)
+        return added
+
+    def enqueue_file(self, path: str, chunk_size: int = 10_000) -> int:
+        """Stream a one-URL-per-line file into the frontier."""
+        with open(path, "r", encoding="utf-8") as f:
+            return self.enqueue(f, chunk_size=chunk_size)
+
+    def _insert(self, rows: List[tuple]) -> int:
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT OR IGNORE INTO frontier (url, updated_at) VALUES (?, ?)", rows)
+            self._conn.commit()
+            return self._conn.total_changes - before
+
+    def claim(self, n: int = 100, run_id: Optional[str] = None) -> List[str]:
+        """
+        Move up to `n` pending URLs (oldest first) to in_flight and return them.
+        With `run_id`, URLs already claimed under that id are skipped, so a
+        failure put back to pending waits for the next session.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url FROM frontier WHERE state = 'pending' AND (? IS NULL OR run_id IS NULL OR run_id != ?) "
+                "ORDER BY rowid LIMIT ?",
+                (run_id, run_id, n),
+            ).fetchall()
+            urls = [r[0] for r in rows]
+            if urls:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE frontier SET state = 'in_flight', attempts = attempts + 1, updated_at = ?, run_id = ? "
+                    "WHERE url = ?",
+                    [(now, run_id, u) for u in urls],
+                )
+                self._conn.commit()
+            return urls
+
+    def drain(self, batch_size: int = 100) -> Iterator[str]:
+        """Yield claimed URLs batch by batch until nothing is pending for this session."""
+        run_id = uuid.uuid4().hex
+        while True:
+            batch = self.claim(batch_size, run_id)
+            if not batch:
+                return
+            yield from batch
+
+    async def adrain(self, batch_size: int = 100) -> AsyncIterator[str]:
+        """drain() for async consumers: each claim runs in a thread."""
+        run_id = uuid.uuid4().hex
+        while True:
+            batch = await asyncio.to_thread(self.claim, batch_size, run_id)
+            if not batch:
+                return
+            for url in batch:
+                yield url
+
+    def mark_done(self, url: str) -> None:
+        self.mark_done_many([url])
+
+    def mark_done_many(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE frontier SET state = 'done', last_error = NULL, updated_at = ? WHERE url = ?",
+                [(now, u) for u in urls],
+            )
+            self._conn.commit()
+
+    def release(self, url: str) -> None:
+        """
+        Hand an in_flight URL back untouched (a consumer dropped it): pending again,
+        attempt not counted; its run_id stays, so the same session won't re-offer it.
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE frontier SET state = 'pending', attempts = MAX(attempts - 1, 0), "
+                "updated_at = ? WHERE url = ? AND state = 'in_flight'",
+                (time.time(), url),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, url: str, error: Optional[str] = None) -> None:
+        """Record a failure; the URL goes back to pending until max_attempts is reached."""
+        with self._lock:
+            self._conn.execute(
+                """
+                UPDATE frontier
+                SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    last_error = ?, updated_at = ?
+                WHERE url = ?
+                """,
+                (self.max_attempts, error, time.time(), url),
+            )
+            self._conn.commit()
+
+    async def amark_done_many(self, urls: Iterable[str]) -> None:
+        await asyncio.to_thread(self.mark_done_many, list(urls))
+
+    async def amark_failed(self, url: str, error: Optional[str] = None) -> None:
+        await asyncio.to_thread(self.mark_failed, url, error)
+
+    async def arelease(self, url: str) -> None:
+        await asyncio.to_thread(self.release, url)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM frontier GROUP BY state").fetchall()
+        out = {s: 0 for s in STATES}
+        out.update(dict(rows))
+        out["total"] = sum(out[s] for s in STATES)
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+# common/html_parser.py
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .metrics import log
+
+# Optional fast backends; BeautifulSoup is the always-available fallback.
+try:
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+try:
+    import lxml.html as _lxml_html
+    import cssselect as _cssselect  # noqa: F401  (lxml's .cssselect needs it)
+except ImportError:
+    _lxml_html = None
+
+try:
+    import lxml  # noqa: F401
+    _BS4_FEATURES = "lxml"
+except ImportError:
+    _BS4_FEATURES = "html.parser"
+
+_INVISIBLE_TAGS = ["script", "style", "noscript"]
+
+
+class ParsedDoc:
+    """
+    Minimal CSS-select interface shared by every backend:
+      - select_one(sel) -> node or None
+      - select(sel) -> list of nodes
+      - text(node) -> stripped text, attr(node, name) -> attribute or None
+      - visible_text() -> page text without script/style/noscript
+    """
+
+    def select_one(self, sel: str):
+        found = self.select(sel)
+        return found[0] if found else None
+
+    def select(self, sel: str) -> List:
+        raise NotImplementedError
+
+    def text(self, node) -> str:
+        raise NotImplementedError
+
+    def attr(self, node, name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def visible_text(self) -> str:
+        raise NotImplementedError
+
+
+class _SelectolaxDoc(ParsedDoc):
+    def __init__(self, html: str):
+        self.tree = _SelectolaxParser(html)
+
+    def select_one(self, sel: str):
+        return self.tree.css_first(sel)
+
+    def select(self, sel: str) -> List:
+        return self.tree.css(sel)
+
+    def text(self, node) -> str:
+        return node.text(strip=True)
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.attributes.get(name)
+
+    def visible_text(self) -> str:
+        self.tree.strip_tags(_INVISIBLE_TAGS)
+        root = self.tree.body or self.tree.root
+        return root.text(separator=" ") if root is not None else ""
+
+
+class _LxmlDoc(ParsedDoc):
+    def __init__(self, html: str):
+        self.root = _lxml_html.fromstring(html) if html.strip() else _lxml_html.fromstring("<html></html>")
+
+    def select(self, sel: str) -> List:
+        return self.root.cssselect(sel)
+
+    def text(self, node) -> str:
+        return "".join(t.strip() for t in node.itertext())
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def visible_text(self) -> str:
+        for node in self.root.xpath("//script|//style|//noscript"):
+            node.drop_tree()
+        return " ".join(self.root.itertext())
+
+
+class _Bs4Doc(ParsedDoc):
+    def __init__(self, html: str):
+        from bs4 import BeautifulSoup
+        self.soup = BeautifulSoup(html, _BS4_FEATURES)
+
+    def select_one(self, sel: str):
+        return self.soup.select_one(sel)
+
+    def select(self, sel: str) -> List:
+        return self.soup.select(sel)
+
+    def text(self, node) -> str:
+        return node.get_text(strip=True)
+
+    def attr(self, node, name: str) -> Optional[str]:
+        return node.get(name)
+
+    def visible_text(self) -> str:
+        for node in self.soup(_INVISIBLE_TAGS):
+            node.decompose()
+        return self.soup.get_text(" ")
+
+
+# fastest first; "auto" picks the first one that imported
+BACKENDS: Dict[str, Tuple[Optional[object], Callable[[str], ParsedDoc]]] = {
+    "selectolax": (_SelectolaxParser, _SelectolaxDoc),
+    "lxml": (_lxml_html, _LxmlDoc),
+    "bs4": (True, _Bs4Doc),
+}
+
+
+_WARNED = set()
+
+
+def available_backends() -> List[str]:
+    return [name for name, (mod, _) in BACKENDS.items() if mod is not None]
+
+
+def resolve_backend(name: Optional[str] = "auto") -> str:
+    """Map "auto"/None to the fastest installed backend; unknown or missing names fall back to bs4."""
+    if name in (None, "auto"):
+        return available_backends()[0]
+    if name in BACKENDS and BACKENDS[name][0] is not None:
+        return name
+    if name not in _WARNED:
+        _WARNED.add(name)
+        log("parser_unavailable", "warn", backend=name, fallback="bs4")
+    return "bs4"
+
+
+def parse_html(html: str, backend: Optional[str] = "auto") -> ParsedDoc:
+    return BACKENDS[resolve_backend(backend)][1](html or "")
+
+
+class ParseStats:
+    """Thread-safe per-backend tally of parse calls and time (ms)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = {}
+
+    def record(self, backend: str, elapsed_ms: float) -> None:
+        with self._lock:
+            row = self._data.setdefault(backend, {"pages": 0, "total_ms": 0.0, "max_ms": 0.0})
+            row["pages"] += 1
+            row["total_ms"] += elapsed_ms
+            row["max_ms"] = max(row["max_ms"], elapsed_ms)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "pages": int(row["pages"]),
+                    "total_ms": round(row["total_ms"], 1),
+                    "avg_ms": round(row["total_ms"] / row["pages"], 2) if row["pages"] else 0.0,
+                    "max_ms": round(row["max_ms"], 1),
+                }
+                for name, row in self._data.items()
+            }
+
+
+PARSE_STATS = ParseStats()
+
+
+def timed_parse(html: str, backend: Optional[str] = "auto") -> Tuple[ParsedDoc, str, float]:
+    """parse_html plus (backend used, parse time in ms)."""
+    name = resolve_backend(backend)
+    started = time.perf_counter()
+    doc = BACKENDS[name][1](html or "")
+    return doc, name, (time.perf_counter() - started) * 1000
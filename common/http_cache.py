@@ -0,0 +1,277 @@
+# common/http_cache.py
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+import httpx
+
+CACHE_MODES = ("readwrite", "replay")
+
+# Responses worth keeping; redirects are stored so replay can follow them offline.
+CACHEABLE_STATUS = (200, 301, 302, 307, 308)
+
+# Body is stored decoded, so transfer-level headers no longer apply.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+
+def cache_key(url: str) -> str:
+    """Canonical cache key: lowercased scheme/host, sorted query, no fragment."""
+    u = urlparse(url.strip())
+    query = urlencode(sorted(parse_qsl(u.query, keep_blank_values=True)))
+    return urlunparse(((u.scheme or "https").lower(), u.netloc.lower(), u.path or "/", "", query, ""))
+
+
+class ResponseCache:
+    """
+    Persistent SQLite response cache.
+      - ttl_seconds: entries younger than this are served without any request
+      - max_bytes: total body size cap; least-recently-used entries are evicted
+      - stale entries are revalidated with ETag / Last-Modified (304 = no body)
+      - mode="replay": read-only, never touches the network (misses become 504)
+    Thread-safe; async callers go through the a* wrappers, which run in a thread.
+    """
+
+    def __init__(
+        self,
+        path: str = ".http_cache.sqlite",
+        *,
+        ttl_seconds: float = 6 * 3600,
+        max_bytes: int = 1024 * 1024 * 1024,
+        mode: str = "readwrite",
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'. Supported: {list(CACHE_MODES)}")
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at)")
+        self._conn.commit()
+        # running body-size total, so put() doesn't SUM the whole table
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @property
+    def read_only(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for revalidating a stale entry."""
+        headers: Dict[str, str] = {}
+        if entry is not None:
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get(self, url: str) -> Optional[Dict]:
+        key = cache_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, etag, last_modified, stored_at FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if not self.read_only:
+                self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        status, headers, body, etag, last_modified, stored_at = row
+        return {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": (time.time() - stored_at) < self.ttl_seconds,
+        }
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        if self.read_only or status not in CACHEABLE_STATUS:
+            return
+        headers = {k.lower(): v for k, v in headers.items() if k.lower() not in _DROP_HEADERS}
+        now = time.time()
+        key = cache_key(url)
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key, status, json.dumps(headers), body,
+                    headers.get("etag"), headers.get("last-modified"),
+                    now, now, len(body),
+                ),
+            )
+            self._bytes += len(body) - (old[0] if old else 0)
+            self._evict_locked()
+            self._conn.commit()
+
+    def touch(self, url: str) -> None:
+        """Mark an entry fresh again (after a 304)."""
+        if self.read_only:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, cache_key(url))
+            )
+            self._conn.commit()
+
+    def _evict_locked(self, batch: int = 256) -> None:
+        # least recently used first, a page of rows at a time
+        while self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM responses ORDER BY accessed_at ASC LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                self._bytes = 0
+                return
+            doomed = []
+            for key, size in rows:
+                if self._bytes <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                self._bytes -= size
+            self._conn.executemany("DELETE FROM responses WHERE key = ?", doomed)
+
+    async def aget(self, url: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self.get, url)
+
+    async def aput(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        await asyncio.to_thread(self.put, url, status, headers, body)
+
+    async def atouch(self, url: str) -> None:
+        await asyncio.to_thread(self.touch, url)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            size = self._bytes
+        return {
+            "mode": self.mode,
+            "entries": count,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachedResponse:
+    """Minimal requests-style response (status_code / headers / content / text / url)."""
+
+    def __init__(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        self.url = url
+        self.status_code = status
+        self.headers = headers
+        self.content = body
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+def cached_get(session, url: str, cache: Optional[ResponseCache], timeout: float = 20) -> CachedResponse:
+    """
+    Blocking GET through `cache` for requests.Session callers; same rules as
+    CachingTransport (fresh hit, conditional revalidation, replay misses -> 504).
+    """
+    if cache is None:
+        resp = session.get(url, timeout=timeout)
+        return CachedResponse(resp.url, resp.status_code, dict(resp.headers), resp.content)
+    entry = cache.get(url)
+    if entry is not None and (entry["fresh"] or cache.read_only):
+        cache.hits += 1
+        return CachedResponse(url, entry["status"], entry["headers"], entry["body"])
+    if cache.read_only:
+        cache.misses += 1
+        return CachedResponse(url, 504, {}, b"not in replay cache")
+    resp = session.get(url, headers=cache.conditional_headers(entry), timeout=timeout)
+    if resp.status_code == 304 and entry is not None:
+        cache.revalidated += 1
+        cache.touch(url)
+        return CachedResponse(url, entry["status"], entry["headers"], entry["body"])
+    cache.misses += 1
+    cache.put(url, resp.status_code, dict(resp.headers), resp.content)
+    return CachedResponse(resp.url, resp.status_code, dict(resp.headers), resp.content)
+
+
+def _cached_response(entry: Dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"], request=request)
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers GETs from a ResponseCache before hitting the network."""
+
+    def __init__(self, cache: ResponseCache, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.cache = cache
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "GET":
+            return await self.inner.handle_async_request(request)
+
+        url = str(request.url)
+        entry = await self.cache.aget(url)
+
+        if self.cache.read_only:
+            if entry is None:
+                self.cache.misses += 1
+                return httpx.Response(504, content=b"not in replay cache", request=request)
+            self.cache.hits += 1
+            return _cached_response(entry, request)
+
+        if entry is not None and entry["fresh"]:
+            self.cache.hits += 1
+            return _cached_response(entry, request)
+
+        request.headers.update(self.cache.conditional_headers(entry))
+
+        resp = await self.inner.handle_async_request(request)
+        if resp.status_code == 304 and entry is not None:
+            await resp.aclose()
+            self.cache.revalidated += 1
+            await self.cache.atouch(url)
+            return _cached_response(entry, request)
+
+        self.cache.misses += 1
+        body = await resp.aread()
+        await resp.aclose()
+        await self.cache.aput(url, resp.status_code, dict(resp.headers), body)
+        headers = {k: v for k, v in resp.headers.items() if k.lower() not in _DROP_HEADERS}
+        return httpx.Response(resp.status_code, headers=headers, content=body, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
@@ -0,0 +1,47 @@
+# common/http_client.py
+import httpx
+from .http_cache import CachingTransport
+from .rate_limiter import ThrottledTransport, get_scheduler
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+def get_async_client(
+    concurrency: int = 8,
+    timeout: float = 20.0,
+    headers: dict = None,
+    cache=None,
+    scheduler=None,
+) -> httpx.AsyncClient:
+    """
+    Return a pooled keep-alive httpx.AsyncClient.
+      - connection pool sized to `concurrency` so sockets are reused across URLs
+      - follows redirects (same as requests.get)
+      - every network request is paced by a per-host HostScheduler
+        (common.rate_limiter; process-wide default unless `scheduler` is given)
+      - optional common.http_cache.ResponseCache in front of that, so cache
+        hits cost no tokens
+    Caller is responsible for `await client.aclose()` (or `async with`).
+    """
+    limits = httpx.Limits(
+        max_connections=concurrency,
+        max_keepalive_connections=concurrency,
+        keepalive_expiry=30.0,
+    )
+    transport = ThrottledTransport(httpx.AsyncHTTPTransport(limits=limits), scheduler or get_scheduler())
+    if cache is not None:
+        transport = CachingTransport(cache, transport)
+    return httpx.AsyncClient(
+        headers={**DEFAULT_HEADERS, **(headers or {})},
+        limits=limits,
+        transport=transport,
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+    )
@@ -0,0 +1,121 @@
+# common/listing_cursors.py
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class ListingCursors:
+    """
+    Persistent "newest seen" watermark per (subreddit, sort), in SQLite.
+      - get() -> {"post_id", "created_utc", "updated_at", "resume_after",
+        "pending_post_id", "pending_created_utc"} or None
+      - set() only ever moves the watermark forward (newer created_utc) and
+        clears any resume cursor
+      - set_resume() is for a walk that stopped (max_pages) before reaching the
+        watermark: the watermark stays, the listing `after` cursor to continue
+        from and the newest post of the unfinished walk are kept until a later
+        walk reaches the watermark, which then advances to that newest post
+    A crawl commits the watermark once its URLs are safely handed off
+    (frontier or finished scrape), so a crash re-discovers rather than skips.
+    """
+
+    def __init__(self, path: str = ".listing_cursors.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS listing_cursors (
+                subreddit TEXT NOT NULL,
+                sort TEXT NOT NULL,
+                post_id TEXT NOT NULL,
+                created_utc REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                resume_after TEXT,
+                pending_post_id TEXT,
+                pending_created_utc REAL,
+                PRIMARY KEY (subreddit, sort)
+            )
+            """
+        )
+        cols = {r[1] for r in self._conn.execute("PRAGMA table_info(listing_cursors)")}
+        for col, ctype in (("resume_after", "TEXT"), ("pending_post_id", "TEXT"), ("pending_created_utc", "REAL")):
+            if col not in cols:  # cursor files from before resumable walks
+                self._conn.execute(f"ALTER TABLE listing_cursors ADD COLUMN {col} {ctype}")
+        self._conn.commit()
+
+    def get(self, subreddit: str, sort: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT post_id, created_utc, updated_at, resume_after, pending_post_id, pending_created_utc "
+                "FROM listing_cursors WHERE subreddit = ? AND sort = ?",
+                (subreddit.lower(), sort),
+            ).fetchone()
+        if row is None:
+            return None
+        # a first walk that never finished has a resume cursor but no watermark yet
+        return {"post_id": row[0] or None, "created_utc": row[1] or None, "updated_at": row[2],
+                "resume_after": row[3], "pending_post_id": row[4], "pending_created_utc": row[5]}
+
+    def set(self, subreddit: str, sort: str, post_id: str, created_utc: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO listing_cursors (subreddit, sort, post_id, created_utc, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(subreddit, sort) DO UPDATE SET
+                    post_id = CASE WHEN excluded.created_utc >= listing_cursors.created_utc
+                                   THEN excluded.post_id ELSE listing_cursors.post_id END,
+                    created_utc = MAX(excluded.created_utc, listing_cursors.created_utc),
+                    updated_at = excluded.updated_at,
+                    resume_after = NULL, pending_post_id = NULL, pending_created_utc = NULL
+                """,
+                (subreddit.lower(), sort, post_id, float(created_utc), time.time()),
+            )
+            self._conn.commit()
+
+    def set_resume(self, subreddit: str, sort: str, after: str,
+                   post_id: Optional[str] = None, created_utc: Optional[float] = None) -> None:
+        """Keep the watermark; remember where the unfinished walk stopped and its newest post."""
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO listing_cursors (subreddit, sort, post_id, created_utc, updated_at,
+                                             resume_after, pending_post_id, pending_created_utc)
+                VALUES (?, ?, '', 0, ?, ?, ?, ?)
+                ON CONFLICT(subreddit, sort) DO UPDATE SET
+                    updated_at = excluded.updated_at,
+                    resume_after = excluded.resume_after,
+                    pending_post_id = CASE WHEN listing_cursors.pending_created_utc IS NULL
+                                             OR excluded.pending_created_utc > listing_cursors.pending_created_utc
+                                           THEN excluded.pending_post_id ELSE listing_cursors.pending_post_id END,
+                    pending_created_utc = MAX(COALESCE(excluded.pending_created_utc, 0),
+                                              COALESCE(listing_cursors.pending_created_utc, 0))
+                """,
+                (subreddit.lower(), sort, time.time(), after, post_id,
+                 float(created_utc) if created_utc is not None else None),
+            )
+            self._conn.commit()
+
+    def clear_resume(self, subreddit: str, sort: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE listing_cursors SET resume_after = NULL, pending_post_id = NULL, pending_created_utc = NULL "
+                "WHERE subreddit = ? AND sort = ?",
+                (subreddit.lower(), sort),
+            )
+            self._conn.commit()
+
+    def reset(self, subreddit: Optional[str] = None) -> None:
+        with self._lock:
+            if subreddit:
+                self._conn.execute("DELETE FROM listing_cursors WHERE subreddit = ?", (subreddit.lower(),))
+            else:
+                self._conn.execute("DELETE FROM listing_cursors")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
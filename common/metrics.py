@@ -0,0 +1,250 @@
+# common/metrics.py
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Tuple
+
+PREFIX = "scraper_"
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    "stage_duration_seconds": "Wall time per pipeline stage (navigate, selector_wait, parse, contacts, merge, mongo_write, http).",
+    "stage_errors_total": "Exceptions raised inside a timed stage, by exception type.",
+    "retries_total": "Retried requests/navigations, by stage and reason.",
+    "timeouts_total": "Timeouts, by stage.",
+    "selector_failures_total": "Selector lookups that found nothing (selectors mode), by field and selector.",
+    "field_missing_total": "Records where a key field came back empty, by tier and field.",
+    "extraction_failures_total": "Records carrying an extraction error, by tier.",
+    "http_responses_total": "HTTP responses seen by the throttled transport, by status.",
+    "mongo_docs_total": "Docs passed to upsert_changed, by outcome.",
+    "browser_restarts_total": "Browser relaunches after the previous process died.",
+    "context_recycles_total": "Pooled browser contexts replaced after N uses or M MB of JS heap.",
+    "listing_pages_total": "Subreddit listing pages fetched by discovery, by sort.",
+    "service_batches_total": "URL batches served by the long-running scraper service.",
+    "service_batches_rejected_total": "URL batches the scraper service refused, by reason (too_large: over max_batch).",
+    "harvest_responses_total": "JSON XHR/fetch responses inspected by network-mode extraction.",
+    "sink_records_total": "Docs written by the file output sinks, by format.",
+    "sink_files_total": "Output files completed (closed and renamed) by the file sinks, by format.",
+    "sink_values_dropped_total": "Values nulled because they didn't fit their Parquet column type, by format.",
+    "harvest_fields_total": "Key post fields filled in network mode, by source (network payload or DOM fallback).",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "n")
+
+    def __init__(self):
+        self.counts = [0] * (len(DURATION_BUCKETS) + 1)
+        self.total = 0.0
+        self.n = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(DURATION_BUCKETS, value)] += 1
+        self.total += value
+        self.n += 1
+
+
+class MetricsRegistry:
+    """
+    In-process counters and duration histograms (thread-safe).
+      - inc(name, value, **labels) / observe(name, seconds, **labels)
+      - render_prometheus() -> text exposition format
+      - snapshot() -> plain dict (for stats / JSON output)
+    One registry per process; with sharded runs each worker keeps its own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = _key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(seconds)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        def _label_str(key: LabelKey) -> str:
+            return ",".join(f"{k}={v}" for k, v in key) or "_"
+
+        with self._lock:
+            return {
+                "counters": {
+                    name: {_label_str(k): v for k, v in series.items()}
+                    for name, series in self._counters.items()
+                },
+                "durations": {
+                    name: {
+                        _label_str(k): {"count": h.n, "sum_s": round(h.total, 4),
+                                        "avg_ms": round(h.total / h.n * 1000, 2) if h.n else 0.0}
+                        for k, h in series.items()
+                    }
+                    for name, series in self._histograms.items()
+                },
+            }
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{full}{_fmt_labels(key)} {_fmt_num(value)}")
+            for name, series in sorted(self._histograms.items()):
+                full = PREFIX + name
+                lines.append(f"# HELP {full} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {full} histogram")
+                for key, h in sorted(series.items()):
+                    running = 0
+                    for bound, count in zip(DURATION_BUCKETS + (float("inf"),), h.counts):
+                        running += count
+                        le = "+Inf" if bound == float("inf") else _fmt_num(bound)
+                        lines.append(f"{full}_bucket{_fmt_labels(key + (('le', le),))} {running}")
+                    lines.append(f"{full}_sum{_fmt_labels(key)} {_fmt_num(h.total)}")
+                    lines.append(f"{full}_count{_fmt_labels(key)} {h.n}")
+        return "\n".join(lines) + "\n"
+
+
+def _fmt_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    esc = lambda v: v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in key) + "}"
+
+
+def _fmt_num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(round(v, 6))
+
+
+METRICS = MetricsRegistry()
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    METRICS.inc(name, value, **labels)
+
+
+@contextmanager
+def span(stage: str, **labels) -> Iterator[None]:
+    """
+    Time a block into stage_duration_seconds{stage=...}; works around awaits too.
+    Exceptions are counted in stage_errors_total and re-raised.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        METRICS.inc("stage_errors_total", stage=stage, error=type(e).__name__, **labels)
+        raise
+    finally:
+        METRICS.observe("stage_duration_seconds", time.perf_counter() - started, stage=stage, **labels)
+
+
+def timed(stage: str, **labels):
+    """Decorator form of span() for plain (sync) functions."""
+
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return deco
+
+
+def count_missing(record: Dict, tier: str, fields=("title", "author", "subreddit", "content")) -> None:
+    """Tally empty key fields and extraction errors on one raw record."""
+    if record.get("error"):
+        METRICS.inc("extraction_failures_total", tier=tier)
+    for f in fields:
+        if record.get(f) in (None, "", []):
+            METRICS.inc("field_missing_total", tier=tier, field=f)
+
+
+def write_prometheus(path: str) -> None:
+    """Atomically write the text exposition (for node_exporter's textfile collector)."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(METRICS.render_prometheus())
+    os.replace(tmp, path)
+
+
+def start_metrics_server(port: int = 9108, addr: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve GET /metrics from a daemon thread; call .shutdown() to stop."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = METRICS.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+# ---------------- Structured logs ----------------
+_LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+_LOG_FORMAT = os.getenv("SCRAPER_LOG_FORMAT", "json").lower()  # json | text
+_LOG_LEVEL = _LEVELS.get(os.getenv("SCRAPER_LOG_LEVEL", "info").lower(), 20)
+_LOG_LOCK = threading.Lock()
+
+
+def log(event: str, level: str = "info", **fields) -> None:
+    """
+    One log line per event on stderr.
+      - SCRAPER_LOG_FORMAT=json (default): {"ts", "level", "event", **fields}
+      - SCRAPER_LOG_FORMAT=text: "[level] event k=v ..."
+      - SCRAPER_LOG_LEVEL filters (debug/info/warn/error)
+    """
+    if _LEVELS.get(level, 20) < _LOG_LEVEL:
+        return
+    if _LOG_FORMAT == "text":
+        line = f"[{level}] {event} " + " ".join(f"{k}={v}" for k, v in fields.items())
+    else:
+        line = json.dumps(
+            {"ts": datetime.now(timezone.utc).isoformat(timespec="milliseconds"), "level": level,
+             "event": event, **fields},
+            default=str, ensure_ascii=False,
+        )
+    with _LOG_LOCK:
+        print(line, file=sys.stderr, flush=True)
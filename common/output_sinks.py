@@ -0,0 +1,378 @@
+# common/output_sinks.py
+import gzip
+import io
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from .metrics import inc, log
+
+# Optional: zstd for NDJSON, pyarrow for Parquet. Only needed when asked for.
+try:
+    import zstandard as _zstd
+except ImportError:
+    _zstd = None
+
+try:
+    import pyarrow as _pa
+    import pyarrow.parquet as _pq
+except ImportError:
+    _pa = None
+    _pq = None
+
+COMPRESSIONS = (None, "gzip", "zstd")
+_EXT = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def flatten_doc(doc: Dict[str, Any], sep: str = ".", prefix: str = "") -> Dict[str, Any]:
+    """
+    Nested dicts -> one level with dotted keys ({"post": {"title": x}} -> {"post.title": x}),
+    the same paths the schema aliases use. Lists stay lists (list columns in Parquet).
+    """
+    out: Dict[str, Any] = {}
+    for k, v in doc.items():
+        key = f"{prefix}{sep}{k}" if prefix else str(k)
+        if isinstance(v, dict):
+            if v:
+                out.update(flatten_doc(v, sep, key))
+            else:
+                out[key] = None  # an empty struct has no columns to give
+        else:
+            out[key] = v
+    return out
+
+
+def _json_default(v: Any) -> Any:
+    if isinstance(v, datetime):
+        return v.isoformat()
+    return str(v)
+
+
+EXTRA_COLUMN = "_extra"  # Parquet: JSON of any fields the schema has no column for
+
+
+def template_schema(template: Dict[str, Any], types: Optional[Dict[str, str]] = None, sep: str = "."):
+    """
+    Parquet schema for docs shaped like `template` (a nested template such as
+    REDDIT_DOC_TEMPLATE), one column per flatten_doc path:
+      "" -> string, [] -> list<string>, bool / int / float -> bool / int64 / float64,
+      None -> string unless `types` names it ({"engagement.num_upvotes": "int64"})
+    `types` may also add columns the template lacks; EXTRA_COLUMN is appended.
+    """
+    if _pa is None:
+        raise ImportError("Parquet output needs the 'pyarrow' package")
+    types = dict(types or {})
+    fields = []
+    for name, v in flatten_doc(template, sep).items():
+        if name in types:
+            t = _pa.type_for_alias(types.pop(name))
+        elif isinstance(v, bool):
+            t = _pa.bool_()
+        elif isinstance(v, int):
+            t = _pa.int64()
+        elif isinstance(v, float):
+            t = _pa.float64()
+        elif isinstance(v, list):
+            t = _pa.list_(_pa.string())
+        else:
+            t = _pa.string()
+        fields.append(_pa.field(name, t))
+    fields += [_pa.field(name, _pa.type_for_alias(t)) for name, t in types.items()]
+    return _pa.schema(fields + [_pa.field(EXTRA_COLUMN, _pa.string())])
+
+
+def _coerce(v: Any, t) -> Any:
+    """Fit one value to a column type; values that can't be (e.g. "n/a" for int64) become None."""
+    if v is None:
+        return None
+    if _pa.types.is_list(t) or _pa.types.is_large_list(t):
+        items = v if isinstance(v, (list, tuple)) else [v]
+        return [_coerce(x, t.value_type) for x in items]
+    if _pa.types.is_struct(t):
+        return {f.name: _coerce(v.get(f.name), f.type) for f in t} if isinstance(v, dict) else None
+    if _pa.types.is_string(t) or _pa.types.is_large_string(t):
+        return v if isinstance(v, str) else json.dumps(v, ensure_ascii=False, default=_json_default)
+    try:
+        if _pa.types.is_boolean(t):
+            return v if isinstance(v, bool) else None
+        if _pa.types.is_integer(t):
+            return int(v)
+        if _pa.types.is_floating(t):
+            return float(v)
+    except (TypeError, ValueError):
+        inc("sink_values_dropped_total", format="parquet")
+        return None
+    return v
+
+
+class _RotatingSink:
+    """
+    Append-only file sink with optional rotation.
+      - no rotation: writes exactly `path`
+      - rotate_bytes / rotate_seconds: writes numbered parts next to it,
+        <stem>-<utc open time>-<n><ext>, starting a new part once the current
+        one reaches either limit (size is measured on disk, after compression)
+      - each file is written as <name>.part and renamed when closed, so
+        downstream jobs only ever pick up complete files
+    Use as `with sink: sink.write(doc)`; `files` lists the finished paths.
+    """
+
+    fmt = ""
+
+    def __init__(self, path: str, *, rotate_bytes: Optional[int] = None, rotate_seconds: Optional[float] = None):
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.files: List[str] = []
+        self.records = 0
+        self._part = 0
+        self._raw = None
+        self._name: Optional[str] = None
+        self._opened_at = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(path)) or ".", exist_ok=True)
+
+    # -- hooks for subclasses --
+    def _open_file(self, raw) -> None:
+        raise NotImplementedError
+
+    def _write(self, doc: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _close_file(self) -> None:
+        raise NotImplementedError
+
+    # -- rotation --
+    def _rotating(self) -> bool:
+        return bool(self.rotate_bytes or self.rotate_seconds)
+
+    def _next_name(self) -> str:
+        if not self._rotating():
+            return self.path
+        self._part += 1
+        base = os.path.basename(self.path)
+        stem, ext = base.split(".", 1) if "." in base else (base, "")
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        name = f"{stem}-{stamp}-{self._part:04d}" + (f".{ext}" if ext else "")
+        return os.path.join(os.path.dirname(self.path), name)
+
+    def _open(self) -> None:
+        self._name = self._next_name()
+        self._raw = open(self._name + ".part", "wb")
+        self._opened_at = time.monotonic()
+        self._open_file(self._raw)
+
+    def _finish(self) -> None:
+        if self._raw is None:
+            return
+        self._close_file()
+        self._raw.close()
+        self._raw = None
+        os.replace(self._name + ".part", self._name)
+        self.files.append(self._name)
+        inc("sink_files_total", format=self.fmt)
+        log("sink_file_closed", format=self.fmt, path=self._name)
+
+    def _due(self) -> bool:
+        if self.rotate_bytes and self._raw.tell() >= self.rotate_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.monotonic() - self._opened_at >= self.rotate_seconds
+
+    # -- public --
+    def write(self, doc: Dict[str, Any]) -> None:
+        if self._raw is None:
+            self._open()
+        self._write(doc)
+        self.records += 1
+        inc("sink_records_total", format=self.fmt)
+        if self._rotating() and self._due():
+            self._finish()
+
+    def write_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        n = 0
+        for d in docs:
+            self.write(d)
+            n += 1
+        return n
+
+    def close(self) -> None:
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class NDJSONSink(_RotatingSink):
+    """
+    Newline-delimited JSON, one compact doc per line, optionally gzip / zstd
+    compressed (the extension is added if `path` lacks it). Lines are written
+    as they arrive, so memory stays at one doc however long the run.
+    """
+
+    fmt = "ndjson"
+
+    def __init__(self, path: str, *, compression: Optional[str] = None, level: Optional[int] = None, **rotate):
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unknown compression '{compression}'. Supported: {list(COMPRESSIONS)}")
+        if compression == "zstd" and _zstd is None:
+            raise ImportError("zstd output needs the 'zstandard' package")
+        if not path.endswith(_EXT[compression]):
+            path += _EXT[compression]
+        super().__init__(path, **rotate)
+        self.compression = compression
+        self.level = level
+        self._out = None
+
+    def _open_file(self, raw) -> None:
+        if self.compression == "gzip":
+            # name the member after the final file, not the .part being written
+            self._out = gzip.GzipFile(filename=os.path.basename(self._name), fileobj=raw, mode="wb",
+                                      compresslevel=self.level or 6)
+        elif self.compression == "zstd":
+            self._out = _zstd.ZstdCompressor(level=self.level or 3).stream_writer(raw, closefd=False)
+        else:
+            self._out = raw
+
+    def _write(self, doc: Dict[str, Any]) -> None:
+        line = json.dumps(doc, ensure_ascii=False, separators=(",", ":"), default=_json_default)
+        self._out.write(line.encode("utf-8") + b"\n")
+
+    def _close_file(self) -> None:
+        if self._out is not self._raw:
+            self._out.close()
+        self._out = None
+
+
+class JSONArraySink(_RotatingSink):
+    """Pretty-printed JSON array, streamed doc by doc (the legacy reddit_output.json shape)."""
+
+    fmt = "json"
+
+    def __init__(self, path: str, *, indent: Optional[int] = 2, **rotate):
+        super().__init__(path, **rotate)
+        self.indent = indent
+        self._out = None
+        self._first = True
+
+    def _open_file(self, raw) -> None:
+        self._out = io.TextIOWrapper(raw, encoding="utf-8", write_through=True)
+        self._out.write("[\n")
+        self._first = True
+
+    def _write(self, doc: Dict[str, Any]) -> None:
+        if not self._first:
+            self._out.write(",\n")
+        json.dump(doc, self._out, indent=self.indent, ensure_ascii=False, default=_json_default)
+        self._first = False
+
+    def _close_file(self) -> None:
+        self._out.write("\n]\n")
+        self._out.detach()  # leave the raw file to _finish
+        self._out = None
+
+
+class ParquetSink(_RotatingSink):
+    """
+    Columnar output: docs are flattened (flatten_doc) and written in row groups
+    of `row_group_size`, so readers can load single columns ("post.title",
+    "contact_info.emails", ...) without touching the rest.
+      - `schema`: a pyarrow schema, or a doc template (see template_schema, with
+        `types` for its None leaves); without one it is inferred from the first
+        row group, with all-null columns promoted to string
+      - every file of a run has the same schema: values are coerced to their
+        column's type and fields without a column go to EXTRA_COLUMN as JSON
+      - `compression` is the Parquet codec ("zstd", "snappy", "gzip", None)
+    Memory is bounded by one row group; size rotation is checked as row
+    groups reach the disk, so parts overshoot rotate_bytes by up to one group.
+    """
+
+    fmt = "parquet"
+
+    def __init__(self, path: str, *, row_group_size: int = 10_000, compression: Optional[str] = "zstd",
+                 sep: str = ".", schema=None, types: Optional[Dict[str, str]] = None, **rotate):
+        if _pa is None:
+            raise ImportError("Parquet output needs the 'pyarrow' package")
+        super().__init__(path, **rotate)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.sep = sep
+        self._rows: List[Dict[str, Any]] = []
+        self._writer = None
+        self._schema = template_schema(schema, types, sep) if isinstance(schema, dict) else schema
+
+    def _open_file(self, raw) -> None:
+        self._writer = None  # created on the first row group, once the schema is known
+
+    def _write(self, doc: Dict[str, Any]) -> None:
+        self._rows.append(flatten_doc(doc, self.sep))
+        if len(self._rows) >= self.row_group_size:
+            self._flush_rows()
+
+    def _flush_rows(self) -> None:
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        if self._schema is None:
+            self._schema = self._infer(rows)
+        if self._writer is None:
+            self._writer = _pq.ParquetWriter(self._raw, self._schema, compression=self.compression)
+        table = _pa.Table.from_pylist([self._conform(r) for r in rows], schema=self._schema)
+        self._writer.write_table(table)
+
+    def _infer(self, rows: List[Dict[str, Any]]):
+        try:
+            inferred = _pa.Table.from_pylist(rows).schema
+        except (_pa.ArrowInvalid, _pa.ArrowTypeError):
+            # mixed types within the group: fall back to JSON strings per column
+            inferred = _pa.schema([_pa.field(k, _pa.string()) for k in dict.fromkeys(k for r in rows for k in r)])
+        fields = [_pa.field(f.name, _pa.string()) if _pa.types.is_null(f.type) else f
+                  for f in inferred if f.name != EXTRA_COLUMN]
+        return _pa.schema(fields + [_pa.field(EXTRA_COLUMN, _pa.string())])
+
+    def _conform(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        out = {f.name: _coerce(row.get(f.name), f.type) for f in self._schema if f.name != EXTRA_COLUMN}
+        extra = {k: v for k, v in row.items() if k not in out and v is not None}
+        out[EXTRA_COLUMN] = json.dumps(extra, ensure_ascii=False, default=_json_default) if extra else None
+        return out
+
+    def _close_file(self) -> None:
+        self._flush_rows()
+        if self._writer is not None:
+            self._writer.close()
+        self._writer = None
+
+
+def open_sink(path: str, **kwargs) -> _RotatingSink:
+    """
+    Pick a sink from the file name:
+      .ndjson / .jsonl (+ .gz / .zst) -> NDJSONSink
+      .parquet                        -> ParquetSink
+      .json                           -> JSONArraySink
+    kwargs go to the sink (rotate_bytes, rotate_seconds, row_group_size, ...);
+    the Parquet-only `schema` / `types` are ignored by the JSON sinks.
+    """
+    lower = path.lower()
+    if not lower.endswith(".parquet"):
+        kwargs.pop("schema", None)
+        kwargs.pop("types", None)
+    for ext, comp in ((".gz", "gzip"), (".zst", "zstd")):
+        if lower.endswith(ext) and (".ndjson" in lower or ".jsonl" in lower):
+            return NDJSONSink(path, compression=comp, **kwargs)
+    if lower.endswith((".ndjson", ".jsonl")):
+        return NDJSONSink(path, **kwargs)
+    if lower.endswith(".parquet"):
+        return ParquetSink(path, **kwargs)
+    if lower.endswith(".json"):
+        return JSONArraySink(path, **kwargs)
+    raise ValueError(f"Can't pick an output format for '{path}'. Use .json, .ndjson[.gz|.zst], .jsonl or .parquet")
+
+
+def write_records(path: str, records: Iterable[Dict[str, Any]], **kwargs) -> List[str]:
+    """Stream `records` into open_sink(path); returns the files written."""
+    with open_sink(path, **kwargs) as sink:
+        sink.write_many(records)
+    return sink.files
@@ -0,0 +1,232 @@
+# common/rate_limiter.py
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from .metrics import METRICS, inc
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After header -> seconds to wait (delta-seconds or HTTP-date form)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+KINDS = ("json", "html", "nav")
+
+
+def request_kind(url: str) -> str:
+    """'json' for API / .json URLs, else 'html' (browser navigations pass 'nav' themselves)."""
+    path = urlparse(url).path.lower()
+    return "json" if path.endswith(".json") or path.startswith("/api/") else "html"
+
+
+class _Latency:
+    __slots__ = ("ewma", "baseline", "strikes")
+
+    def __init__(self):
+        self.ewma: Optional[float] = None      # EWMA of response time
+        self.baseline: Optional[float] = None  # low-water EWMA, drifting up slowly
+        self.strikes = 0                       # consecutive inflated samples
+
+
+class _HostState:
+    __slots__ = ("rate", "tokens", "last_refill", "blocked_until", "latency")
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.latency: Dict[str, _Latency] = {}  # per request kind: a JSON call and a page load differ
+
+
+class HostScheduler:
+    """
+    Per-host adaptive token bucket (AIMD).
+      - acquire(url) waits for a token on that URL's host
+      - record(...) after each response: healthy responses raise the rate
+        additively; 429/5xx cut it multiplicatively; Retry-After pauses the
+        host outright
+      - latency is tracked per (host, kind) with kind json / html / nav, so
+        slow page loads aren't compared against fast API calls; the rate is
+        only cut after `latency_strikes` consecutive samples above
+        `latency_factor` x baseline, and the baseline drifts up by
+        `baseline_drift` of the gap per sample so one fast outlier doesn't
+        pin it forever
+    One scheduler should be shared by the browser and HTTP paths of a process
+    (see get_scheduler()). State is per process: sharded_runner workers each
+    build one with `shards=N`, which divides the rates so N processes
+    together stay within the single-process budget.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_rate: float = 4.0,
+        min_rate: float = 0.2,
+        max_rate: float = 50.0,
+        burst: float = 4.0,
+        increase: float = 0.25,
+        decrease: float = 0.5,
+        latency_factor: float = 2.5,
+        latency_strikes: int = 3,
+        baseline_drift: float = 0.02,
+        shards: int = 1,
+    ):
+        shards = max(1, shards)
+        self.initial_rate = initial_rate / shards
+        self.min_rate = min_rate / shards
+        self.max_rate = max_rate / shards
+        self.burst = max(1.0, burst / shards)
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.latency_strikes = latency_strikes
+        self.baseline_drift = baseline_drift
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, url: str) -> _HostState:
+        host = (urlparse(url).hostname or "").lower()
+        st = self._hosts.get(host)
+        if st is None:
+            st = self._hosts[host] = _HostState(self.initial_rate)
+        return st
+
+    async def acquire(self, url: str) -> None:
+        st = self._state(url)
+        while True:
+            now = time.monotonic()
+            if now < st.blocked_until:
+                await asyncio.sleep(st.blocked_until - now)
+                continue
+            st.tokens = min(self.burst, st.tokens + (now - st.last_refill) * st.rate)
+            st.last_refill = now
+            if st.tokens >= 1.0:
+                st.tokens -= 1.0
+                return
+            await asyncio.sleep((1.0 - st.tokens) / st.rate)
+
+    def record(
+        self,
+        url: str,
+        status: Optional[int],
+        latency: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        kind: Optional[str] = None,
+    ) -> None:
+        """
+        Feed back one response (status None = network error/timeout).
+        `kind` picks the latency baseline; default from the URL (request_kind).
+        """
+        st = self._state(url)
+        now = time.monotonic()
+
+        if status is None or status == 429 or status >= 500:
+            st.rate = max(self.min_rate, st.rate * self.decrease)
+            st.tokens = 0.0
+            pause = retry_after if retry_after is not None else 1.0 / st.rate
+            st.blocked_until = max(st.blocked_until, now + pause)
+            return
+
+        if latency is not None:
+            lat = st.latency.get(kind or request_kind(url))
+            if lat is None:
+                lat = st.latency[kind or request_kind(url)] = _Latency()
+            lat.ewma = latency if lat.ewma is None else 0.8 * lat.ewma + 0.2 * latency
+            if lat.baseline is None or lat.ewma < lat.baseline:
+                lat.baseline = lat.ewma
+            else:
+                lat.baseline += (lat.ewma - lat.baseline) * self.baseline_drift
+            if lat.ewma > lat.baseline * self.latency_factor:
+                lat.strikes += 1
+                if lat.strikes >= self.latency_strikes:
+                    # server is slowing down: back off before it starts refusing
+                    lat.strikes = 0
+                    st.rate = max(self.min_rate, st.rate * self.decrease)
+                return
+            lat.strikes = 0
+
+        st.rate = min(self.max_rate, st.rate + self.increase)
+
+    def stats(self) -> Dict[str, Dict]:
+        return {
+            host: {
+                "rate": round(st.rate, 2),
+                "latency_ms": {k: round(lat.ewma * 1000) for k, lat in st.latency.items() if lat.ewma is not None},
+                "paused_s": round(max(0.0, st.blocked_until - time.monotonic()), 2),
+            }
+            for host, st in self._hosts.items()
+        }
+
+
+_DEFAULT_SCHEDULER: Optional[HostScheduler] = None
+
+
+def get_scheduler() -> HostScheduler:
+    """Process-wide scheduler shared by goto_resilient and the HTTP client."""
+    global _DEFAULT_SCHEDULER
+    if _DEFAULT_SCHEDULER is None:
+        _DEFAULT_SCHEDULER = HostScheduler()
+    return _DEFAULT_SCHEDULER
+
+
+def set_scheduler(scheduler: Optional[HostScheduler]) -> None:
+    """Replace the process-wide scheduler (None resets to a fresh default on next use)."""
+    global _DEFAULT_SCHEDULER
+    _DEFAULT_SCHEDULER = scheduler
+
+
+class ThrottledTransport(httpx.AsyncBaseTransport):
+    """
+    httpx transport that paces every request through a HostScheduler and
+    retries 429/503 responses after the scheduler's backoff (or Retry-After).
+    """
+
+    RETRY_STATUS = (429, 503)
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, scheduler: Optional[HostScheduler] = None, retries: int = 2):
+        self.inner = inner
+        self.scheduler = scheduler or get_scheduler()
+        self.retries = retries
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        url = str(request.url)
+        for attempt in range(self.retries + 1):
+            await self.scheduler.acquire(url)
+            started = time.monotonic()
+            try:
+                resp = await self.inner.handle_async_request(request)
+            except httpx.TransportError as e:
+                self.scheduler.record(url, None)
+                if isinstance(e, httpx.TimeoutException):
+                    inc("timeouts_total", stage="http")
+                if attempt < self.retries:
+                    inc("retries_total", stage="http", reason="transport")
+                    continue
+                raise
+            finally:
+                METRICS.observe("stage_duration_seconds", time.monotonic() - started, stage="http")
+            retry_after = parse_retry_after(resp.headers.get("retry-after"))
+            self.scheduler.record(url, resp.status_code, time.monotonic() - started, retry_after)
+            inc("http_responses_total", status=resp.status_code)
+            if resp.status_code in self.RETRY_STATUS and attempt < self.retries:
+                inc("retries_total", stage="http", reason=str(resp.status_code))
+                await resp.aclose()
+                continue
+            return resp
+        return resp
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
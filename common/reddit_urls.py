@@ -0,0 +1,103 @@
+# common/reddit_urls.py
+import re
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+CANONICAL_HOST = "www.reddit.com"
+_ID = r"([a-z0-9]{4,12})"
+_POST_PATH = re.compile(r"^(?:/r/([^/]+)|/u(?:ser)?/[^/]+)?/(?:comments|gallery)/" + _ID + r"(?:/|$|\.json)", re.I)
+_SHORT_PATH = re.compile(r"^/" + _ID + r"/?$", re.I)
+_FALLBACK = re.compile(r"/comments/" + _ID, re.I)
+# non-reddit hosts serving reddit-shaped paths (stand-in servers, mirrors); see register_post_host()
+_EXTRA_POST_HOSTS: set = set()
+
+
+def _is_reddit_host(host: str) -> bool:
+    # www. / old. / np. / new. / m. / amp. ... all serve the same posts
+    return host == "reddit.com" or host.endswith(".reddit.com")
+
+
+def register_post_host(host: str) -> None:
+    """Let /comments/<id> URLs on `host` (e.g. a local stand-in server) parse as posts."""
+    _EXTRA_POST_HOSTS.add(host.lower())
+
+
+def parse_post_url(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    (post_id, subreddit) for any form of a post URL, else (None, None):
+      - any *.reddit.com host, with or without slug / comment id / query / .json
+      - /gallery/<id> and /comments/<id> without a subreddit
+      - redd.it/<id> short links (i.redd.it / v.redd.it are media, not posts)
+    Other hosts only match a /comments/<id> path, and only once registered with
+    register_post_host() (stand-in servers, mirrors); anything else is not a post.
+    Share links (/r/<sub>/s/<token>) need a redirect to resolve and stay unparsed.
+    """
+    u = urlparse((url or "").strip())
+    host = (u.hostname or "").lower()
+    if host == "redd.it":
+        m = _SHORT_PATH.match(u.path)
+        return (m.group(1).lower(), None) if m else (None, None)
+    if _is_reddit_host(host):
+        m = _POST_PATH.match(u.path)
+        if m:
+            return m.group(2).lower(), (m.group(1).lower() if m.group(1) else None)
+        return None, None
+    if host not in _EXTRA_POST_HOSTS:
+        return None, None
+    m = _FALLBACK.search(u.path)
+    return (m.group(1).lower(), None) if m else (None, None)
+
+
+def post_id(url: str) -> Optional[str]:
+    return parse_post_url(url)[0]
+
+
+def canonicalize(url: str) -> Tuple[Optional[str], str]:
+    """
+    (post_id, canonical URL). Every variant of one post, with or without its
+    subreddit, maps to the single form https://www.reddit.com/comments/<id>/,
+    which reddit serves directly. Other reddit URLs only get the host / query /
+    trailing slash normalized; non-reddit URLs (registered hosts included) are
+    returned as given.
+    """
+    link = (url or "").strip()
+    pid = parse_post_url(link)[0]
+    u = urlparse(link)
+    host = (u.hostname or "").lower()
+    if pid and (host == "redd.it" or _is_reddit_host(host)):
+        return pid, f"https://{CANONICAL_HOST}/comments/{pid}/"
+    if _is_reddit_host(host):
+        return pid, f"https://{CANONICAL_HOST}{u.path.rstrip('/')}/"
+    return pid, link
+
+
+def post_key(url: str) -> str:
+    """Dedupe / merge key: the post id when there is one, else the canonical URL."""
+    pid, canon = canonicalize(url)
+    return pid or canon
+
+
+def first_seen(url: str, seen: set) -> Optional[str]:
+    """Canonical URL if this post isn't in `seen` (post keys) yet, else None; blank input -> None."""
+    if not url or not url.strip():
+        return None
+    pid, canon = canonicalize(url)
+    key = pid or canon
+    if key in seen:
+        return None
+    seen.add(key)
+    return canon
+
+
+def iter_canonical(urls: Iterable[str], seen: Optional[set] = None) -> Iterator[str]:
+    """Lazily canonicalize and drop repeats of a post (first variant wins); `seen` holds post keys."""
+    seen = seen if seen is not None else set()
+    for u in urls:
+        canon = first_seen(u, seen)
+        if canon is not None:
+            yield canon
+
+
+def canonical_post_urls(urls: Iterable[str]) -> List[str]:
+    """Canonical URLs, one per post, in first-seen order."""
+    return list(iter_canonical(urls))
@@ -0,0 +1,144 @@
+# common/request_router.py
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font", "stylesheet", "texttrack", "eventsource", "manifest")
+
+DEFAULT_DENY_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "amazon-adsystem.com",
+    "adsrvr.org",
+    "scorecardresearch.com",
+    "facebook.net",
+)
+
+# Rough average transfer size per resource type (bytes). Aborted requests never
+# report a size, so "bytes saved" is an estimate built from these.
+DEFAULT_EST_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 80_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+
+
+def _host_matches(host: str, domains: Iterable[str]) -> bool:
+    return any(host == d or host.endswith("." + d) for d in domains)
+
+
+def _is_main_frame(request) -> bool:
+    """True for the top-level navigation; iframes have a parent frame."""
+    try:
+        return request.is_navigation_request() and request.frame.parent_frame is None
+    except Exception:
+        # service-worker requests have no frame; treat them as sub-resources
+        return False
+
+
+class ResourceRouter:
+    """
+    Context-level request router that aborts what the scraper never reads.
+      - block_types: Playwright resource types to abort (images, fonts, css...)
+      - deny_domains: hosts always aborted (ads/analytics)
+      - allow_domains: if set, sub-resources from any other host are aborted
+      - cache: optional common.http_cache.ResponseCache for top-level documents;
+        stale entries are revalidated (ETag / Last-Modified) rather than refetched;
+        in replay mode every other request is aborted so runs stay offline
+    The main-frame document is never blocked; sub-frame documents (ad / tracker
+    iframes) go through the same domain rules as everything else. One router
+    may be installed on several contexts; counters are shared.
+    """
+
+    def __init__(
+        self,
+        *,
+        block_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+        allow_domains: Optional[Iterable[str]] = None,
+        deny_domains: Iterable[str] = DEFAULT_DENY_DOMAINS,
+        est_bytes: Optional[Dict[str, int]] = None,
+        cache=None,
+    ):
+        self.block_types = set(block_types)
+        self.allow_domains = tuple(allow_domains) if allow_domains else None
+        self.deny_domains = tuple(deny_domains)
+        self.est_bytes = {**DEFAULT_EST_BYTES, **(est_bytes or {})}
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_type: Dict[str, int] = {}
+        self.est_bytes_saved = 0
+        self.cache = cache
+        self.cache_hits = 0
+
+    def should_block(self, url: str, resource_type: str, main_frame: bool = True) -> bool:
+        if resource_type == "document" and main_frame:
+            return False
+        host = (urlparse(url).hostname or "").lower()
+        if _host_matches(host, self.deny_domains):
+            return True
+        if self.allow_domains is not None and not _host_matches(host, self.allow_domains):
+            return True
+        return resource_type in self.block_types
+
+    async def install(self, context) -> None:
+        await context.route("**/*", self._handle)
+
+    async def _handle(self, route) -> None:
+        req = route.request
+        rtype = req.resource_type
+        try:
+            main = rtype == "document" and _is_main_frame(req)
+            if self.cache is not None and main:
+                await self._handle_document(route)
+                return
+            if self.should_block(req.url, rtype, main) or (self.cache is not None and self.cache.read_only):
+                self.blocked += 1
+                self.blocked_by_type[rtype] = self.blocked_by_type.get(rtype, 0) + 1
+                self.est_bytes_saved += self.est_bytes.get(rtype, 0)
+                await route.abort()
+            else:
+                self.allowed += 1
+                await route.continue_()
+        except Exception:
+            # never leave the request unrouted (goto would hang until timeout);
+            # if the page/context is already gone this fails too, which is fine
+            try:
+                await route.continue_()
+            except Exception:
+                pass
+
+    async def _handle_document(self, route) -> None:
+        url = route.request.url
+        entry = await self.cache.aget(url)
+        if entry is not None and (entry["fresh"] or self.cache.read_only):
+            self.cache_hits += 1
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return
+        if self.cache.read_only:
+            await route.abort()
+            return
+        self.allowed += 1
+        # stale entry: revalidate instead of refetching the whole document
+        response = await route.fetch(headers={**route.request.headers, **self.cache.conditional_headers(entry)})
+        if response.status == 304 and entry is not None:
+            self.cache.revalidated += 1
+            await self.cache.atouch(url)
+            await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+            return
+        body = await response.body()
+        await self.cache.aput(url, response.status, response.headers, body)
+        await route.fulfill(response=response, body=body)
+
+    def stats(self) -> Dict:
+        return {
+            "cache_hits": self.cache_hits,
+            "allowed": self.allowed,
+            "blocked": self.blocked,
+            "blocked_by_type": dict(self.blocked_by_type),
+            "est_bytes_saved": self.est_bytes_saved,
+        }
@@ -0,0 +1,214 @@
+# common/schema_projector.py
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+Path = Tuple[str, ...]
+
+
+def _split(path: str) -> Path:
+    return tuple(p for p in path.split(".") if p)
+
+
+def _get_path(d: Any, path: Path) -> Any:
+    for k in path:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(k)
+    return d
+
+
+def _dedupe(values: List[Any]) -> List[Any]:
+    """Order-preserving dedupe; O(n) for hashables, falls back to a scan for dicts/lists."""
+    seen, out = set(), []
+    for v in values:
+        try:
+            if v in seen:
+                continue
+            seen.add(v)
+        except TypeError:
+            if v in out:
+                continue
+        out.append(v)
+    return out
+
+
+def _merge_scalar(vals: tuple, default: Any) -> Any:
+    present = [v for v in vals if v is not None]
+    if not present:
+        return default
+    if len(present) == 1:
+        return present[0]
+    uniq = _dedupe(present)
+    return uniq[0] if len(uniq) == 1 else uniq
+
+
+def _merge_list(vals: tuple, default: Any) -> Any:
+    merged, found = [], False
+    for v in vals:
+        if v is None:
+            continue
+        found = True
+        if isinstance(v, (list, tuple, set)):
+            merged.extend(x for x in v if x is not None)
+        else:
+            merged.append(v)
+    return _dedupe(merged) if found else default
+
+
+def _one_list(v: Any, default: Any) -> Any:
+    if v is None:
+        return default
+    if isinstance(v, (list, tuple, set)):
+        return _dedupe([x for x in v if x is not None]) if len(v) > 1 else [x for x in v if x is not None]
+    return [v]
+
+
+def _leaves(schema: Dict[str, Any], prefix: Path = ()) -> List[Tuple[Path, Any]]:
+    out = []
+    for k, v in schema.items():
+        path = prefix + (k,)
+        if isinstance(v, dict) and v:
+            out.extend(_leaves(v, path))
+        else:
+            out.append((path, v))
+    return out
+
+
+class _Codegen:
+    """Emits one straight-line `project(d)` function for a schema (fill_missing=True)."""
+
+    def __init__(self, use_defaults: bool):
+        self.use_defaults = use_defaults
+        self.env: Dict[str, Any] = {
+            "_get_path": _get_path,
+            "_merge_scalar": _merge_scalar,
+            "_merge_list": _merge_list,
+            "_one_list": _one_list,
+        }
+
+    def const(self, value: Any) -> str:
+        name = f"_c{len(self.env)}"
+        self.env[name] = value
+        return name
+
+    def default(self, template_value: Any) -> str:
+        if not self.use_defaults or template_value is None:
+            return "None"
+        if isinstance(template_value, (str, int, float, bool)):
+            return repr(template_value)
+        if isinstance(template_value, list):
+            return f"list({self.const(template_value)})" if template_value else "[]"
+        if isinstance(template_value, dict):
+            return f"dict({self.const(template_value)})" if template_value else "{}"
+        return self.const(template_value)
+
+    def source(self, path: Path) -> str:
+        # inline the common 1- and 2-level lookups; deeper paths use a helper
+        if len(path) == 1:
+            return f"d.get({path[0]!r})"
+        if len(path) == 2:
+            return f"(_n.get({path[1]!r}) if isinstance(_n := d.get({path[0]!r}), dict) else None)"
+        return f"_get_path(d, {self.const(path)})"
+
+    def leaf(self, sources: List[Path], is_list: bool, template_value: Any) -> str:
+        default = self.default(template_value)
+        if not sources:
+            return default
+        srcs = [self.source(p) for p in sources]
+        if is_list and len(srcs) == 1:
+            return f"_one_list({srcs[0]}, {default})"
+        if is_list:
+            return f"_merge_list(({', '.join(srcs)},), {default})"
+        if len(srcs) == 1:
+            if default == "None":
+                return srcs[0]
+            return f"(_v if (_v := {srcs[0]}) is not None else {default})"
+        return f"_merge_scalar(({', '.join(srcs)},), {default})"
+
+    def build(self, tree: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        body = self._literal(tree)
+        src = f"def project(d):\n    return {body}\n"
+        exec(compile(src, "<schema_projector>", "exec"), self.env)
+        return self.env["project"]
+
+    def _literal(self, tree: Dict[str, Any]) -> str:
+        parts = []
+        for k, v in tree.items():
+            parts.append(f"{k!r}: {self._literal(v) if isinstance(v, dict) else v}")
+        return "{" + ", ".join(parts) + "}"
+
+
+class SchemaProjector:
+    """
+    Compiled projection of arbitrary dicts onto a (nested) schema template.
+    Build with compile_schema(); then project(item) or project_many(items).
+    """
+
+    def __init__(self, leaves, fill_missing: bool, use_defaults: bool, fast: Optional[Callable] = None):
+        self._leaves = leaves
+        self.fill_missing = fill_missing
+        self.use_defaults = use_defaults
+        self._fast = fast
+
+    def project(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        if self._fast is not None:
+            return self._fast(data)
+        # fill_missing=False: missing leaves (and empty parents) are left out
+        out: Dict[str, Any] = {}
+        for path, sources, is_list, template_value in self._leaves:
+            vals = tuple(_get_path(data, p) for p in sources)
+            value = (_merge_list if is_list else _merge_scalar)(vals, None)
+            if value is None:
+                continue
+            node = out
+            for p in path[:-1]:
+                node = node.setdefault(p, {})
+            node[path[-1]] = value
+        return out
+
+    def project_many(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """Project a whole batch; non-dict items are dropped."""
+        project = self.project
+        return [project(item) for item in items if isinstance(item, dict)]
+
+    __call__ = project
+
+
+def compile_schema(
+    schema: Dict[str, Any],
+    alias: Optional[Dict[str, List[str]]] = None,
+    *,
+    fill_missing: bool = True,
+    use_defaults: bool = False,
+) -> SchemaProjector:
+    """
+    Compile `schema` (nested template, e.g. db_utils.SCHEMA) once into a projector.
+      - every leaf is addressed by its dotted path ("contact.emails")
+      - alias: dotted output path -> list of dotted input paths, merged in order;
+        an empty list makes the leaf a constant (always its default)
+      - list leaves (template value is a list) merge all sources into one deduped list
+      - scalar leaves: one distinct value -> value, several -> list of them
+      - missing leaves: omitted if fill_missing=False, else the template value
+        (use_defaults=True) or None
+    With fill_missing=True the projector is generated as a single Python
+    function with every lookup inlined.
+    """
+    alias = alias or {}
+    leaves = []
+    for path, template_value in _leaves(schema):
+        dotted = ".".join(path)
+        sources = alias.get(dotted)
+        if sources is None:
+            sources = [dotted]
+        leaves.append((path, tuple(_split(s) for s in sources), isinstance(template_value, list), template_value))
+
+    fast = None
+    if fill_missing:
+        gen = _Codegen(use_defaults)
+        tree: Dict[str, Any] = {}
+        for path, sources, is_list, template_value in leaves:
+            node = tree
+            for p in path[:-1]:
+                node = node.setdefault(p, {})
+            node[path[-1]] = gen.leaf(list(sources), is_list, template_value)
+        fast = gen.build(tree)
+    return SchemaProjector(leaves, fill_missing, use_defaults, fast)
@@ -1,8 +1,9 @@
 # tests/reddit_test.py
-# Reads URLs, calls scrapers.reddit_scraper.main (returns schema), upserts to Mongo, writes JSON.
+# Reads URLs, streams schema docs from scrapers.reddit_scraper, upserts to Mongo in batches,
+# and streams them to an output file (JSON array, NDJSON[.gz|.zst] or Parquet).
 
+import argparse
 import asyncio
-import json
 import sys
 from pathlib import Path
 
@@ -12,21 +13,39 @@ def _setup_path():
 
 _setup_path()
 
-from scrapers.reddit_scraper import main as run_reddit_scraper
-from common.db_utils import get_db, PLATFORM_COLLECTION
-from pymongo import UpdateOne
+from scrapers.reddit_scraper import REDDIT_DOC_TEMPLATE, REDDIT_DOC_TYPES, stream_reddit_posts
+from scrapers.sharded_runner import stream_sharded
+from common.db_utils import get_db, split_fresh_urls, MongoBatchSink
+from common.frontier import Frontier
+from common.reddit_urls import canonical_post_urls
+from common.metrics import start_metrics_server, write_prometheus
+from common.output_sinks import open_sink
 
 
-async def run_test():
+def _failed(doc) -> bool:
+    post = doc.get("post") or {}
+    return not (post.get("title") or post.get("body"))
+
+
+async def run_test(incremental: bool = False, fresh_hours: float = 24.0, frontier_path: str = None,
+                   processes: int = 1, html_parser: str = "auto", metrics_file: str = None,
+                   metrics_port: int = None, comment_limit: int = 0, output: str = None,
+                   rotate_mb: float = None, rotate_minutes: float = None):
     print("--- Starting Reddit Test ---")
+    if metrics_port:
+        start_metrics_server(metrics_port)
+        print(f"[metrics] serving http://127.0.0.1:{metrics_port}/metrics")
 
     tests_dir = Path(__file__).resolve().parent
     urls_file_path = tests_dir / "reddit_urls.txt"
-    output_file_path = tests_dir / "reddit_output.json"
+    output_file_path = Path(output) if output else tests_dir / "reddit_output.json"
+    rotate = {"rotate_bytes": int(rotate_mb * 1024 * 1024) if rotate_mb else None,
+              "rotate_seconds": rotate_minutes * 60 if rotate_minutes else None}
 
     try:
         with open(urls_file_path, "r", encoding="utf-8") as f:
-            urls_to_scrape = [line.strip() for line in f if line.strip()]
+            # one canonical URL per post, so frontier / Mongo / output all share the same key
+            urls_to_scrape = canonical_post_urls(f)
     except FileNotFoundError:
         print(f"ERROR: The input file was not found at '{urls_file_path}'")
         return
@@ -35,39 +54,92 @@ async def run_test():
         print("No URLs found in 'reddit_urls.txt'. Test aborted.")
         return
 
-    # 🔹 Call the main (returns schema docs)
-    schema_results = await run_reddit_scraper(urls_to_scrape, headless=True)
-
-    # 🔹 Write JSON for inspection
-    with open(output_file_path, "w", encoding="utf-8") as f:
-        json.dump(schema_results, f, indent=2, ensure_ascii=False)
-    print(f"[OK] Wrote schema results to: {output_file_path}")
-
-    # 🔹 Upsert into MongoDB here (NOT in main)
     db = get_db()
-    coll_name = PLATFORM_COLLECTION.get("reddit", "reddit_leads")
-    col = db[coll_name]
-    try:
-        col.create_index("url", unique=True)
-    except Exception:
-        pass
-
-    ops = []
-    for doc in schema_results:
-        url = doc.get("url")
-        if not url:
-            continue
-        ops.append(UpdateOne({"url": url}, {"$set": doc}, upsert=True))
-
-    if ops:
-        bulk = col.bulk_write(ops, ordered=False)
-        print("[Mongo] matched:", bulk.matched_count,
-              "modified:", bulk.modified_count,
-              "upserted:", len(bulk.upserted_ids) if bulk.upserted_ids else 0)
-    else:
-        print("[Mongo] No valid docs to upsert.")
+
+    # 🔹 Incremental: drop URLs already stored within the freshness window
+    if incremental:
+        split = split_fresh_urls(db, urls_to_scrape, "reddit", max_age_seconds=fresh_hours * 3600)
+        urls_to_scrape = split["to_scrape"]
+        print(f"[incremental] skipped (fresh < {fresh_hours}h): {len(split['skipped'])}, "
+              f"refreshing: {len(urls_to_scrape)}")
+        if not urls_to_scrape:
+            print("--- Test Complete (nothing stale) ---")
+            return
+
+    # 🔹 Frontier: persistent per-URL state, so a killed run resumes where it stopped
+    frontier = None
+    source = urls_to_scrape
+    if frontier_path:
+        frontier = Frontier(frontier_path)
+        added = frontier.enqueue(urls_to_scrape)
+        print(f"[frontier] enqueued {added} new URLs; {frontier.stats()}")
+        # sharded workers need the whole list up front; the single process streams claims
+        source = frontier.drain() if processes > 1 else frontier.adrain()
+
+    def _settle(batch):
+        # writer thread, after the batch is in Mongo: only now is a URL really done
+        frontier.mark_done_many(d["url"] for d in batch if not _failed(d))
+        for d in batch:
+            if _failed(d):
+                frontier.mark_failed(d["url"], "Failed to extract")
+
+    # 🔹 Upsert into MongoDB here (NOT in main); indexes come from db_utils.INDEXES
+    # 🔹 Stream docs as each URL finishes: Mongo in batches, output file appended per doc
+    count = 0
+    async with MongoBatchSink(db, "reddit", batch_size=200, flush_interval=10.0,
+                              on_flushed=_settle if frontier is not None else None) as sink:
+        with open_sink(str(output_file_path), schema=REDDIT_DOC_TEMPLATE, types=REDDIT_DOC_TYPES, **rotate) as out:
+            if processes > 1:
+                docs = stream_sharded(list(source), processes=processes, headless=True, parser=html_parser,
+                                  comment_limit=comment_limit)
+            else:
+                docs = stream_reddit_posts(source, headless=True, parser=html_parser, comment_limit=comment_limit,
+                                           on_skip=frontier.arelease if frontier is not None else None)
+            async for doc in docs:
+                if frontier is not None and not doc.get(sink.key):
+                    # the sink will skip it (no upsert key), so settle it here
+                    await frontier.amark_failed(doc.get("url"), "No upsert key")
+                await sink.write(doc)
+                out.write(doc)
+                count += 1
+    print(f"[OK] Wrote {count} schema results to: {', '.join(out.files) or output_file_path}")
+    print("[Mongo]", sink.stats)
+    if frontier is not None:
+        print("[frontier]", frontier.stats())
+        frontier.close()
+    if metrics_file:
+        # with --processes > 1 the per-worker metrics are in the shard stats instead
+        write_prometheus(metrics_file)
+        print(f"[metrics] wrote {metrics_file}")
 
     print("--- Test Complete ---")
 
 if __name__ == "__main__":
-    asyncio.run(run_test())
+    parser = argparse.ArgumentParser(description="Scrape reddit_urls.txt and upsert into Mongo.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip URLs whose stored scraped_at is within --fresh-hours")
+    parser.add_argument("--fresh-hours", type=float, default=24.0)
+    parser.add_argument("--frontier", default=None,
+                        help="SQLite frontier file; re-running with the same file resumes the crawl")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="shard URLs over N worker processes, each with its own browser")
+    parser.add_argument("--parser", default="auto", choices=["auto", "selectolax", "lxml", "bs4"],
+                        help="HTML parser backend for the non-browser tier")
+    parser.add_argument("--comments", type=int, default=0,
+                        help="also scan up to N comments per post for contacts")
+    parser.add_argument("--output", default=None,
+                        help="output file (default reddit_output.json); .ndjson[.gz|.zst] / .jsonl / .parquet stream per doc")
+    parser.add_argument("--rotate-mb", type=float, default=None,
+                        help="start a new output part once the current one reaches this size")
+    parser.add_argument("--rotate-minutes", type=float, default=None,
+                        help="start a new output part after this many minutes")
+    parser.add_argument("--metrics-file", default=None,
+                        help="write Prometheus text metrics here when the run ends")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics during the run")
+    args = parser.parse_args()
+    asyncio.run(run_test(incremental=args.incremental, fresh_hours=args.fresh_hours,
+                         frontier_path=args.frontier, processes=args.processes,
+                         html_parser=args.parser, metrics_file=args.metrics_file,
+                         metrics_port=args.metrics_port, comment_limit=args.comments,
+                         output=args.output, rotate_mb=args.rotate_mb, rotate_minutes=args.rotate_minutes))
@@ -0,0 +1,178 @@
+# scraper_types/reddit_response_harvest.py
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from common.metrics import inc, log
+from common.reddit_urls import post_id
+
+_MAX_NODES = 200_000      # cap on JSON nodes scanned per response
+_MAX_BODY = 8 * 1024 * 1024
+
+# fields _build_record needs; if all are harvested the DOM is only read once, without waits.
+# content_lines isn't one: link / image posts have no body, and [] is their real value.
+HARVEST_KEY_FIELDS = ("title", "author", "subreddit")
+HARVEST_STAT_FIELDS = HARVEST_KEY_FIELDS + ("content_lines",)
+
+
+def _first(d: Dict, *paths: str) -> Any:
+    for path in paths:
+        node: Any = d
+        for part in path.split("."):
+            node = node.get(part) if isinstance(node, dict) else None
+            if node is None:
+                break
+        if node not in (None, "", []):
+            return node
+    return None
+
+
+def _posted(d: Dict) -> Optional[str]:
+    ts = _first(d, "created_utc", "createdAt", "created")
+    if isinstance(ts, (int, float)):
+        if ts > 1e12:  # some internal APIs use ms
+            ts /= 1000
+        return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+    return ts if isinstance(ts, str) else None
+
+
+def _map_candidate(d: Dict) -> Dict[str, Any]:
+    """One post-shaped JSON object (v1 API t3, desktopapi, gql) -> _build_record fields."""
+    title = _first(d, "title")
+    author = _first(d, "author.name", "authorInfo.name", "author")
+    subreddit = _first(d, "subreddit_name_prefixed", "subreddit.prefixedName", "subreddit.name", "subredditName", "subreddit")
+    if isinstance(subreddit, str) and not subreddit.startswith("r/"):
+        subreddit = f"r/{subreddit}"
+    body = _first(d, "selftext", "content.markdown", "media.richtextContent.markdown", "body")
+    score = _first(d, "score", "voteInfo.score")
+    n_comments = _first(d, "num_comments", "numComments", "commentCount")
+    link = _first(d, "url_overridden_by_dest", "source.url", "url")
+    return {
+        "title": title if isinstance(title, str) else None,
+        "author": author if isinstance(author, str) else None,
+        "subreddit": subreddit if isinstance(subreddit, str) else None,
+        "posted": _posted(d),
+        "content_lines": [l for l in body.split("\n") if l.strip()] if isinstance(body, str) else [],
+        "upvotes": str(score) if isinstance(score, (int, float)) else None,
+        "comments": f"{n_comments} comments" if isinstance(n_comments, (int, float)) else None,
+        "hrefs": [link] if isinstance(link, str) and link.startswith("http") else [],
+    }
+
+
+class ResponseHarvester:
+    """
+    Collects the post's own data from JSON responses the page fetches while it
+    loads (XHR/fetch), so extraction doesn't depend on rendered CSS classes.
+      harvester = ResponseHarvester(url); harvester.attach(page)
+      ... navigate ...
+      await harvester.settle(); fields = harvester.fields()
+    A JSON object counts as the post if its id / name / key is the post's id
+    (or t3_<id>) and it has a title. Fields from several payloads are merged,
+    first non-empty value wins.
+    """
+
+    def __init__(self, url: str):
+        self.post_id = post_id(url)
+        self.fullname = f"t3_{self.post_id}" if self.post_id else None
+        self._fields: Dict[str, Any] = {}
+        self._tasks: set = set()
+        self.responses_seen = 0
+        self.payloads_used = 0
+
+    def attach(self, page) -> None:
+        if self.post_id:
+            page.on("response", self._on_response)
+
+    def detach(self, page) -> None:
+        try:
+            page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
+
+    def _on_response(self, response) -> None:
+        request = response.request
+        if request.resource_type not in ("xhr", "fetch"):
+            return
+        ctype = (response.headers or {}).get("content-type", "")
+        if "json" not in ctype or response.status != 200:
+            return
+        self.responses_seen += 1
+        task = asyncio.ensure_future(self._read(response))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _read(self, response) -> None:
+        try:
+            body = await response.body()
+            if len(body) > _MAX_BODY:
+                return
+            payload = json.loads(body)
+        except Exception:
+            return  # page navigated away / not actually JSON
+        if self.ingest(payload):
+            self.payloads_used += 1
+
+    def ingest(self, payload: Any) -> bool:
+        """Scan one decoded payload (iteratively, bounded) and merge any post objects found."""
+        found = False
+        stack: List[Any] = [payload]
+        nodes = 0
+        ids = (self.post_id, self.fullname)
+        while stack and nodes < _MAX_NODES:
+            node = stack.pop()
+            nodes += 1
+            if isinstance(node, dict):
+                keyed = node.get(self.fullname)
+                if isinstance(keyed, dict) and keyed.get("title"):
+                    self._merge(_map_candidate(keyed))
+                    found = True
+                if node.get("title") and (node.get("id") in ids or node.get("name") == self.fullname):
+                    self._merge(_map_candidate(node))
+                    found = True
+                stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+            elif isinstance(node, list):
+                stack.extend(v for v in node if isinstance(v, (dict, list)))
+        return found
+
+    def _merge(self, fields: Dict[str, Any]) -> None:
+        for k, v in fields.items():
+            if v in (None, "", []):
+                continue
+            if k == "hrefs":
+                self._fields[k] = list(dict.fromkeys((self._fields.get(k) or []) + v))
+            elif not self._fields.get(k):
+                self._fields[k] = v
+
+    async def settle(self, timeout: float = 2.0) -> None:
+        """Wait (bounded) for response bodies still being read."""
+        if self._tasks:
+            done, pending = await asyncio.wait(set(self._tasks), timeout=timeout)
+            if pending:
+                log("harvest_pending", "debug", pending=len(pending))
+
+    def fields(self) -> Dict[str, Any]:
+        return dict(self._fields)
+
+    def missing(self) -> List[str]:
+        return [f for f in HARVEST_KEY_FIELDS if not self._fields.get(f)]
+
+    def record_stats(self, dom_fields: List[str]) -> None:
+        """Count which key fields came from payloads vs the DOM fallback."""
+        inc("harvest_responses_total", self.responses_seen)
+        for f in HARVEST_STAT_FIELDS:
+            if self._fields.get(f):
+                inc("harvest_fields_total", source="network", field=f)
+            elif f in dom_fields:
+                inc("harvest_fields_total", source="dom", field=f)
+
+
+def fill_missing(primary: Dict[str, Any], fallback: Dict[str, Any]) -> Dict[str, Any]:
+    """primary's non-empty values win; fallback fills the gaps; hrefs are unioned."""
+    out = dict(fallback)
+    for k, v in primary.items():
+        if k == "hrefs":
+            out[k] = list(dict.fromkeys((v or []) + (fallback.get(k) or [])))
+        elif v not in (None, "", []):
+            out[k] = v
+    return out
@@ -0,0 +1,250 @@
+# scraper_types/reddit_scraper_comments.py
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlparse, urlunparse
+
+import httpx
+
+from common.contact_extractor import extract_contacts
+from common.http_client import get_async_client
+from common.metrics import inc, log, span
+from scraper_types.reddit_scraper_json import _json_url
+from scraper_types.reddit_scraper_meta import _dedupe
+
+MORECHILDREN_URL = "https://www.reddit.com/api/morechildren.json"
+MORE_BATCH = 100  # reddit's cap on ids per morechildren call
+
+
+def _comment(data: Dict, depth: int) -> Dict:
+    """Flatten one t1 object to the fields we keep (the rest is dropped at once)."""
+    body = data.get("body") or ""
+    contacts = extract_contacts(body)
+    return {
+        "id": data.get("id"),
+        "parent_id": data.get("parent_id"),
+        "depth": depth,
+        "author": data.get("author"),
+        "body": body,
+        "score": data.get("score"),
+        "created_utc": data.get("created_utc"),
+        "emails": contacts["emails"],
+        "phones": contacts["phones"],
+        "urls": contacts["urls"],
+    }
+
+
+def _thread_url(link: str, comment_id: str) -> str:
+    """Permalink of one comment's subthread (reddit's "continue this thread")."""
+    u = urlparse(link)
+    path = u.path.rstrip("/")
+    parts = path.split("/")
+    # /r/<sub>/comments/<post_id>/<slug> -> keep up to the slug, then the comment id
+    if "comments" in parts:
+        i = parts.index("comments")
+        parts = parts[: i + 3] if len(parts) > i + 2 else parts[: i + 2] + ["_"]
+    return urlunparse((u.scheme or "https", u.netloc or "www.reddit.com", "/".join(parts + [comment_id]), "", "", ""))
+
+
+class _Walk:
+    """
+    Bookkeeping for one thread walk; everything here is capped:
+      - `depths` holds an int per yielded comment (<= max_comments entries)
+      - `more` / `deep` hold pending continuation ids (<= max_comments entries)
+    Comments already yielded and subthreads already requested are skipped, so
+    overlapping continuation responses can't loop.
+    """
+
+    def __init__(self, max_comments: int, max_depth: int):
+        self.max_comments = max_comments
+        self.max_depth = max_depth
+        self.depths: Dict[str, int] = {}
+        self.more: Deque[str] = deque()
+        self.deep: Deque[str] = deque()
+        self.deep_seen = set()
+        self.yielded = 0
+        self.dropped_more = 0
+
+    def full(self) -> bool:
+        return self.yielded >= self.max_comments
+
+    def queue_more(self, ids: List[str], parent_depth: int) -> None:
+        if parent_depth + 1 > self.max_depth:
+            return
+        ids = [i for i in ids if i not in self.depths]
+        room = self.max_comments - self.yielded - len(self.more)
+        if room <= 0:
+            self.dropped_more += len(ids)
+            return
+        self.more.extend(ids[:room])
+        self.dropped_more += max(0, len(ids) - room)
+
+    def depth_of(self, data: Dict) -> int:
+        parent = (data.get("parent_id") or "").split("_", 1)[-1]
+        if parent in self.depths:
+            return self.depths[parent] + 1
+        return int(data.get("depth") or 0)
+
+    def walk(self, children: List[Dict], base_depth: Optional[int] = None):
+        """
+        Depth-first over a listing's children with an explicit stack (no recursion),
+        yielding flattened comments and queueing "more" stubs.
+        """
+        stack: List[Tuple[Dict, int]] = [(c, -1) for c in reversed(children)]
+        while stack and not self.full():
+            node, parent_depth = stack.pop()
+            kind, data = node.get("kind"), node.get("data") or {}
+            if kind == "more":
+                pd = parent_depth if parent_depth >= 0 else (base_depth if base_depth is not None else self.depth_of(data) - 1)
+                if data.get("children"):
+                    self.queue_more(list(data["children"]), pd)
+                elif data.get("parent_id") and pd + 1 <= self.max_depth:
+                    # count == 0, no children: "continue this thread" link
+                    parent = data["parent_id"].split("_", 1)[-1]
+                    if parent not in self.deep_seen and len(self.deep_seen) < self.max_comments:
+                        self.deep_seen.add(parent)
+                        self.deep.append(parent)
+                continue
+            if kind != "t1" or data.get("id") in self.depths:
+                continue
+            depth = parent_depth + 1 if parent_depth >= 0 else (
+                base_depth if base_depth is not None else self.depth_of(data))
+            if depth > self.max_depth:
+                continue
+            self.depths[data.get("id")] = depth
+            self.yielded += 1
+            yield _comment(data, depth)
+            replies = data.get("replies")
+            if isinstance(replies, dict):
+                kids = (replies.get("data") or {}).get("children") or []
+                stack.extend((c, depth) for c in reversed(kids))
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: Optional[Dict] = None):
+    resp = await client.get(url, params=params, headers={"Accept": "application/json"})
+    if resp.status_code != 200:
+        raise httpx.HTTPStatusError(f"HTTP {resp.status_code}", request=resp.request, response=resp)
+    with span("parse", backend="json_comments"):
+        return resp.json()
+
+
+async def stream_comments(
+    client: httpx.AsyncClient,
+    link: str,
+    max_comments: int = 1000,
+    max_depth: int = 10,
+    page_limit: int = 500,
+) -> AsyncIterator[Dict]:
+    """
+    Async generator over a post's comment tree, one flattened comment at a time.
+      - first page from /comments/<id>.json (`page_limit` top comments, depth capped)
+      - "load more" stubs are followed via /api/morechildren in batches of 100
+      - "continue this thread" stubs re-fetch that subthread's permalink
+      - stops at `max_comments`; comments deeper than `max_depth` are skipped
+    Memory is bounded by one response page plus per-comment ints/ids, not by
+    thread size, so 20k-comment megathreads stream at constant footprint.
+    Each comment carries its own emails / phones / urls (common.contact_extractor).
+    """
+    state = _Walk(max_comments, max_depth)
+    params = {"limit": page_limit, "depth": max_depth + 1}
+    payload = await _get_json(client, _json_url(link), params)
+    if not (isinstance(payload, list) and len(payload) > 1):
+        return
+    try:
+        post_id = payload[0]["data"]["children"][0]["data"]["id"]
+    except (KeyError, IndexError, TypeError):
+        return
+    children = (payload[1].get("data") or {}).get("children") or []
+    del payload
+    for c in state.walk(children):
+        yield c
+    del children
+
+    while not state.full() and (state.more or state.deep):
+        if state.more:
+            batch = [state.more.popleft() for _ in range(min(MORE_BATCH, len(state.more)))]
+            try:
+                data = await _get_json(client, MORECHILDREN_URL, {
+                    "api_type": "json", "link_id": f"t3_{post_id}", "children": ",".join(batch),
+                    "limit_children": "false", "raw_json": 1,
+                })
+            except Exception as e:
+                inc("extraction_failures_total", tier="comments")
+                log("morechildren_failed", "warn", url=link, ids=len(batch), error=str(e))
+                continue
+            things = ((data.get("json") or {}).get("data") or {}).get("things") or []
+            for c in state.walk(things):
+                yield c
+        else:
+            parent = state.deep.popleft()
+            try:
+                sub = await _get_json(client, _json_url(_thread_url(link, parent)), params)
+            except Exception as e:
+                log("subthread_failed", "warn", url=link, parent=parent, error=str(e))
+                continue
+            kids = (sub[1].get("data") or {}).get("children") or [] if isinstance(sub, list) and len(sub) > 1 else []
+            # the subthread's root is the parent we've already yielded; walk its replies
+            for root in kids:
+                replies = (root.get("data") or {}).get("replies")
+                if root.get("kind") == "t1" and isinstance(replies, dict):
+                    base = state.depths.get(parent, 0) + 1
+                    for c in state.walk((replies.get("data") or {}).get("children") or [], base_depth=base):
+                        yield c
+
+    if state.dropped_more:
+        log("comments_truncated", url=link, yielded=state.yielded, dropped=state.dropped_more)
+
+
+async def scrape_comment_contacts(
+    client: httpx.AsyncClient,
+    link: str,
+    max_comments: int = 1000,
+    max_depth: int = 10,
+) -> Dict:
+    """
+    Consume stream_comments and fold every comment's contacts into one raw
+    record (merged with the post record by _merge_records). Only the deduped
+    contacts are kept, never the comments themselves.
+    """
+    emails: Dict[str, None] = {}
+    phones: Dict[str, None] = {}
+    urls: Dict[str, None] = {}
+    scanned = 0
+    try:
+        async for c in stream_comments(client, link, max_comments=max_comments, max_depth=max_depth):
+            scanned += 1
+            emails.update(dict.fromkeys(c["emails"]))
+            phones.update(dict.fromkeys(c["phones"]))
+            urls.update(dict.fromkeys(c["urls"]))
+    except Exception as e:
+        log("comments_failed", "warn", url=link, scanned=scanned, error=str(e))
+    external = [u for u in _dedupe(list(urls)) if "reddit.com" not in u and "redd.it" not in u]
+    return {
+        "platform": "reddit",
+        "reddit_link": link,
+        "emails": list(emails),
+        "phones": list(phones),
+        "external_links": external,
+        "comments_scanned": scanned,
+    }
+
+
+async def scrape_reddit_comments_async(
+    urls: List[str],
+    concurrency: int = 4,
+    client: Optional[httpx.AsyncClient] = None,
+    max_comments: int = 1000,
+    max_depth: int = 10,
+) -> List[Dict]:
+    """Comment contacts for many posts, in input order (see scrape_comment_contacts)."""
+    links = [u.strip() for u in urls if u and u.strip()]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(c: httpx.AsyncClient, link: str) -> Dict:
+        async with sem:
+            return await scrape_comment_contacts(c, link, max_comments, max_depth)
+
+    if client is not None:
+        return list(await asyncio.gather(*(_bounded(client, l) for l in links)))
+    async with get_async_client(concurrency=concurrency) as own:
+        return list(await asyncio.gather(*(_bounded(own, l) for l in links)))
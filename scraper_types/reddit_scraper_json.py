@@ -0,0 +1,115 @@
+# scraper_types/reddit_scraper_json.py
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import List, Dict, Optional
+from urllib.parse import urlparse, urlunparse
+import httpx
+from common.http_client import get_async_client
+from common.contact_extractor import extract_contacts
+from common.metrics import count_missing, span
+from scraper_types.reddit_scraper_meta import _dedupe
+
+def _json_url(url: str) -> str:
+    """Post permalink -> its .json representation (query/fragment dropped)."""
+    u = urlparse(url)
+    path = u.path.rstrip("/") or "/"
+    if not path.endswith(".json"):
+        path += ".json"
+    return urlunparse((u.scheme or "https", u.netloc or "www.reddit.com", path, "", "raw_json=1", ""))
+
+def _post_data(payload) -> Optional[Dict]:
+    # /comments/<id>.json -> [post listing, comment listing]
+    listing = payload[0] if isinstance(payload, list) and payload else payload
+    try:
+        children = listing["data"]["children"]
+    except (KeyError, TypeError):
+        return None
+    for child in children:
+        if child.get("kind") == "t3":
+            return child.get("data")
+    return None
+
+def _map_post(link: str, post: Dict) -> Dict:
+    """Map a t3 post object onto the raw record shape used by the DOM extractors."""
+    title = (post.get("title") or "").strip() or None
+    content = (post.get("selftext") or "").strip() or None
+
+    posted = None
+    if post.get("created_utc"):
+        posted = datetime.fromtimestamp(post["created_utc"], tz=timezone.utc).isoformat()
+
+    score = post.get("score")
+    num_comments = post.get("num_comments")
+
+    contacts = extract_contacts(" ".join(filter(None, [title, content])))
+
+    links = []
+    target = post.get("url_overridden_by_dest") or post.get("url")
+    if target:
+        links.append(target)
+    links.extend(contacts["urls"])
+    external_links = _dedupe([h for h in links if h.startswith("http") and "reddit.com" not in h and "redd.it" not in h])
+
+    result = {
+        "platform": "reddit",
+        "reddit_link": link,
+        "post_id": post.get("id"),
+        "title": title,
+        "subreddit": post.get("subreddit_name_prefixed"),
+        "author": post.get("author"),
+        "posted": posted,
+        "content": content,
+        "upvotes": str(score) if score is not None else None,
+        "upvotes_num": score,
+        "comments": f"{num_comments} comments" if num_comments is not None else None,
+        "comments_num": num_comments,
+        "external_links": external_links,
+        "emails": contacts["emails"],
+        "phones": contacts["phones"],
+        "scraped_at": int(time.time())
+    }
+
+    if not (title or content):
+        result["error"] = "Failed to extract"
+
+    return result
+
+async def _fetch_json(client: httpx.AsyncClient, link: str) -> Dict:
+    record = await _fetch_json_record(client, link)
+    count_missing(record, "json")
+    return record
+
+async def _fetch_json_record(client: httpx.AsyncClient, link: str) -> Dict:
+    try:
+        resp = await client.get(_json_url(link), headers={"Accept": "application/json"})
+        if resp.status_code != 200:
+            return {"platform": "reddit", "reddit_link": link, "error": f"HTTP {resp.status_code}"}
+        with span("parse", backend="json"):
+            post = _post_data(resp.json())
+            if not post:
+                return {"platform": "reddit", "reddit_link": link, "error": "No post in JSON payload"}
+            return _map_post(link, post)
+    except Exception as e:
+        return {"platform": "reddit", "reddit_link": link, "error": str(e)}
+
+async def scrape_reddit_json_async(
+    urls: List[str],
+    concurrency: int = 8,
+    client: Optional[httpx.AsyncClient] = None,
+) -> List[Dict]:
+    """
+    Cheapest tier: fetch each post's JSON over plain HTTP (no DOM selectors).
+    Returns raw records in input order; failures carry an "error" key.
+    """
+    links = [u.strip() for u in urls if u and u.strip()]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(c: httpx.AsyncClient, link: str) -> Dict:
+        async with sem:
+            return await _fetch_json(c, link)
+
+    if client is not None:
+        return list(await asyncio.gather(*(_bounded(client, l) for l in links)))
+    async with get_async_client(concurrency=concurrency) as own:
+        return list(await asyncio.gather(*(_bounded(own, l) for l in links)))
@@ -0,0 +1,87 @@
+# scraper_types/reddit_scraper_listing.py
+from typing import AsyncIterator, Dict, Optional
+
+import httpx
+
+from common.metrics import inc, log, span
+
+LISTING_URL = "https://www.reddit.com/r/{subreddit}/{sort}.json"
+SORTS = ("new", "hot", "top", "rising")
+PAGE_SIZE = 100  # reddit's max per listing page
+
+
+def _post_url(data: Dict) -> Optional[str]:
+    permalink = data.get("permalink")
+    return f"https://www.reddit.com{permalink}" if permalink else None
+
+
+async def iter_listing(
+    client: httpx.AsyncClient,
+    subreddit: str,
+    sort: str = "new",
+    *,
+    since: Optional[Dict] = None,
+    max_pages: int = 10,
+    time_filter: str = "day",
+    after: Optional[str] = None,
+    walk: Optional[Dict] = None,
+) -> AsyncIterator[Dict]:
+    """
+    Page through /r/<sub>/<sort>.json with the `after` cursor, newest first,
+    yielding {"post_id", "url", "created_utc", "subreddit"} per post.
+      - sort="new" with `since` (a ListingCursors row) stops at the first post
+        at or older than the watermark, so an incremental run costs about one
+        request per 100 new posts
+      - other sorts aren't time-ordered: they are walked for `max_pages` and
+        only posts newer than the watermark are yielded
+      - `time_filter` is passed as t= for "top"
+      - stops early on an empty page or a missing cursor (end of listing)
+      - `after` starts the walk from a listing cursor (resuming an unfinished walk)
+      - `walk` (if given) is filled with {"complete", "after"}: complete is False
+        when a sort="new" walk ran out of max_pages before the watermark / the
+        end of the listing, and "after" is then the cursor to resume from
+    Raises on a non-200 page so callers don't advance a watermark past it.
+    """
+    if sort not in SORTS:
+        raise ValueError(f"Unknown sort '{sort}'. Supported: {list(SORTS)}")
+    watermark_id = (since or {}).get("post_id")
+    watermark_ts = float((since or {}).get("created_utc") or 0)
+    walk = walk if walk is not None else {}
+    walk.update({"complete": False, "after": None})
+    for page in range(max_pages):
+        params = {"limit": PAGE_SIZE, "raw_json": 1}
+        if after:
+            params["after"] = after
+        if sort == "top":
+            params["t"] = time_filter
+        resp = await client.get(LISTING_URL.format(subreddit=subreddit, sort=sort), params=params,
+                                headers={"Accept": "application/json"})
+        inc("listing_pages_total", sort=sort)
+        if resp.status_code != 200:
+            log("listing_failed", "warn", subreddit=subreddit, sort=sort, page=page, status=resp.status_code)
+            raise RuntimeError(f"HTTP {resp.status_code} on /r/{subreddit}/{sort} page {page}")
+        with span("parse", backend="json_listing"):
+            data = (resp.json() or {}).get("data") or {}
+        children = data.get("children") or []
+        for child in children:
+            post = child.get("data") or {}
+            if child.get("kind") != "t3" or not post.get("id"):
+                continue
+            created = float(post.get("created_utc") or 0)
+            seen = post["id"] == watermark_id or (watermark_ts and created < watermark_ts)
+            if sort == "new" and seen and not post.get("stickied"):
+                walk["complete"] = True
+                return
+            if seen:
+                continue
+            url = _post_url(post)
+            if url:
+                yield {"post_id": post["id"], "url": url, "created_utc": created,
+                       "subreddit": post.get("subreddit") or subreddit}
+        after = data.get("after")
+        if not children or not after:
+            walk["complete"] = True
+            return
+    # out of pages: only a time-ordered walk can be resumed where it stopped
+    walk["complete"] = sort != "new"
+    walk["after"] = after if sort == "new" else None
@@ -1,9 +1,22 @@
 # scraper_types/reddit_scraper_meta.py
+import asyncio
 import re
 import time
 from typing import List, Dict, Optional
-from playwright.async_api import TimeoutError as PWTimeout, Page
-from common.anti_detection import goto_resilient
+from playwright.async_api import TimeoutError as PWTimeout, Page, Browser
+from common.anti_detection import goto_resilient, create_stealth_context
+from common.request_router import ResourceRouter
+from common.contact_extractor import extract_contacts
+from common.metrics import count_missing, inc, span
+from common.reddit_urls import canonical_post_urls
+from scraper_types.reddit_response_harvest import ResponseHarvester, fill_missing
+
+# Hosts the post page needs; everything else (ads, trackers, embeds) is dropped.
+REDDIT_ALLOW_DOMAINS = ["reddit.com", "redditstatic.com", "redditmedia.com", "redd.it"]
+
+def reddit_router(cache=None) -> ResourceRouter:
+    """Router for post pages: we only read DOM text + hrefs, so drop media/css/fonts."""
+    return ResourceRouter(allow_domains=REDDIT_ALLOW_DOMAINS, cache=cache)
 
 def _dedupe(seq: List[str]) -> List[str]:
     seen, out = set(), []
@@ -27,25 +40,22 @@ def _compact_to_int(s: Optional[str]) -> Optional[int]:
     elif suf == "m": num *= 1_000_000
     return int(num)
 
-def _contacts(text: Optional[str]) -> Dict[str, List[str]]:
-    if not text:
-        return {"emails": [], "phones": []}
-    emails = list({m.group(0) for m in re.finditer(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)})
-    phones = list({m.group(0) for m in re.finditer(r"\+?\d[\d\s().\-]{8,}\d", text)})
-    return {"emails": emails, "phones": phones}
-
 def _external_links(hrefs: List[str]) -> List[str]:
     return [h for h in hrefs if h and h.startswith("http") and "reddit.com" not in h]
 
-async def _first_text(page: Page, selectors: List[str], timeout_ms: int = 6000) -> Optional[str]:
+async def _first_text(page: Page, selectors: List[str], timeout_ms: int = 6000, field: str = "") -> Optional[str]:
     for sel in selectors:
         try:
-            el = await page.wait_for_selector(sel, timeout=timeout_ms, state="attached")
+            with span("selector_wait", mode="selectors"):
+                el = await page.wait_for_selector(sel, timeout=timeout_ms, state="attached")
             txt = (await el.text_content() or "").strip()
             if txt:
                 return txt
+        except PWTimeout:
+            inc("timeouts_total", stage="selector_wait")
         except Exception:
-            continue
+            pass
+        inc("selector_failures_total", field=field, selector=sel)
     return None
 
 async def _all_texts(page: Page, selectors: List[str], limit: int = 50) -> List[str]:
@@ -63,58 +73,105 @@ async def _all_texts(page: Page, selectors: List[str], limit: int = 50) -> List[
             continue
     return out
 
-async def _extract_post(page: Page, url: str) -> Dict:
-    TITLE_SEL = [
-        "h1[data-test-id='post-title']",
-        "h1._eYtD2XCVieq6emjKBH3m",
-        "h1"
-    ]
-    SUBREDDIT_SEL = ["a[data-testid='subreddit-name']", "a[data-click-id='subreddit']", "a[href*='/r/']"]
-    AUTHOR_SEL = ["a[data-testid='post_author_link']", "a[data-click-id='user']", "a[href*='/user/']"]
-    TIME_SEL = ["a[data-click-id='timestamp']", "time"]
-    CONTENT_SEL = ["div[data-test-id='post-content'] p", "div._1qeIAgB0cPwnLhDF9XSiJM p"]
-    UPVOTE_SEL = ["div._1rZYMD_4xY3gRcSS3p8ODO", "[id^='vote-arrows-'] ~ div"]
-    COMMENTS_SEL = ["span.FHCV02u6Cp2zYL0fhQPsO", "a[data-click-id='comments']"]
-
-    title = await _first_text(page, TITLE_SEL)
-    subreddit = await _first_text(page, SUBREDDIT_SEL)
-    author = await _first_text(page, AUTHOR_SEL)
-    timestamp_text = await _first_text(page, TIME_SEL)
-
-    content_lines = await _all_texts(page, CONTENT_SEL, limit=80)
+TITLE_SEL = [
+    "h1[data-test-id='post-title']",
+    "h1._eYtD2XCVieq6emjKBH3m",
+    "h1"
+]
+SUBREDDIT_SEL = ["a[data-testid='subreddit-name']", "a[data-click-id='subreddit']", "a[href*='/r/']"]
+AUTHOR_SEL = ["a[data-testid='post_author_link']", "a[data-click-id='user']", "a[href*='/user/']"]
+TIME_SEL = ["a[data-click-id='timestamp']", "time"]
+CONTENT_SEL = ["div[data-test-id='post-content'] p", "div._1qeIAgB0cPwnLhDF9XSiJM p"]
+UPVOTE_SEL = ["div._1rZYMD_4xY3gRcSS3p8ODO", "[id^='vote-arrows-'] ~ div"]
+COMMENTS_SEL = ["span.FHCV02u6Cp2zYL0fhQPsO", "a[data-click-id='comments']"]
+
+# Page is "ready" once any title or content node is attached.
+_READY_JS = """
+(sels) => sels.some(s => { try { return !!document.querySelector(s); } catch (e) { return false; } })
+"""
+
+# Same semantics as _first_text / _all_texts / the href loop, in one round trip.
+_EXTRACT_JS = """
+(cfg) => {
+  const q = (s, all) => { try { return all ? document.querySelectorAll(s) : document.querySelector(s); } catch (e) { return null; } };
+  const first = (list) => {
+    for (const s of list) {
+      const n = q(s, false);
+      const t = n ? (n.textContent || "").trim() : "";
+      if (t) return t;
+    }
+    return null;
+  };
+  const all = (list, limit) => {
+    for (const s of list) {
+      const out = [];
+      for (const n of Array.from(q(s, true) || []).slice(0, limit)) {
+        const t = (n.textContent || "").trim();
+        if (t) out.push(t);
+      }
+      if (out.length) return out;
+    }
+    return [];
+  };
+  const hrefs = Array.from(document.querySelectorAll("a[href]"))
+    .slice(0, cfg.href_limit)
+    .map(a => a.getAttribute("href"))
+    .filter(Boolean);
+  return {
+    title: first(cfg.title),
+    subreddit: first(cfg.subreddit),
+    author: first(cfg.author),
+    posted: first(cfg.time),
+    content_lines: all(cfg.content, cfg.content_limit),
+    upvotes: first(cfg.upvotes),
+    comments: first(cfg.comments),
+    hrefs: hrefs,
+    page_text: document.body ? document.body.innerText.slice(0, cfg.text_limit) : "",
+  };
+}
+"""
+
+_EXTRACT_CFG = {
+    "title": TITLE_SEL,
+    "subreddit": SUBREDDIT_SEL,
+    "author": AUTHOR_SEL,
+    "time": TIME_SEL,
+    "content": CONTENT_SEL,
+    "upvotes": UPVOTE_SEL,
+    "comments": COMMENTS_SEL,
+    "content_limit": 80,
+    "href_limit": 100,
+    "text_limit": 500_000,
+}
+
+def _build_record(url: str, fields: Dict) -> Dict:
+    title = fields.get("title")
+    content_lines = fields.get("content_lines") or []
     content = "\n".join(content_lines) if content_lines else None
 
-    upvotes_text = await _first_text(page, UPVOTE_SEL, timeout_ms=2000)
+    upvotes_text = fields.get("upvotes")
     upvotes_num = _compact_to_int(upvotes_text)
 
-    comments_text = await _first_text(page, COMMENTS_SEL)
+    comments_text = fields.get("comments")
     comments_num = None
     if comments_text:
         m = re.search(r"[\d,.]+", comments_text)
         if m:
             comments_num = _compact_to_int(m.group(0))
 
-    href_nodes = await page.query_selector_all("a[href]")
-    hrefs = []
-    for a in href_nodes[:100]:
-        try:
-            href = await a.get_attribute("href")
-            if href:
-                hrefs.append(href)
-        except Exception:
-            pass
-    external_links = _external_links(hrefs)
-
-    text_blob = " ".join(filter(None, [title, content]))
-    contacts = _contacts(text_blob)
+    # contacts come from the whole rendered page (sidebar, comments...) when
+    # we have it, else from title + body
+    text_blob = fields.get("page_text") or " ".join(filter(None, [title, content]))
+    contacts = extract_contacts(text_blob)
+    external_links = _external_links(_dedupe((fields.get("hrefs") or []) + contacts["urls"]))
 
     result = {
         "platform": "reddit",
         "reddit_link": url,
         "title": title,
-        "subreddit": subreddit,
-        "author": author,
-        "posted": timestamp_text,
+        "subreddit": fields.get("subreddit"),
+        "author": fields.get("author"),
+        "posted": fields.get("posted"),
         "content": content,
         "upvotes": upvotes_text,
         "upvotes_num": upvotes_num,
@@ -131,22 +188,167 @@ async def _extract_post(page: Page, url: str) -> Dict:
 
     return result
 
-async def scrape_reddit_posts_async(urls: List[str], page: Page) -> List[Dict]:
+async def _extract_post_selectors(page: Page) -> Dict:
+    """Legacy extraction: one wait_for_selector / get_attribute round trip per field."""
+    fields = {
+        "title": await _first_text(page, TITLE_SEL, field="title"),
+        "subreddit": await _first_text(page, SUBREDDIT_SEL, field="subreddit"),
+        "author": await _first_text(page, AUTHOR_SEL, field="author"),
+        "posted": await _first_text(page, TIME_SEL, field="posted"),
+        "content_lines": await _all_texts(page, CONTENT_SEL, limit=80),
+        "upvotes": await _first_text(page, UPVOTE_SEL, timeout_ms=2000, field="upvotes"),
+        "comments": await _first_text(page, COMMENTS_SEL, field="comments"),
+    }
+
+    href_nodes = await page.query_selector_all("a[href]")
+    hrefs = []
+    for a in href_nodes[:100]:
+        try:
+            href = await a.get_attribute("href")
+            if href:
+                hrefs.append(href)
+        except Exception:
+            pass
+    fields["hrefs"] = hrefs
+    try:
+        fields["page_text"] = (await page.inner_text("body"))[:_EXTRACT_CFG["text_limit"]]
+    except Exception:
+        pass
+    return fields
+
+async def _extract_post_evaluate(page: Page, ready_timeout_ms: int = 6000) -> Dict:
+    """
+    Fast extraction:
+      - waits once for any title/content node (combined condition)
+      - reads every field, paragraph and href in a single page.evaluate
+    """
+    try:
+        with span("selector_wait", mode="evaluate"):
+            await page.wait_for_function(_READY_JS, arg=TITLE_SEL + CONTENT_SEL, timeout=ready_timeout_ms)
+    except PWTimeout:
+        inc("timeouts_total", stage="selector_wait")  # extract whatever is there; _build_record flags empty pages
+    with span("extract", mode="evaluate"):
+        return await page.evaluate(_EXTRACT_JS, _EXTRACT_CFG)
+
+async def _extract_post_network(page: Page, harvester: ResponseHarvester) -> Dict:
+    """
+    Response-capture extraction:
+      - post fields come from the JSON the page fetched itself (see ResponseHarvester)
+      - all key fields harvested: one page.evaluate, no wait, just for hrefs + page text
+      - otherwise the evaluate path runs and only fills the fields payloads lacked
+    """
+    await harvester.settle()
+    harvested, missing = harvester.fields(), harvester.missing()
+    if missing:
+        dom = await _extract_post_evaluate(page)
+    else:
+        with span("extract", mode="network"):
+            dom = await page.evaluate(_EXTRACT_JS, _EXTRACT_CFG)
+    harvester.record_stats([f for f, v in dom.items() if v and not harvested.get(f)])
+    return fill_missing(harvested, dom)
+
+async def _extract_post(page: Page, url: str, mode: str = "network",
+                        harvester: Optional[ResponseHarvester] = None) -> Dict:
+    """
+    mode:
+      - "network": fields from the page's own XHR/fetch JSON, DOM only for gaps (default);
+        needs `harvester` attached before navigation, else behaves like "evaluate"
+      - "evaluate": single round trip
+      - "selectors": per-selector waits, kept for debugging selector changes
+    """
+    if mode == "selectors":
+        fields = await _extract_post_selectors(page)
+    elif mode == "network" and harvester is not None:
+        fields = await _extract_post_network(page, harvester)
+    elif mode in ("evaluate", "network"):
+        fields = await _extract_post_evaluate(page)
+    else:
+        raise ValueError(f"Unknown extract mode '{mode}'. Supported: ['network', 'evaluate', 'selectors']")
+    record = _build_record(url, fields)
+    count_missing(record, "browser")
+    return record
+
+async def _scrape_one(page: Page, link: str, extract_mode: str = "network") -> Dict:
+    """Navigate + extract a single URL; never raises, errors are kept on the record."""
+    harvester = ResponseHarvester(link) if extract_mode == "network" else None
+    try:
+        if harvester is not None:
+            harvester.attach(page)  # before goto, so the first XHRs aren't missed
+        # resilient navigation
+        await goto_resilient(page, link, retries=3, timeout=35000)
+        # if failed, don't crash; keep record and let manager decide fallback
+        return await _extract_post(page, link, mode=extract_mode, harvester=harvester)
+    except PWTimeout:
+        inc("extraction_failures_total", tier="browser")
+        return {"platform": "reddit", "reddit_link": link, "error": "Navigation timeout"}
+    except Exception as e:
+        inc("extraction_failures_total", tier="browser")
+        return {"platform": "reddit", "reddit_link": link, "error": str(e)}
+    finally:
+        if harvester is not None:
+            harvester.detach(page)  # pooled pages are reused for the next URL
+
+async def scrape_reddit_posts_async(urls: List[str], page: Page, extract_mode: str = "network") -> List[Dict]:
     """
     Scrape list of reddit post URLs using provided Playwright page.
     Uses goto_resilient for navigation.
+    URL variants of one post are fetched once (common.reddit_urls).
     """
-    norm = _dedupe([u.strip() for u in urls if u])
+    norm = canonical_post_urls(urls)
     results: List[Dict] = []
     for link in norm:
-        try:
-            # resilient navigation
-            await goto_resilient(page, link, retries=3, timeout=35000)
-            rec = await _extract_post(page, link)
-            # if failed, don't crash; keep record and let manager decide fallback
-            results.append(rec)
-        except PWTimeout:
-            results.append({"platform": "reddit", "reddit_link": link, "error": "Navigation timeout"})
-        except Exception as e:
-            results.append({"platform": "reddit", "reddit_link": link, "error": str(e)})
+        results.append(await _scrape_one(page, link, extract_mode))
     return results
+
+async def scrape_reddit_posts_pooled(
+    urls: List[str],
+    browser: Browser,
+    concurrency: int = 4,
+    extract_mode: str = "network",
+    router: Optional[ResourceRouter] = None,
+) -> List[Dict]:
+    """
+    Scrape reddit post URLs with a bounded pool of stealth pages on one browser.
+      - `concurrency` workers, each with its own context/page, pull from a shared queue
+      - results come back in input order (after canonical-URL dedupe)
+      - a failing URL only affects its own record; a crashed page is replaced
+      - every context is closed when its worker finishes
+      - `router` (if given) is installed on every worker context
+    """
+    norm = canonical_post_urls(urls)
+    results: List[Optional[Dict]] = [None] * len(norm)
+    queue: "asyncio.Queue[tuple]" = asyncio.Queue()
+    for item in enumerate(norm):
+        queue.put_nowait(item)
+
+    async def _worker():
+        context, page = None, None
+        try:
+            while True:
+                try:
+                    idx, link = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    if page is None or page.is_closed():
+                        if context is not None:
+                            await _close_quietly(context)
+                        context = await create_stealth_context(browser, router=router)
+                        page = await context.new_page()
+                    results[idx] = await _scrape_one(page, link, extract_mode)
+                except Exception as e:
+                    results[idx] = {"platform": "reddit", "reddit_link": link, "error": str(e)}
+                    page = None
+        finally:
+            if context is not None:
+                await _close_quietly(context)
+
+    workers = max(1, min(concurrency, len(norm)))
+    await asyncio.gather(*(_worker() for _ in range(workers)))
+    return [r for r in results if r is not None]
+
+async def _close_quietly(context) -> None:
+    try:
+        await context.close()
+    except Exception:
+        pass
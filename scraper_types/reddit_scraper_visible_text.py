@@ -1,9 +1,16 @@
 # scraper_types/reddit_scraper_visible_text.py
+import asyncio
 import re
 import time
+import httpx
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict
+from concurrent.futures import Executor
+from typing import List, Dict, Optional
+from common.contact_extractor import extract_contacts
+from common.html_parser import PARSE_STATS, ParsedDoc, timed_parse
+from common.http_cache import ResponseCache, cached_get
+from common.http_client import DEFAULT_HEADERS, get_async_client
+from common.metrics import METRICS, count_missing, inc, log
 
 def _compact_to_int(s: str):
     if not s:
@@ -26,107 +33,167 @@ def _normalize_to_old(url: str) -> str:
         return urlunparse((u.scheme or "https", "old.reddit.com", u.path, u.params, u.query, u.fragment))
     return url
 
-def scrape_reddit_visible_text_seq(urls: List[str]) -> List[Dict]:
+def _first_text(doc: ParsedDoc, selectors: List[str]) -> Optional[str]:
+    for sel in selectors:
+        node = doc.select_one(sel)
+        if node is not None:
+            text = doc.text(node)
+            if text:
+                return text
+    return None
+
+def _parse_visible(link: str, html: str, parser: Optional[str] = "auto") -> Dict:
     """
-    Simple sequential extractor using requests + BeautifulSoup.
-    Returns list of dicts with same base fields as meta extractor.
+    Parse one post page (CPU-bound; safe to run in a worker thread or process).
+    `parser` picks the HTML backend (see common.html_parser); the backend used
+    and the parse+extract time land in result["parser"] / result["parse_ms"].
+    Pure: metrics are recorded by the caller (_record_parse), on the loop side.
     """
-    results = []
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
+    started = time.perf_counter()
+    doc, backend, _ = timed_parse(html, parser)
+
+    title = _first_text(doc, ["h1[data-test-id='post-title']", "h1._eYtD2XCVieq6emjKBH3m", "h1"])
+    author = _first_text(doc, ["a[data-testid='post_author_link']", "a[data-click-id='user']"])
+    subreddit = _first_text(doc, ["a[data-testid='subreddit-name']", "a[data-click-id='subreddit']"])
+
+    # Content paragraphs
+    paras = []
+    for sel in ["div[data-test-id='post-content'] p", "div._1qeIAgB0cPwnLhDF9XSiJM p"]:
+        for p in doc.select(sel):
+            t = doc.text(p)
+            if t:
+                paras.append(t)
+        if paras:
+            break
+    content = "\n".join(paras) if paras else None
+
+    # Upvotes
+    upvotes_text = _first_text(doc, ["div._1rZYMD_4xY3gRcSS3p8ODO"])
+    upvotes_num = _compact_to_int(upvotes_text)
+
+    # Comments
+    comments_text = _first_text(doc, ["span.FHCV02u6Cp2zYL0fhQPsO", "a[data-click-id='comments']"])
+    comments_num = _compact_to_int(comments_text) if comments_text else None
+
+    hrefs = [h for h in (doc.attr(a, "href") for a in doc.select("a[href]")[:100]) if h]
+
+    # contacts from the whole visible page text, one scan
+    # (visible_text strips script/style in place, so it runs last)
+    contacts = extract_contacts(doc.visible_text())
+    hrefs += [u for u in contacts["urls"] if u not in hrefs]
+    external_links = [h for h in hrefs if h and h.startswith("http") and "reddit.com" not in h and "redd.it" not in h]
+
+    result = {
+        "platform": "reddit",
+        "reddit_link": link,
+        "title": title,
+        "subreddit": subreddit,
+        "author": author,
+        "content": content,
+        "upvotes": upvotes_text,
+        "upvotes_num": upvotes_num,
+        "comments": comments_text,
+        "comments_num": comments_num,
+        "external_links": external_links,
+        "emails": contacts["emails"],
+        "phones": contacts["phones"],
+        "scraped_at": int(time.time()),
+        "parser": backend,
+        "parse_ms": round((time.perf_counter() - started) * 1000, 2),
     }
 
-    for link in [u.strip() for u in urls if u and u.strip()]:
-        try:
-            resp = requests.get(link, headers=headers, timeout=20)
-            # if redirected to non-reddit or blocked, try old.reddit
-            if resp.status_code != 200 or "reddit" not in resp.url:
-                old = _normalize_to_old(link)
-                resp = requests.get(old, headers=headers, timeout=20)
-
-            soup = BeautifulSoup(resp.text, "html.parser")
-
-            # Title
-            title = None
-            for sel in [
-                "h1[data-test-id='post-title']",
-                "h1._eYtD2XCVieq6emjKBH3m",
-                "h1"
-            ]:
-                node = soup.select_one(sel)
-                if node and node.get_text(strip=True):
-                    title = node.get_text(strip=True)
-                    break
-
-            # Author
-            author = None
-            node = soup.select_one("a[data-testid='post_author_link']") or soup.select_one("a[data-click-id='user']")
-            if node:
-                author = node.get_text(strip=True)
-
-            # Subreddit
-            subreddit = None
-            node = soup.select_one("a[data-testid='subreddit-name']") or soup.select_one("a[data-click-id='subreddit']")
-            if node:
-                subreddit = node.get_text(strip=True)
-
-            # Content paragraphs
-            paras = []
-            for sel in ["div[data-test-id='post-content'] p", "div._1qeIAgB0cPwnLhDF9XSiJM p"]:
-                for p in soup.select(sel):
-                    t = p.get_text(strip=True)
-                    if t:
-                        paras.append(t)
-                if paras:
-                    break
-            content = "\n".join(paras) if paras else None
-
-            # Upvotes
-            upvotes_text = None
-            node = soup.select_one("div._1rZYMD_4xY3gRcSS3p8ODO")
-            if node:
-                upvotes_text = node.get_text(strip=True)
-            upvotes_num = _compact_to_int(upvotes_text)
-
-            # Comments
-            comments_text = None
-            node = soup.select_one("span.FHCV02u6Cp2zYL0fhQPsO") or soup.select_one("a[data-click-id='comments']")
-            if node:
-                comments_text = node.get_text(strip=True)
-            comments_num = _compact_to_int(comments_text) if comments_text else None
-
-            hrefs = [a.get("href") for a in soup.select("a[href]")[:100] if a.get("href")]
-            external_links = [h for h in hrefs if h and h.startswith("http") and "reddit.com" not in h and "redd.it" not in h]
-
-            result = {
-                "platform": "reddit",
-                "reddit_link": link,
-                "title": title,
-                "subreddit": subreddit,
-                "author": author,
-                "content": content,
-                "upvotes": upvotes_text,
-                "upvotes_num": upvotes_num,
-                "comments": comments_text,
-                "comments_num": comments_num,
-                "external_links": external_links,
-                "emails": [],
-                "phones": [],
-                "scraped_at": int(time.time())
-            }
-
-            if not (title or content):
-                result["error"] = "Failed to extract"
-
-            results.append(result)
-            print(f"[OK] Scraped: {link} → title={bool(title)} author={bool(author)}")
-        except Exception as e:
-            results.append({"platform": "reddit", "reddit_link": link, "error": str(e)})
-            print(f"[ERR] {link} → {e}")
+    if not (title or content):
+        result["error"] = "Failed to extract"
+    return result
+
+def _record_parse(result: Dict) -> None:
+    # in the calling process: a ProcessPoolExecutor child's registry would be lost
+    if result.get("parser"):
+        PARSE_STATS.record(result["parser"], result.get("parse_ms") or 0.0)
+        METRICS.observe("stage_duration_seconds", (result.get("parse_ms") or 0.0) / 1000,
+                        stage="parse", backend=result["parser"])
+    count_missing(result, "bs4")
+
+def scrape_reddit_visible_text_seq(
+    urls: List[str], parser: Optional[str] = "auto", cache: Optional[ResponseCache] = None
+) -> List[Dict]:
+    """
+    Simple sequential extractor using requests + the fastest installed HTML parser.
+    `cache` (common.http_cache.ResponseCache) is used like in the async tiers.
+    Returns list of dicts with same base fields as meta extractor.
+    """
+    results = []
+    with requests.Session() as session:
+        session.headers.update(DEFAULT_HEADERS)
+        for link in [u.strip() for u in urls if u and u.strip()]:
+            try:
+                resp = cached_get(session, link, cache, timeout=20)
+                # if redirected to non-reddit or blocked, try old.reddit
+                if resp.status_code != 200 or "reddit" not in resp.url:
+                    old = _normalize_to_old(link)
+                    resp = cached_get(session, old, cache, timeout=20)
+
+                result = _parse_visible(link, resp.text, parser)
+                _record_parse(result)
+                results.append(result)
+                log("scraped", tier="bs4", url=link, title=bool(result.get("title")), author=bool(result.get("author")))
+            except Exception as e:
+                results.append({"platform": "reddit", "reddit_link": link, "error": str(e)})
+                inc("extraction_failures_total", tier="bs4")
+                log("scrape_failed", "error", tier="bs4", url=link, error=str(e))
 
     return results
+
+async def _parse_off_loop(link: str, html: str, parser: Optional[str], executor: Optional[Executor]) -> Dict:
+    # parsing is CPU-bound: keep it off the event loop. Default is a thread;
+    # pass a ProcessPoolExecutor for big thread pages so the GIL isn't shared.
+    if executor is None:
+        return await asyncio.to_thread(_parse_visible, link, html, parser)
+    return await asyncio.get_running_loop().run_in_executor(executor, _parse_visible, link, html, parser)
+
+async def _fetch_visible(
+    client: httpx.AsyncClient,
+    link: str,
+    parser: Optional[str] = "auto",
+    executor: Optional[Executor] = None,
+) -> Dict:
+    try:
+        resp = await client.get(link)
+        # if redirected to non-reddit or blocked, try old.reddit
+        if resp.status_code != 200 or "reddit" not in str(resp.url):
+            resp = await client.get(_normalize_to_old(link))
+
+        result = await _parse_off_loop(link, resp.text, parser, executor)
+        _record_parse(result)
+        log("scraped", tier="bs4", url=link, title=bool(result.get("title")), author=bool(result.get("author")))
+        return result
+    except Exception as e:
+        inc("extraction_failures_total", tier="bs4")
+        log("scrape_failed", "error", tier="bs4", url=link, error=str(e))
+        return {"platform": "reddit", "reddit_link": link, "error": str(e)}
+
+async def scrape_reddit_visible_text_async(
+    urls: List[str],
+    concurrency: int = 8,
+    client: Optional[httpx.AsyncClient] = None,
+    parser: Optional[str] = "auto",
+    executor: Optional[Executor] = None,
+) -> List[Dict]:
+    """
+    asyncio version of scrape_reddit_visible_text_seq.
+      - one pooled keep-alive client (pass your own to share it)
+      - at most `concurrency` URLs in flight
+      - parsing in a worker thread, or `executor` (e.g. a ProcessPoolExecutor)
+      - results in input order
+    """
+    links = [u.strip() for u in urls if u and u.strip()]
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _bounded(c: httpx.AsyncClient, link: str) -> Dict:
+        async with sem:
+            return await _fetch_visible(c, link, parser, executor)
+
+    if client is not None:
+        return list(await asyncio.gather(*(_bounded(client, l) for l in links)))
+    async with get_async_client(concurrency=concurrency) as own:
+        return list(await asyncio.gather(*(_bounded(own, l) for l in links)))
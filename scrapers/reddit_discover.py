@@ -0,0 +1,146 @@
+# scrapers/reddit_discover.py
+# Subreddit discovery: listing pages -> post URLs -> the usual pipeline.
+#   python -m scrapers.reddit_discover --sub forhire --sub slavelabour [--sort new] [--frontier .frontier.sqlite]
+# Later runs only fetch posts newer than the stored per-subreddit watermark.
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from common.http_client import get_async_client
+from common.listing_cursors import ListingCursors
+from common.metrics import log
+from common.output_sinks import write_records
+from common.reddit_urls import canonical_post_urls
+from scraper_types.reddit_scraper_listing import iter_listing
+from scrapers.reddit_scraper import main
+
+
+def _sub_name(s: str) -> str:
+    s = s.strip().strip("/")
+    return s[2:] if s.lower().startswith("r/") else s
+
+
+async def discover(
+    subreddits: List[str],
+    sort: str = "new",
+    cursors: Optional[ListingCursors] = None,
+    max_pages: int = 10,
+    time_filter: str = "day",
+    http_concurrency: int = 4,
+) -> Tuple[List[str], Dict[str, Dict[str, Any]]]:
+    """
+    Walk each subreddit's listing (concurrently across subreddits, paced per host).
+    Returns (canonical post URLs, one per post, per-subreddit
+    {"found", "incremental", "newest", "complete", "after"}).
+    A sort="new" walk that stopped at max_pages resumes from its stored cursor
+    on the next run; "newest" then also covers the unfinished walk's newest post.
+    Watermarks are NOT committed here; see commit_watermarks().
+    """
+    found: Dict[str, List[str]] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+
+    async with get_async_client(concurrency=http_concurrency) as client:
+        async def _one(sub: str) -> None:
+            since = cursors.get(sub, sort) if cursors is not None else None
+            resume = (since or {}).get("resume_after") if sort == "new" else None
+            urls, newest, walk = [], None, {}
+            if resume and since.get("pending_post_id"):
+                newest = {"post_id": since["pending_post_id"], "created_utc": since["pending_created_utc"]}
+            try:
+                async for post in iter_listing(client, sub, sort, since=since, max_pages=max_pages,
+                                               time_filter=time_filter, after=resume, walk=walk):
+                    urls.append(post["url"])
+                    if newest is None or post["created_utc"] > newest["created_utc"]:
+                        newest = {"post_id": post["post_id"], "created_utc": post["created_utc"]}
+            except Exception as e:
+                # keep what was found, but don't move the watermark past posts we never saw
+                newest, walk = None, {}
+                log("discover_failed", "error", subreddit=sub, sort=sort, error=str(e))
+            found[sub] = urls
+            report[sub] = {"found": len(urls), "incremental": bool(since and since.get("post_id")),
+                           "newest": newest, "complete": bool(walk.get("complete")), "after": walk.get("after")}
+
+        await asyncio.gather(*(_one(_sub_name(s)) for s in subreddits if _sub_name(s)))
+
+    links = canonical_post_urls(u for urls in found.values() for u in urls)
+    for sub, row in report.items():
+        log("discovered", subreddit=sub, sort=sort, found=row["found"], incremental=row["incremental"])
+    return links, report
+
+
+def commit_watermarks(cursors: ListingCursors, sort: str, report: Dict[str, Dict[str, Any]]) -> None:
+    """
+    Complete walks advance the watermark (and drop any resume cursor); a walk
+    cut short by max_pages keeps the old watermark and stores where to resume.
+    Failed walks leave everything as it was.
+    """
+    for sub, row in report.items():
+        newest = row.get("newest")
+        if row.get("complete"):
+            if newest:
+                cursors.set(sub, sort, newest["post_id"], newest["created_utc"])
+            else:
+                cursors.clear_resume(sub, sort)
+        elif row.get("after"):
+            cursors.set_resume(sub, sort, row["after"], *((newest["post_id"], newest["created_utc"]) if newest else ()))
+            log("discover_partial", "warn", subreddit=sub, sort=sort, resume_after=row["after"])
+
+
+async def crawl_subreddits(
+    subreddits: List[str],
+    sort: str = "new",
+    cursor_path: str = ".listing_cursors.sqlite",
+    frontier=None,
+    max_pages: int = 10,
+    time_filter: str = "day",
+    **main_kwargs,
+) -> Dict[str, Any]:
+    """
+    Discover new posts and hand them off:
+      - `frontier` (common.frontier.Frontier) given: enqueue the URLs and return;
+        a reddit_test.py --frontier run (or any drain()) scrapes them
+      - otherwise: run scrapers.reddit_scraper.main() on them right away
+    The watermark is committed only after the hand-off succeeds, so a crash
+    in between re-discovers the same posts instead of losing them.
+    """
+    cursors = ListingCursors(cursor_path)
+    try:
+        urls, report = await discover(subreddits, sort, cursors, max_pages, time_filter)
+        result: Dict[str, Any] = {"urls": urls, "subreddits": report}
+        if frontier is not None:
+            result["enqueued"] = frontier.enqueue(urls)
+        elif urls:
+            result["docs"] = await main(urls, **main_kwargs)
+        commit_watermarks(cursors, sort, report)
+        return result
+    finally:
+        cursors.close()
+
+
+if __name__ == "__main__":
+    from common.frontier import Frontier
+
+    parser = argparse.ArgumentParser(description="Discover new posts from subreddit listings.")
+    parser.add_argument("--sub", action="append", required=True, help="subreddit name (repeatable)")
+    parser.add_argument("--sort", default="new", choices=["new", "hot", "top", "rising"])
+    parser.add_argument("--t", default="day", help="time filter for --sort top")
+    parser.add_argument("--max-pages", type=int, default=10, help="listing pages (100 posts each) per subreddit")
+    parser.add_argument("--cursors", default=".listing_cursors.sqlite")
+    parser.add_argument("--frontier", default=None, help="enqueue into this frontier instead of scraping now")
+    parser.add_argument("--out", default="reddit_discovered.json",
+                        help="scraped docs (when not using --frontier): .json, .ndjson[.gz|.zst] or .parquet")
+    args = parser.parse_args()
+
+    frontier = Frontier(args.frontier) if args.frontier else None
+    res = asyncio.run(crawl_subreddits(
+        args.sub, args.sort, args.cursors, frontier, args.max_pages, args.t,
+    ))
+    print(json.dumps(res["subreddits"], indent=2))
+    if frontier is not None:
+        print(f"[frontier] enqueued {res['enqueued']} new URLs; {frontier.stats()}")
+        frontier.close()
+    elif res.get("docs") is not None:
+        files = write_records(args.out, res["docs"])
+        print(f"[OK] Wrote {len(res['docs'])} docs to {', '.join(files)}")
@@ -1,90 +1,402 @@
 # scrapers/reddit_scraper.py
-from typing import List, Dict, Any
-from collections import defaultdict
-from playwright.async_api import async_playwright
-from common.browser_manager import get_browser, get_stealth_page
-from scraper_types.reddit_scraper_meta import scrape_reddit_posts_async
-from scraper_types.reddit_scraper_visible_text import scrape_reddit_visible_text_seq
+import asyncio
+from contextlib import AsyncExitStack
+from typing import List, Dict, Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple, Union
+import httpx
+from common.browser_manager import LazyBrowser, PagePool
+from scraper_types.reddit_scraper_meta import scrape_reddit_posts_pooled, reddit_router, _scrape_one
+from scraper_types.reddit_scraper_visible_text import scrape_reddit_visible_text_async, _fetch_visible
+from scraper_types.reddit_scraper_json import scrape_reddit_json_async, _fetch_json
+from scraper_types.reddit_scraper_comments import scrape_comment_contacts
+from common.contact_extractor import extract_contacts
+from common.fingerprint import content_hash
+from common.schema_projector import compile_schema
+from common.http_client import get_async_client
+from common.html_parser import PARSE_STATS
+from common.metrics import METRICS, log, span, timed
+from common.http_cache import ResponseCache
+from common.rate_limiter import get_scheduler
+from common.reddit_urls import canonical_post_urls, first_seen, parse_post_url
 
-def _merge_records(meta_list: List[Dict[str, Any]], vis_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    by_url: Dict[str, Dict[str, Any]] = defaultdict(dict)
-
-    def _merge_one(rec: Dict[str, Any]):
-        url = rec.get("reddit_link") or rec.get("url")
-        if not url:
-            return
-        if url not in by_url:
-            by_url[url] = {}
+def _merge_key(link: str) -> str:
+    # keyed on post id, so www./old./redd.it/... variants of a post merge into one record
+    return parse_post_url(link)[0] or link
+
+def _merge_into(by_key: Dict[str, Dict[str, Any]], recs: Iterable[Dict[str, Any]]) -> List[str]:
+    """Fold raw records into `by_key` (first non-empty scalar wins, lists unioned); returns touched keys."""
+    touched: Dict[str, None] = {}
+    for rec in recs:
+        link = rec.get("reddit_link") or rec.get("url")
+        if not link:
+            continue
+        key = _merge_key(link)
+        pid = parse_post_url(link)[0]
+        merged = by_key.get(key)
+        if merged is None:
+            merged = by_key[key] = {"post_id": pid} if pid else {}
+        touched[key] = None
         for k, v in rec.items():
             if k == "reddit_link":
-                by_url[url]["reddit_link"] = v
+                merged.setdefault("reddit_link", v)  # first variant seen
                 continue
             if isinstance(v, list):
-                base = by_url[url].get(k) or []
+                base = merged.get(k) or []
                 seen = set(base)
                 for item in v:
                     if item not in seen:
                         base.append(item)
                         seen.add(item)
-                by_url[url][k] = base
-            else:
-                if not by_url[url].get(k) and v not in (None, "", []):
-                    by_url[url][k] = v
+                merged[k] = base
+            elif not merged.get(k) and v not in (None, "", []):
+                merged[k] = v
+    return list(touched)
 
-    for rec in meta_list or []:
-        _merge_one(rec)
-    for rec in vis_list or []:
-        _merge_one(rec)
+def _finish_merged(rec: Dict[str, Any]) -> None:
+    if (rec.get("title") or rec.get("content")) and "error" in rec:
+        rec.pop("error", None)
+    # re-scan the merged title/body: a tier may have skipped contact extraction
+    found = extract_contacts(" ".join(filter(None, [rec.get("title"), rec.get("content")])))
+    for key in ("emails", "phones"):
+        have = rec.get(key) or []
+        rec[key] = have + [v for v in found[key] if v not in have]
+
+@timed("merge")
+def _merge_records(meta_list: List[Dict[str, Any]], vis_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    by_key: Dict[str, Dict[str, Any]] = {}
+    _merge_into(by_key, meta_list or [])
+    _merge_into(by_key, vis_list or [])
+    for rec in by_key.values():
+        _finish_merged(rec)
+    return list(by_key.values())
 
-    for url, rec in list(by_url.items()):
-        if (rec.get("title") or rec.get("content")) and "error" in rec:
-            rec.pop("error", None)
+# Output shape of a reddit schema doc; template values are the defaults.
+REDDIT_DOC_TEMPLATE = {
+    "url": "",
+    "post_id": "",
+    "platform": "reddit",
+    "content_type": "post",
+    "source": "web-scraper",
+    "profile": {
+        "username": "",
+        "full_name": "",
+        "bio": ""
+    },
+    "post": {
+        "title": "",
+        "body": "",
+        "subreddit": ""
+    },
+    "engagement": {
+        "num_comments": None,
+        "num_upvotes": None
+    },
+    "contact_info": {
+        "emails": [],
+        "phones": []
+    },
+    "external_links": [],
+    "posted": None
+}
 
-    return list(by_url.values())
+# column types for the template's None leaves and the fields _to_schema adds (Parquet output)
+REDDIT_DOC_TYPES = {
+    "engagement.num_comments": "int64",
+    "engagement.num_upvotes": "int64",
+    "posted": "string",
+    "content_hash": "string",
+}
+
+# schema path -> raw record fields ([] = constant from the template)
+REDDIT_DOC_ALIAS = {
+    "url": ["reddit_link"],
+    "post_id": ["post_id"],
+    "platform": [],
+    "content_type": [],
+    "source": [],
+    "profile.username": ["author"],
+    "profile.full_name": [],
+    "profile.bio": [],
+    "post.title": ["title"],
+    "post.body": ["content"],
+    "post.subreddit": ["subreddit"],
+    "engagement.num_comments": ["comments_num"],
+    "engagement.num_upvotes": ["upvotes_num"],
+    "contact_info.emails": ["emails"],
+    "contact_info.phones": ["phones"],
+    "external_links": ["external_links"],
+    "posted": ["posted"],
+}
+
+_REDDIT_PROJECTOR = compile_schema(REDDIT_DOC_TEMPLATE, REDDIT_DOC_ALIAS, use_defaults=True)
 
 def _to_schema(raw: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "url": raw.get("reddit_link", ""),
-        "platform": "reddit",
-        "content_type": "post",
-        "source": "web-scraper",
-        "profile": {
-            "username": raw.get("author") or "",
-            "full_name": "",
-            "bio": ""
-        },
-        "post": {
-            "title": raw.get("title") or "",
-            "body": raw.get("content") or "",
-            "subreddit": raw.get("subreddit") or ""
-        },
-        "engagement": {
-            "num_comments": raw.get("comments_num"),
-            "num_upvotes": raw.get("upvotes_num")
-        },
-        "contact_info": {
-            "emails": raw.get("emails") or [],
-            "phones": raw.get("phones") or []
-        },
-        "external_links": raw.get("external_links") or [],
-        "posted": raw.get("posted")
-    }
-
-async def main(urls: List[str], headless: bool = True) -> List[Dict[str, Any]]:
-    async with async_playwright() as p:
-        browser = await get_browser(p, headless=headless)
-        # get_stealth_page returns a page bound to a stealth context
-        page = await get_stealth_page(browser)
+    doc = _REDDIT_PROJECTOR.project(raw)
+    doc["content_hash"] = content_hash(doc)
+    return doc
+
+async def _browser_pass(
+    urls: List[str],
+    lazy: LazyBrowser,
+    concurrency: int,
+    extract_mode: str,
+    block_resources: bool,
+    cache: Optional[ResponseCache] = None,
+) -> List[Dict[str, Any]]:
+    router = reddit_router(cache) if (block_resources or cache is not None) else None
+    browser = await lazy.get()
+    try:
+        # `concurrency` stealth contexts/pages share this one browser
+        return await scrape_reddit_posts_pooled(
+            urls, browser, concurrency=concurrency, extract_mode=extract_mode, router=router
+        )
+    finally:
+        if router is not None:
+            log("router_stats", **router.stats())
+
+async def _visible_pass(
+    urls: List[str], http_concurrency: int, cache: Optional[ResponseCache], parser: Optional[str] = "auto"
+) -> List[Dict[str, Any]]:
+    async with get_async_client(concurrency=http_concurrency, cache=cache) as client:
+        return await scrape_reddit_visible_text_async(urls, http_concurrency, client, parser=parser)
+
+# A record missing any of these after the cheap tiers goes to the browser.
+# "content" is not required by default: link posts legitimately have no body.
+KEY_FIELDS = ("title", "author")
+
+def _is_complete(rec: Dict[str, Any], key_fields=KEY_FIELDS) -> bool:
+    # _merge_records already drops "error" once any tier found a title/content
+    if "error" in rec:
+        return False
+    return all(rec.get(f) not in (None, "", []) for f in key_fields)
+
+async def run_tiered(
+    urls: List[str],
+    headless: bool = True,
+    concurrency: int = 4,
+    http_concurrency: int = 8,
+    extract_mode: str = "network",
+    block_resources: bool = True,
+    key_fields: Tuple[str, ...] = KEY_FIELDS,
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = "auto",
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Tiered extraction, cheapest first; each tier only sees what the previous missed:
+      1) post JSON over HTTP
+      2) requests/BS4 on the HTML page
+      3) Playwright browser pool, launched lazily and only if something is left
+    A URL counts as done once its merged record has no extraction error and
+    every field in `key_fields` is non-empty.
+    `cache` (common.http_cache.ResponseCache) is shared by the HTTP tiers and
+    the browser's document requests.
+    `parser` picks the HTML backend for tier 2 (common.html_parser).
+    URLs are canonicalized first (common.reddit_urls): variants of one post are
+    fetched, merged and returned once.
+    Returns (merged raw records, per-tier stats, incl. per-parser timings).
+    """
+    links = canonical_post_urls(urls)
+    merged: Dict[str, Dict[str, Any]] = {}  # running merge; each tier only folds in its own records
+    stats: Dict[str, Any] = {"total": len(links)}
+    remaining = links
+
+    def _tally(tier: str, recs: List[Dict[str, Any]]) -> List[str]:
+        with span("merge"):
+            for key in _merge_into(merged, recs):
+                _finish_merged(merged[key])
+        left = [u for u in remaining if not _is_complete(merged.get(_merge_key(u), {}), key_fields)]
+        filled = len(remaining) - len(left)
+        stats[tier] = {
+            "attempted": len(remaining),
+            "filled": filled,
+            "hit_rate": round(filled / len(remaining), 3) if remaining else None,
+        }
+        return left
+
+    async with get_async_client(concurrency=http_concurrency, cache=cache) as client:
+        remaining = _tally("json", await scrape_reddit_json_async(remaining, http_concurrency, client))
+        if remaining:
+            remaining = _tally("bs4", await scrape_reddit_visible_text_async(remaining, http_concurrency, client, parser=parser))
+
+    async with LazyBrowser(headless=headless) as lazy:
+        if remaining:
+            remaining = _tally("browser", await _browser_pass(remaining, lazy, concurrency, extract_mode, block_resources, cache))
+        stats["browser_launched"] = lazy.launched
+
+    stats["unfilled"] = len(remaining)
+    stats["hosts"] = get_scheduler().stats()
+    stats["parsers"] = PARSE_STATS.snapshot()
+    stats["metrics"] = METRICS.snapshot()
+    if cache is not None:
+        stats["cache"] = cache.stats()
+    # earlier (cheaper, more structured) tiers win on scalar fields
+    return list(merged.values()), stats
+
+_DONE = object()
+
+async def _aiter(urls: Union[Iterable[str], AsyncIterable[str]]) -> AsyncIterator[str]:
+    if hasattr(urls, "__aiter__"):
+        async for u in urls:
+            yield u
+    else:
+        for u in urls:
+            yield u
+
+async def stream_reddit_posts(
+    urls: Union[Iterable[str], AsyncIterable[str]],
+    headless: bool = True,
+    concurrency: int = 4,
+    http_concurrency: int = 8,
+    extract_mode: str = "network",
+    block_resources: bool = True,
+    key_fields: Tuple[str, ...] = KEY_FIELDS,
+    cache: Optional[ResponseCache] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    parser: Optional[str] = "auto",
+    client: Optional[httpx.AsyncClient] = None,
+    pool: Optional[PagePool] = None,
+    comment_limit: int = 0,
+    comment_depth: int = 10,
+    on_skip: Optional[Callable[[str], Awaitable[None]]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async generator: yields one schema doc per URL as soon as that URL is done
+    (completion order, not input order).
+      - same JSON -> BS4 -> browser cascade as run_tiered, but per URL
+      - `urls` is consumed lazily and all queues are bounded, so memory stays
+        flat however long the input is (only the dedupe set of post ids grows)
+      - `urls` may be sync or async (e.g. Frontier.adrain())
+      - URLs are canonicalized; a post's www./old./redd.it/... variants run once,
+        and each dropped repeat is handed to `on_skip` (e.g. Frontier.arelease)
+      - browser pages come from a lazily launched pool of `concurrency` pages
+      - `parser` picks the HTML backend for the BS4 tier (common.html_parser)
+      - `stats` (if given) is filled with per-tier counts and per-parser timings
+      - `client` / `pool` (if given) are borrowed, not closed: a long-lived
+        service passes its warm ones so a batch starts without a cold launch
+      - `comment_limit` > 0 also streams up to that many comments per post
+        (down to `comment_depth`) and merges their contacts into the doc
+    """
+    stats = stats if stats is not None else {}
+    stats.update({"total": 0, "json": 0, "bs4": 0, "browser": 0, "unfilled": 0, "comments_scanned": 0})
+    workers = max(1, http_concurrency)
+    in_q: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    out_q: asyncio.Queue = asyncio.Queue(maxsize=workers * 2)
+    router = reddit_router(cache) if (block_resources or cache is not None) else None
+
+    async with AsyncExitStack() as stack:
+        if client is None:
+            client = await stack.enter_async_context(get_async_client(concurrency=http_concurrency, cache=cache))
+        own_pool = pool is None
+        if own_pool:
+            lazy = await stack.enter_async_context(LazyBrowser(headless=headless))
+            pool = PagePool(lazy, concurrency, router=router)
+
+        async def _cascade(link: str) -> Dict[str, Any]:
+            recs = [await _fetch_json(client, link)]
+            merged = _merge_records(recs, [])[0]
+            if _is_complete(merged, key_fields):
+                stats["json"] += 1
+                return merged
+            recs.append(await _fetch_visible(client, link, parser))
+            merged = _merge_records(recs, [])[0]
+            if _is_complete(merged, key_fields):
+                stats["bs4"] += 1
+                return merged
+            page = await pool.acquire()
+            try:
+                recs.append(await _scrape_one(page, link, extract_mode))
+            finally:
+                pool.release(page)
+            merged = _merge_records(recs, [])[0]
+            stats["browser" if _is_complete(merged, key_fields) else "unfilled"] += 1
+            return merged
+
+        async def _feed():
+            seen: set = set()
+            try:
+                async for u in _aiter(urls):
+                    link = first_seen(u, seen)
+                    if link is None:
+                        if on_skip is not None and u and u.strip():
+                            await on_skip(u)
+                        continue
+                    stats["total"] += 1
+                    await in_q.put(link)
+            except Exception as e:
+                # stop feeding but let workers drain and finish cleanly
+                stats["feed_error"] = str(e)
+            for _ in range(workers):
+                await in_q.put(_DONE)
+
+        async def _work():
+            while True:
+                link = await in_q.get()
+                if link is _DONE:
+                    break
+                try:
+                    raw = await _cascade(link)
+                except Exception as e:
+                    stats["unfilled"] += 1
+                    raw = {"platform": "reddit", "reddit_link": link, "error": str(e)}
+                if comment_limit > 0:
+                    found = await scrape_comment_contacts(client, link, comment_limit, comment_depth)
+                    stats["comments_scanned"] += found.pop("comments_scanned")
+                    raw = _merge_records([raw, found], [])[0]
+                await out_q.put(_to_schema(raw))
+            await out_q.put(_DONE)
+
+        tasks = [asyncio.create_task(_feed())] + [asyncio.create_task(_work()) for _ in range(workers)]
         try:
-            meta_results = await scrape_reddit_posts_async(urls, page)
+            finished = 0
+            while finished < workers:
+                item = await out_q.get()
+                if item is _DONE:
+                    finished += 1
+                    continue
+                yield item
         finally:
-            # close browser to free resources
-            try:
-                await browser.close()
-            except Exception:
-                pass
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if own_pool:
+                await pool.close()
+            stats["browser_launched"] = pool.lazy.launched
+            stats["parsers"] = PARSE_STATS.snapshot()
+            stats["metrics"] = METRICS.snapshot()
 
-    visual_results = scrape_reddit_visible_text_seq(urls)
-    merged = _merge_records(meta_results, visual_results)
+async def main(
+    urls: List[str],
+    headless: bool = True,
+    concurrency: int = 4,
+    http_concurrency: int = 8,
+    extract_mode: str = "network",
+    block_resources: bool = True,
+    strategy: str = "tiered",
+    cache: Optional[ResponseCache] = None,
+    parser: Optional[str] = "auto",
+) -> List[Dict[str, Any]]:
+    """
+    strategy:
+      - "tiered": JSON -> BS4 -> browser, each tier only for URLs still incomplete;
+        Chromium is never started if the HTTP tiers fill everything (default)
+      - "parallel": browser pass and BS4 pass over every URL, side by side
+    cache: optional ResponseCache; ResponseCache(mode="replay") re-runs parsers offline
+    parser: HTML backend for the BS4 tier ("auto", "selectolax", "lxml", "bs4")
+    """
+    urls = canonical_post_urls(urls)
+    if strategy == "tiered":
+        merged, stats = await run_tiered(
+            urls, headless, concurrency, http_concurrency, extract_mode, block_resources, cache=cache, parser=parser
+        )
+        log("tier_stats", **stats)
+    elif strategy == "parallel":
+        # wall time is max(meta, visible)
+        async with LazyBrowser(headless=headless) as lazy:
+            meta_results, visual_results = await asyncio.gather(
+                _browser_pass(urls, lazy, concurrency, extract_mode, block_resources, cache),
+                _visible_pass(urls, http_concurrency, cache, parser),
+            )
+        merged = _merge_records(meta_results, visual_results)
+    else:
+        raise ValueError(f"Unknown strategy '{strategy}'. Supported: ['tiered', 'parallel']")
     schema_docs = [_to_schema(m) for m in merged]
     return schema_docs
@@ -0,0 +1,305 @@
+# scrapers/reddit_service.py
+# Long-running scraper daemon: one warm browser + HTTP client shared by every
+# batch, behind a small local HTTP API.
+#   python -m scrapers.reddit_service --port 8765 [--pages 4] [--recycle-pages 50] [--recycle-mb 300]
+#
+#   POST /scrape   {"urls": [...]}  -> {"docs": [...], "stats": {...}, "elapsed_ms": ...}   (waits)
+#   POST /jobs     {"urls": [...]}  -> {"job_id": "..."}                                    (returns at once)
+#                  more than max_batch URLs -> 413 {"error": ..., "max_batch": N, "urls": M}
+#   GET  /jobs/<id>                 -> {"state": "queued|running|done|failed", ...}
+#   GET  /health                    -> service / pool status
+#   GET  /metrics                   -> Prometheus text (common.metrics)
+
+import argparse
+import asyncio
+import json
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import AsyncExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+from common.browser_manager import LazyBrowser, PagePool
+from common.http_cache import ResponseCache
+from common.http_client import get_async_client
+from common.metrics import METRICS, inc, log
+from scraper_types.reddit_scraper_meta import reddit_router
+from scrapers.reddit_scraper import stream_reddit_posts
+
+
+class BatchTooLarge(ValueError):
+    """A batch has more URLs than the service's max_batch; nothing was scraped."""
+
+    def __init__(self, urls: int, max_batch: int):
+        super().__init__(f"batch of {urls} URLs exceeds max_batch={max_batch}; split it")
+        self.urls = urls
+        self.max_batch = max_batch
+
+
+class ScraperService:
+    """
+    Keeps the expensive parts alive between batches:
+      - Chromium launched once at start(), `pages` stealth contexts pre-created
+      - contexts recycled after `recycle_pages` URLs or `recycle_mb` MB of JS heap
+      - a crashed browser is relaunched by a watchdog (and by the pool on demand)
+      - one pooled keep-alive HTTP client for the JSON/BS4 tiers
+    scrape(urls) runs the usual JSON -> BS4 -> browser cascade on the warm pool;
+    batches over `max_batch` URLs are refused whole (BatchTooLarge), never truncated.
+    """
+
+    def __init__(
+        self,
+        *,
+        pages: int = 4,
+        http_concurrency: int = 8,
+        headless: bool = True,
+        extract_mode: str = "network",
+        block_resources: bool = True,
+        cache: Optional[ResponseCache] = None,
+        parser: Optional[str] = "auto",
+        recycle_pages: Optional[int] = 50,
+        recycle_mb: Optional[float] = 300.0,
+        max_batch: int = 1000,
+        keep_jobs: int = 200,
+        watchdog_interval: float = 5.0,
+    ):
+        self.pages = pages
+        self.http_concurrency = http_concurrency
+        self.extract_mode = extract_mode
+        self.block_resources = block_resources
+        self.cache = cache
+        self.parser = parser
+        self.max_batch = max_batch
+        self.keep_jobs = keep_jobs
+        self.watchdog_interval = watchdog_interval
+        self.lazy = LazyBrowser(headless=headless)
+        router = reddit_router(cache) if (block_resources or cache is not None) else None
+        self.pool = PagePool(self.lazy, pages, router=router, max_uses=recycle_pages, max_heap_mb=recycle_mb)
+        self.client = None
+        self.jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.batches = 0
+        self.urls_served = 0
+        self.started_at: Optional[float] = None
+        self._stack = AsyncExitStack()
+        self._watchdog: Optional[asyncio.Task] = None
+        self._tasks: set = set()  # running jobs; the loop only holds weak references
+
+    async def start(self) -> None:
+        started = time.perf_counter()
+        self.client = await self._stack.enter_async_context(
+            get_async_client(concurrency=self.http_concurrency, cache=self.cache)
+        )
+        await self.lazy.get()
+        await self.pool.warm()
+        self._watchdog = asyncio.create_task(self._watch())
+        self.started_at = time.time()
+        log("service_ready", pages=self.pages, warmup_ms=round((time.perf_counter() - started) * 1000))
+
+    async def _watch(self) -> None:
+        # relaunch proactively so the next batch doesn't pay for it
+        while True:
+            await asyncio.sleep(self.watchdog_interval)
+            if not self.lazy.connected:
+                try:
+                    await self.lazy.get()
+                except Exception as e:
+                    log("browser_relaunch_failed", "error", error=str(e))
+
+    def _links(self, urls: List[str]) -> List[str]:
+        links = [u for u in urls if isinstance(u, str) and u.strip()]
+        if self.max_batch and len(links) > self.max_batch:
+            inc("service_batches_rejected_total", reason="too_large")
+            raise BatchTooLarge(len(links), self.max_batch)
+        return links
+
+    async def scrape(self, urls: List[str]) -> Dict[str, Any]:
+        links = self._links(urls)
+        started = time.perf_counter()
+        stats: Dict[str, Any] = {}
+        docs = [
+            doc async for doc in stream_reddit_posts(
+                links,
+                http_concurrency=self.http_concurrency,
+                extract_mode=self.extract_mode,
+                block_resources=self.block_resources,
+                cache=self.cache,
+                stats=stats,
+                parser=self.parser,
+                client=self.client,
+                pool=self.pool,
+            )
+        ]
+        self.batches += 1
+        self.urls_served += len(links)
+        inc("service_batches_total")
+        # the registry snapshot is served on /metrics; keep responses small
+        stats.pop("metrics", None)
+        return {"docs": docs, "stats": stats, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def submit(self, urls: List[str]) -> str:
+        """Queue a batch in the background; poll job(job_id). Oversized batches raise BatchTooLarge."""
+        links = self._links(urls)
+        job_id = uuid.uuid4().hex[:12]
+        self.jobs[job_id] = {"state": "queued", "urls": len(links), "submitted_at": time.time()}
+        while len(self.jobs) > self.keep_jobs:
+            self.jobs.popitem(last=False)
+        task = asyncio.create_task(self._run_job(job_id, links))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job_id
+
+    async def _run_job(self, job_id: str, urls: List[str]) -> None:
+        job = self.jobs.get(job_id)
+        if job is None:
+            return
+        job["state"] = "running"
+        try:
+            job.update(await self.scrape(urls))
+            job["state"] = "done"
+        except Exception as e:
+            job.update({"state": "failed", "error": str(e)})
+            log("job_failed", "error", job_id=job_id, error=str(e))
+
+    def job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.jobs.get(job_id)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1) if self.started_at else 0,
+            "browser_connected": self.lazy.connected,
+            "batches": self.batches,
+            "urls_served": self.urls_served,
+            "pool": self.pool.stats(),
+            "jobs": {s: sum(1 for j in self.jobs.values() if j["state"] == s)
+                     for s in ("queued", "running", "done", "failed")},
+        }
+
+    async def aclose(self) -> None:
+        if self._watchdog is not None:
+            self._watchdog.cancel()
+            await asyncio.gather(self._watchdog, return_exceptions=True)
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        await self.pool.close()
+        await self.lazy.aclose()
+        await self._stack.aclose()
+
+
+def _make_handler(service: ScraperService, loop: asyncio.AbstractEventLoop, timeout: float):
+    """HTTP handler run on server threads; every call hops onto the service's loop."""
+
+    def _call(coro_or_fn, *args):
+        async def _on_loop():
+            res = coro_or_fn(*args)
+            return await res if asyncio.iscoroutine(res) else res
+        return asyncio.run_coroutine_threadsafe(_on_loop(), loop).result(timeout)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, payload: Any, ctype: str = "application/json") -> None:
+            body = payload.encode("utf-8") if isinstance(payload, str) else \
+                json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _urls(self) -> Optional[List[str]]:
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                return None
+            urls = body.get("urls") if isinstance(body, dict) else body
+            return urls if isinstance(urls, list) else None
+
+        def do_GET(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path == "/health":
+                self._send(200, _call(service.status))
+            elif path == "/metrics":
+                self._send(200, METRICS.render_prometheus(), "text/plain; version=0.0.4; charset=utf-8")
+            elif path.startswith("/jobs/"):
+                job = _call(service.job, path.rsplit("/", 1)[-1])
+                self._send(200 if job else 404, job or {"error": "unknown job"})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path not in ("/scrape", "/jobs"):
+                self._send(404, {"error": "not found"})
+                return
+            urls = self._urls()
+            if urls is None:
+                self._send(400, {"error": 'expected JSON {"urls": [...]}'})
+                return
+            try:
+                if path == "/jobs":
+                    self._send(202, {"job_id": _call(service.submit, urls)})
+                else:
+                    self._send(200, _call(service.scrape, urls))
+            except BatchTooLarge as e:
+                self._send(413, {"error": str(e), "max_batch": e.max_batch, "urls": e.urls})
+            except Exception as e:
+                log("request_failed", "error", path=path, error=str(e))
+                self._send(500, {"error": str(e)})
+
+    return Handler
+
+
+async def serve(service: ScraperService, host: str = "127.0.0.1", port: int = 8765,
+                request_timeout: float = 600.0) -> None:
+    """Start the service, expose it over HTTP, and run until SIGINT/SIGTERM."""
+    loop = asyncio.get_running_loop()
+    await service.start()
+    httpd = ThreadingHTTPServer((host, port), _make_handler(service, loop, request_timeout))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, name="reddit-service-http", daemon=True).start()
+    log("service_listening", host=host, port=httpd.server_address[1])
+
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    try:
+        await stop.wait()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+        await service.aclose()
+        log("service_stopped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm-browser Reddit scraper service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=4, help="warm browser contexts/pages")
+    parser.add_argument("--http-concurrency", type=int, default=8)
+    parser.add_argument("--recycle-pages", type=int, default=50, help="replace a context after N URLs")
+    parser.add_argument("--recycle-mb", type=float, default=300.0, help="replace a context above M MB of JS heap")
+    parser.add_argument("--parser", default="auto", choices=["auto", "selectolax", "lxml", "bs4"])
+    parser.add_argument("--headful", action="store_true")
+    args = parser.parse_args()
+
+    svc = ScraperService(
+        pages=args.pages,
+        http_concurrency=args.http_concurrency,
+        headless=not args.headful,
+        parser=args.parser,
+        recycle_pages=args.recycle_pages or None,
+        recycle_mb=args.recycle_mb or None,
+    )
+    asyncio.run(serve(svc, args.host, args.port))
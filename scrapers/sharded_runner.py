@@ -0,0 +1,123 @@
+# scrapers/sharded_runner.py
+import asyncio
+import multiprocessing as mp
+import os
+import queue
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from common.metrics import log
+from common.rate_limiter import HostScheduler, set_scheduler
+from common.reddit_urls import canonical_post_urls
+from scrapers.reddit_scraper import stream_reddit_posts
+
+
+def _shard_worker(shard_id: int, urls: List[str], result_q, scrape_kwargs: Dict[str, Any], shards: int = 1) -> None:
+    """
+    Child-process entry point: one event loop, one lazily launched browser and
+    one HTTP client per process. Streams ("doc", ...) messages back as URLs
+    finish, then ("stats", ...) and ("done", ...).
+    The host scheduler is per process, so its rates are divided by `shards`.
+    """
+    set_scheduler(HostScheduler(shards=shards))
+
+    async def _run():
+        stats: Dict[str, Any] = {}
+        started = time.monotonic()
+        async for doc in stream_reddit_posts(urls, stats=stats, **scrape_kwargs):
+            result_q.put(("doc", shard_id, doc))
+        stats["elapsed_s"] = round(time.monotonic() - started, 2)
+        stats["pid"] = os.getpid()
+        result_q.put(("stats", shard_id, stats))
+
+    asyncio.run(_run())
+    result_q.put(("done", shard_id, None))
+
+
+def _split(urls: List[str], n: int) -> List[List[str]]:
+    size = -(-len(urls) // n)  # ceil
+    return [urls[i:i + size] for i in range(0, len(urls), size)]
+
+
+async def stream_sharded(
+    urls: List[str],
+    processes: Optional[int] = None,
+    max_restarts: int = 2,
+    stats: Optional[Dict[str, Any]] = None,
+    **scrape_kwargs,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Multi-process version of stream_reddit_posts.
+      - URL list is canonicalized / deduped per post and split into `processes` contiguous shards
+        (default: one per CPU core); each shard runs in its own process with
+        its own browser and HTTP client
+      - schema docs stream back to the parent as each URL finishes
+      - a worker that dies (non-zero exit) is restarted on the URLs of its
+        shard that have not come back yet, up to `max_restarts` times;
+        duplicate docs from the overlap are dropped
+      - `stats` (if given) gets per-worker stats and restart/failure counts
+    `scrape_kwargs` go to stream_reddit_posts and must be picklable.
+    """
+    links = canonical_post_urls(urls)
+    stats = stats if stats is not None else {}
+    stats.update({"workers": {}, "restarts": 0, "failed_shards": []})
+    if not links:
+        return
+
+    ctx = mp.get_context("spawn")  # fork + Playwright/asyncio state does not mix
+    result_q = ctx.Queue(maxsize=10_000)
+    shards = _split(links, max(1, processes or os.cpu_count() or 1))
+    seen: Dict[int, set] = {i: set() for i in range(len(shards))}
+    restarts: Dict[int, int] = {i: 0 for i in range(len(shards))}
+    procs: Dict[int, Any] = {}
+
+    def _start(shard_id: int, shard_urls: List[str]) -> None:
+        p = ctx.Process(target=_shard_worker, args=(shard_id, shard_urls, result_q, scrape_kwargs, len(shards)),
+                        daemon=True)
+        p.start()
+        procs[shard_id] = p
+
+    for i, shard in enumerate(shards):
+        _start(i, shard)
+    log("sharded_start", urls=len(links), workers=len(shards))
+
+    try:
+        while procs:
+            try:
+                kind, shard_id, payload = await asyncio.to_thread(result_q.get, True, 1.0)
+            except queue.Empty:
+                kind = None
+
+            if kind == "doc":
+                url = payload.get("url")
+                # a restarted shard may redo URLs whose docs were still queued
+                if url in seen[shard_id]:
+                    continue
+                seen[shard_id].add(url)
+                yield payload
+            elif kind == "stats":
+                stats["workers"][shard_id] = payload
+            elif kind == "done":
+                procs.pop(shard_id).join()
+
+            # a crashed worker never sends "done"; restart it on what is left
+            for shard_id, p in list(procs.items()):
+                if p.is_alive() or p.exitcode == 0:
+                    continue
+                procs.pop(shard_id)
+                left = [u for u in shards[shard_id] if u not in seen[shard_id]]
+                if not left:
+                    continue
+                if restarts[shard_id] >= max_restarts:
+                    log("shard_gave_up", "error", shard=shard_id, left=len(left), exitcode=p.exitcode)
+                    stats["failed_shards"].append({"shard": shard_id, "left": len(left), "exitcode": p.exitcode})
+                    continue
+                restarts[shard_id] += 1
+                stats["restarts"] += 1
+                log("shard_restart", "warn", shard=shard_id, left=len(left), exitcode=p.exitcode)
+                _start(shard_id, left)
+    finally:
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            p.join()
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# modules import each other as top-level packages (common.*, scrapers.*)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
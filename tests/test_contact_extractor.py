@@ -0,0 +1,55 @@
+# tests/test_contact_extractor.py
+import pytest
+
+from common.contact_extractor import ContactExtractor, extract_contacts
+
+
+@pytest.fixture
+def ex():
+    return ContactExtractor()
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("+14155552671", "+14155552671"),
+    ("+44 20 7946 0958", "+442079460958"),
+    ("(415) 555-2671", "4155552671"),
+    ("415-555-2671", "4155552671"),
+    ("415.555.2671", "4155552671"),
+    ("1-415-555-2671", "+14155552671"),
+    ("020-7946-0958", "02079460958"),
+])
+def test_phone_shapes_accepted(ex, raw, expected):
+    assert ex.normalize_phone(raw) == expected
+
+
+@pytest.mark.parametrize("raw", [
+    "123456789", "12345678", "1234567", "902101234",   # bare digit runs
+    "1.2.3.4", "10.15.7.2024",                         # versions
+    "94103-1234",                                      # ZIP+4
+    "123 456 789", "12 34 56 78",                      # space-separated runs
+    "123-456-789",                                     # order-number grouping
+    "2024-01-15", "192.168.1.1", "1712345678",         # date, IP, epoch
+    "555-555-5555".replace("5", "7"),                  # one repeated digit
+    "+1234567",                                        # too short for E.164
+])
+def test_non_phones_rejected(ex, raw):
+    assert ex.normalize_phone(raw) is None
+
+
+def test_default_country_code_applies_to_national_numbers():
+    ex = ContactExtractor(default_country_code="+44")
+    assert ex.normalize_phone("020-7946-0958") == "+442079460958"
+
+
+def test_extract_mixed_text():
+    text = ("Mail Bob@Example.COM. or see https://example.com/x). Call (415) 555-2671, "
+            "order 902101234, v1.2.3, zip 94103-1234, ref 12 34 56 78.")
+    out = extract_contacts(text)
+    assert out["emails"] == ["Bob@example.com"]
+    assert out["urls"] == ["https://example.com/x"]
+    assert out["phones"] == ["4155552671"]
+
+
+def test_extract_many_dedupes(ex):
+    out = ex.extract_many(["+1 415 555 2671", None, "+1-415-555-2671"])
+    assert out["phones"] == ["+14155552671"]
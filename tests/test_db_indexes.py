@@ -0,0 +1,59 @@
+# tests/test_db_indexes.py
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from common import db_utils
+
+
+class _Collection:
+    """Keeps index specs by name; refuses a second index on the same keys, like mongod."""
+
+    name = "reddit_leads"
+
+    def __init__(self, indexes=None):
+        self.indexes = dict(indexes or {})
+
+    def create_indexes(self, models):
+        for m in models:
+            spec = m.document
+            for name, info in self.indexes.items():
+                if list(info["key"]) == list(spec["key"].items()) and name != spec["name"]:
+                    raise OperationFailure("Index already exists with a different name", code=85)
+            self.indexes[spec["name"]] = {"key": list(spec["key"].items()),
+                                          **{k: v for k, v in spec.items() if k not in ("key", "name")}}
+        return [m.document["name"] for m in models]
+
+    def index_information(self):
+        return dict(self.indexes)
+
+    def drop_index(self, name):
+        del self.indexes[name]
+
+
+def test_conflicting_url_index_is_replaced():
+    coll = _Collection({"url_1": {"key": [("url", ASCENDING)]}})
+    db_utils._create_index(coll, IndexModel([("url", ASCENDING)], name="url_unique", unique=True))
+    assert "url_1" not in coll.indexes
+    assert coll.indexes["url_unique"]["unique"] is True
+
+
+def test_one_conflict_does_not_block_other_indexes(monkeypatch):
+    coll = _Collection({"url_1": {"key": [("url", ASCENDING)]}})
+
+    def _refuse(name):
+        raise OperationFailure("not authorized", code=13)
+
+    coll.drop_index = _refuse
+
+    class _DB(dict):
+        name = "test"
+
+    monkeypatch.setattr(db_utils, "MIGRATIONS", {})
+    monkeypatch.setattr(db_utils, "_INDEXED", set())
+    db_utils.ensure_indexes(_DB(reddit_leads=coll), "reddit_leads")
+    assert "url_1" in coll.indexes and "url_unique" not in coll.indexes
+    assert "post_id_1" in coll.indexes
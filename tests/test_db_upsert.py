@@ -0,0 +1,82 @@
+# tests/test_db_upsert.py
+import pytest
+
+pytest.importorskip("pymongo")
+
+from benchmarks.memory_db import MemoryDB
+from common.db_utils import add_leads, upsert_changed
+from common.fingerprint import content_hash
+
+DOC = {"post_id": "abc123", "url": "https://www.reddit.com/comments/abc123/",
+       "post": {"title": "Hiring", "body": "Need  a dev"}, "contact_info": {"emails": ["a@x.io", "b@x.io"]}}
+
+
+@pytest.fixture
+def coll():
+    return MemoryDB()["reddit_leads"]
+
+
+def test_content_hash_ignores_volatile_fields_order_and_whitespace():
+    same = {**DOC, "post": {"body": "Need a dev", "title": "Hiring"},
+            "contact_info": {"emails": ["b@x.io", "a@x.io"]}, "scraped_at": "x", "last_checked_at": "y"}
+    assert content_hash(same) == content_hash(DOC)
+    assert content_hash({**DOC, "post": {"title": "Hiring!"}}) != content_hash(DOC)
+
+
+def test_first_insert_sets_scraped_at_on_insert(coll):
+    assert upsert_changed(coll, [DOC], key="post_id", platform="reddit") == \
+        {"inserted": 1, "changed": 0, "unchanged": 0}
+    (stored,) = coll.docs
+    assert stored["platform"] == "reddit"
+    assert stored["content_hash"] == content_hash({**DOC, "platform": "reddit"})
+    assert stored["scraped_at"] == stored["updated_at"] == stored["last_checked_at"]
+
+
+def test_same_content_only_touches_last_checked_at(coll):
+    upsert_changed(coll, [DOC], key="post_id")
+    before = dict(coll.docs[0])
+    writes = coll.ops["bulk_write"]
+    assert upsert_changed(coll, [dict(DOC)], key="post_id") == {"inserted": 0, "changed": 0, "unchanged": 1}
+    after = coll.docs[0]
+    assert coll.ops["bulk_write"] == writes and coll.ops["update_many"] == 1
+    assert after["last_checked_at"] >= before["last_checked_at"]
+    assert {k: v for k, v in after.items() if k != "last_checked_at"} == \
+           {k: v for k, v in before.items() if k != "last_checked_at"}
+
+
+def test_touch_unchanged_false_writes_nothing(coll):
+    upsert_changed(coll, [DOC], key="post_id")
+    upsert_changed(coll, [DOC], key="post_id", touch_unchanged=False)
+    assert coll.ops["update_many"] == 0
+
+
+def test_changed_field_is_rewritten_and_keeps_scraped_at(coll):
+    upsert_changed(coll, [DOC], key="post_id")
+    first_seen = coll.docs[0]["scraped_at"]
+    changed = {**DOC, "post": {"title": "Hiring (filled)", "body": "Need a dev"}, "scraped_at": "ignored"}
+    assert upsert_changed(coll, [changed], key="post_id") == {"inserted": 0, "changed": 1, "unchanged": 0}
+    (stored,) = coll.docs
+    assert stored["post"]["title"] == "Hiring (filled)"
+    assert stored["scraped_at"] == first_seen
+    assert stored["content_hash"] == content_hash(changed)
+
+
+def test_mixed_batch_counts_and_last_duplicate_wins(coll):
+    upsert_changed(coll, [DOC, {**DOC, "post_id": "zzz999"}], key="post_id")
+    batch = [DOC, {**DOC, "post_id": "zzz999", "url": "u2"}, {**DOC, "post_id": "new111"},
+             {**DOC, "post_id": "new111", "url": "last"}]
+    assert upsert_changed(coll, batch, key="post_id") == {"inserted": 1, "changed": 1, "unchanged": 1}
+    assert [d["url"] for d in coll.docs if d["post_id"] == "new111"] == ["last"]
+
+
+def test_doc_without_key_is_skipped(coll):
+    docs = [{k: v for k, v in DOC.items() if k != "post_id"}, {**DOC, "post_id": ""}]
+    assert upsert_changed(coll, docs, key="post_id") == {"inserted": 0, "changed": 0, "unchanged": 0}
+    assert coll.docs == []
+
+
+def test_add_leads_skips_urls_without_post_id():
+    db = MemoryDB()
+    res = add_leads(db, [DOC, {"url": "https://example.com/x"}, {"title": "no url"}], "reddit")
+    assert (res["inserted"], res["skipped"]) == (1, 2)
+    assert add_leads(db, [DOC], "reddit")["unchanged"] == 1
@@ -0,0 +1,80 @@
+# tests/test_frontier.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from common.frontier import Frontier
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    f = Frontier(str(tmp_path / "frontier.sqlite"), max_attempts=3)
+    yield f
+    f.close()
+
+
+def test_enqueue_canonicalizes_variants(frontier):
+    added = frontier.enqueue([
+        "https://old.reddit.com/r/python/comments/abc123/some_title/?utm_source=x",
+        "https://www.reddit.com/r/Python/comments/abc123/",
+        "https://redd.it/abc123",
+    ])
+    assert added == 1
+    assert frontier.stats()["pending"] == 1
+
+
+def test_failed_url_not_reoffered_in_same_drain(frontier):
+    frontier.enqueue(["https://www.reddit.com/comments/aaaa1/", "https://www.reddit.com/comments/bbbb2/"])
+    seen = []
+    for url in frontier.drain(batch_size=1):
+        seen.append(url)
+        if "aaaa1" in url:
+            frontier.mark_failed(url, "boom")
+        else:
+            frontier.mark_done(url)
+    assert len(seen) == 2
+    stats = frontier.stats()
+    assert stats["in_flight"] == 0
+    assert stats["pending"] == 1 and stats["done"] == 1
+    # a new session retries it
+    assert len(list(frontier.drain())) == 1
+
+
+def test_release_keeps_attempt_count(frontier):
+    frontier.enqueue(["https://www.reddit.com/comments/cccc3/"])
+    (url,) = frontier.claim(10, "run-a")
+    frontier.release(url)
+    assert frontier.claim(10, "run-a") == []
+    assert frontier.stats()["pending"] == 1
+    (row,) = frontier._conn.execute("SELECT attempts FROM frontier").fetchall()
+    assert row[0] == 0
+
+
+def test_adrain_and_async_marks(frontier):
+    frontier.enqueue(["https://www.reddit.com/comments/dddd4/", "https://www.reddit.com/comments/eeee5/"])
+
+    async def run():
+        urls = [u async for u in frontier.adrain()]
+        await frontier.amark_done_many(urls[:1])
+        await frontier.arelease(urls[1])
+        return urls
+
+    assert len(asyncio.run(run())) == 2
+    stats = frontier.stats()
+    assert stats["done"] == 1 and stats["pending"] == 1 and stats["in_flight"] == 0
+
+
+def test_migrates_frontier_without_run_id(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE frontier (url TEXT PRIMARY KEY, state TEXT NOT NULL DEFAULT 'pending', "
+        "attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, updated_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO frontier (url, state, updated_at) VALUES ('https://www.reddit.com/comments/ffff6/', 'in_flight', 0)")
+    conn.commit()
+    conn.close()
+    f = Frontier(path)
+    assert list(f.drain()) == ["https://www.reddit.com/comments/ffff6/"]
+    f.close()
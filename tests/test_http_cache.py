@@ -0,0 +1,90 @@
+# tests/test_http_cache.py
+import pytest
+
+pytest.importorskip("httpx")
+
+from common.http_cache import ResponseCache, cache_key, cached_get
+
+
+class _Resp:
+    def __init__(self, url, status, body=b"", headers=None):
+        self.url = url
+        self.status_code = status
+        self.content = body
+        self.headers = headers or {}
+
+
+class _Session:
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls.append((url, dict(headers or {})))
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    c = ResponseCache(str(tmp_path / "cache.sqlite"), ttl_seconds=3600)
+    yield c
+    c.close()
+
+
+def test_cache_key_ignores_query_order_and_fragment():
+    assert cache_key("https://A.com/p?b=2&a=1#x") == cache_key("https://a.com/p?a=1&b=2")
+
+
+def test_put_get_roundtrip(cache):
+    cache.put("https://x.com/a", 200, {"ETag": '"v1"', "Content-Length": "3"}, b"abc")
+    entry = cache.get("https://x.com/a")
+    assert entry["body"] == b"abc" and entry["fresh"] and entry["etag"] == '"v1"'
+    assert "content-length" not in entry["headers"]
+
+
+def test_uncacheable_status_not_stored(cache):
+    cache.put("https://x.com/a", 500, {}, b"err")
+    assert cache.get("https://x.com/a") is None
+
+
+def test_byte_total_tracks_replacements_and_evicts_lru(tmp_path):
+    c = ResponseCache(str(tmp_path / "c.sqlite"), max_bytes=10)
+    c.put("https://x.com/1", 200, {}, b"aaaa")
+    c.put("https://x.com/1", 200, {}, b"aaaaa")  # replaced, not added
+    assert c.stats()["bytes"] == 5
+    c.put("https://x.com/2", 200, {}, b"bbbb")
+    c.get("https://x.com/1")  # 1 is now more recently used than 2
+    c.put("https://x.com/3", 200, {}, b"cccc")
+    assert c.get("https://x.com/2") is None
+    assert c.get("https://x.com/1") is not None
+    assert c.stats()["bytes"] <= 10
+    c.close()
+    # the running total is rebuilt from disk on reopen
+    assert ResponseCache(str(tmp_path / "c.sqlite"), max_bytes=10).stats()["bytes"] == 9
+
+
+def test_cached_get_serves_fresh_hit_without_request(cache):
+    cache.put("https://x.com/a", 200, {}, b"cached")
+    session = _Session()
+    resp = cached_get(session, "https://x.com/a", cache)
+    assert resp.text == "cached" and session.calls == []
+
+
+def test_cached_get_revalidates_stale_entry(tmp_path):
+    c = ResponseCache(str(tmp_path / "c.sqlite"), ttl_seconds=0)
+    c.put("https://x.com/a", 200, {"etag": '"v1"'}, b"old")
+    session = _Session(_Resp("https://x.com/a", 304))
+    resp = cached_get(session, "https://x.com/a", c)
+    assert resp.content == b"old" and c.revalidated == 1
+    assert session.calls[0][1] == {"If-None-Match": '"v1"'}
+    c.close()
+
+
+def test_replay_mode_never_hits_network(tmp_path):
+    path = str(tmp_path / "c.sqlite")
+    ResponseCache(path).put("https://x.com/a", 200, {}, b"a")
+    replay = ResponseCache(path, ttl_seconds=0, mode="replay")
+    session = _Session()
+    assert cached_get(session, "https://x.com/a", replay).content == b"a"
+    assert cached_get(session, "https://x.com/missing", replay).status_code == 504
+    assert session.calls == []
@@ -0,0 +1,111 @@
+# tests/test_listing_cursors.py
+import asyncio
+import sqlite3
+
+import pytest
+
+from common.listing_cursors import ListingCursors
+
+
+@pytest.fixture
+def cursors(tmp_path):
+    c = ListingCursors(str(tmp_path / "cursors.sqlite"))
+    yield c
+    c.close()
+
+
+def test_set_only_moves_forward(cursors):
+    cursors.set("Python", "new", "b", 200)
+    cursors.set("python", "new", "a", 100)
+    row = cursors.get("python", "new")
+    assert (row["post_id"], row["created_utc"]) == ("b", 200)
+
+
+def test_resume_keeps_watermark_until_walk_completes(cursors):
+    cursors.set("python", "new", "old", 100)
+    cursors.set_resume("python", "new", "t3_zz", "n1", 500)
+    cursors.set_resume("python", "new", "t3_yy", "n0", 400)  # later cursor, older newest
+    row = cursors.get("python", "new")
+    assert row["post_id"] == "old" and row["created_utc"] == 100
+    assert row["resume_after"] == "t3_yy"
+    assert (row["pending_post_id"], row["pending_created_utc"]) == ("n1", 500)
+    cursors.set("python", "new", "n1", 500)
+    row = cursors.get("python", "new")
+    assert row["post_id"] == "n1" and row["resume_after"] is None and row["pending_post_id"] is None
+
+
+def test_first_walk_cut_short_has_no_watermark(cursors):
+    cursors.set_resume("python", "new", "t3_zz", "n1", 500)
+    row = cursors.get("python", "new")
+    assert row["post_id"] is None and row["created_utc"] is None and row["resume_after"] == "t3_zz"
+
+
+def test_migrates_cursor_file_without_resume_columns(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE listing_cursors (subreddit TEXT NOT NULL, sort TEXT NOT NULL, post_id TEXT NOT NULL, "
+                 "created_utc REAL NOT NULL, updated_at REAL NOT NULL, PRIMARY KEY (subreddit, sort))")
+    conn.execute("INSERT INTO listing_cursors VALUES ('python', 'new', 'abc', 100, 0)")
+    conn.commit()
+    conn.close()
+    c = ListingCursors(path)
+    assert c.get("python", "new")["resume_after"] is None
+    c.close()
+
+
+# ---- iter_listing against a fake client ----
+
+class _Resp:
+    status_code = 200
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class _Client:
+    """Serves a fixed newest-first listing, `page_size` posts per page."""
+
+    def __init__(self, ids, page_size=2):
+        self.ids = ids
+        self.page_size = page_size
+        self.calls = []
+
+    async def get(self, url, params=None, headers=None):
+        after = (params or {}).get("after")
+        self.calls.append(after)
+        start = self.ids.index(after[3:]) + 1 if after else 0
+        chunk = self.ids[start:start + self.page_size]
+        children = [{"kind": "t3", "data": {"id": i, "created_utc": 1000 - n - start, "subreddit": "python",
+                                            "permalink": f"/r/python/comments/{i}/x/"}}
+                    for n, i in enumerate(chunk)]
+        more = start + self.page_size < len(self.ids)
+        return _Resp({"data": {"children": children, "after": f"t3_{chunk[-1]}" if chunk and more else None}})
+
+
+def _walk(client, **kwargs):
+    listing = pytest.importorskip("scraper_types.reddit_scraper_listing")
+
+    async def run():
+        walk = {}
+        posts = [p["post_id"] async for p in listing.iter_listing(client, "python", "new", walk=walk, **kwargs)]
+        return posts, walk
+
+    return asyncio.run(run())
+
+
+def test_walk_cut_short_reports_resume_cursor():
+    client = _Client(["p6", "p5", "p4", "p3", "p2", "p1"])
+    posts, walk = _walk(client, since={"post_id": "p1", "created_utc": 995}, max_pages=2)
+    assert posts == ["p6", "p5", "p4", "p3"]
+    assert walk == {"complete": False, "after": "t3_p3"}
+    # resuming reaches the watermark
+    posts, walk = _walk(client, since={"post_id": "p1", "created_utc": 995}, max_pages=2, after="t3_p3")
+    assert posts == ["p2"] and walk["complete"] is True
+
+
+def test_walk_to_end_of_listing_is_complete():
+    posts, walk = _walk(_Client(["p2", "p1"]), max_pages=5)
+    assert posts == ["p2", "p1"] and walk["complete"] is True
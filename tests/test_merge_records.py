@@ -0,0 +1,31 @@
+# tests/test_merge_records.py
+import pytest
+
+scraper = pytest.importorskip("scrapers.reddit_scraper")
+
+JSON_TIER = [
+    {"reddit_link": "https://www.reddit.com/comments/abc123/", "title": "Hiring", "author": None,
+     "emails": ["a@x.io"]},
+    {"reddit_link": "https://www.reddit.com/comments/zzz999/", "error": "HTTP 403"},
+]
+BS4_TIER = [
+    {"reddit_link": "https://old.reddit.com/r/x/comments/abc123/t/", "title": "other", "author": "bob",
+     "content": "call +1 415 555 2671", "emails": ["b@x.io", "a@x.io"]},
+    {"reddit_link": "https://www.reddit.com/comments/zzz999/", "title": "Found", "author": "amy"},
+]
+
+
+def test_variants_merge_and_first_scalar_wins():
+    (a, z) = scraper._merge_records(JSON_TIER, BS4_TIER)
+    assert a["post_id"] == "abc123" and a["reddit_link"] == JSON_TIER[0]["reddit_link"]
+    assert (a["title"], a["author"]) == ("Hiring", "bob")
+    assert a["emails"] == ["a@x.io", "b@x.io"] and a["phones"] == ["+14155552671"]
+    assert "error" not in z and z["title"] == "Found"
+
+
+def test_running_merge_matches_full_merge():
+    merged = {}
+    for tier in (JSON_TIER, BS4_TIER):
+        for key in scraper._merge_into(merged, tier):
+            scraper._finish_merged(merged[key])
+    assert list(merged.values()) == scraper._merge_records(JSON_TIER, BS4_TIER)
@@ -0,0 +1,72 @@
+# tests/test_output_sinks.py
+import gzip
+import json
+
+import pytest
+
+from common.output_sinks import EXTRA_COLUMN, JSONArraySink, flatten_doc, open_sink, write_records
+
+DOCS = [{"url": f"u{i}", "post": {"title": f"t{i}"}, "tags": ["a"]} for i in range(5)]
+
+
+def test_flatten_doc():
+    assert flatten_doc({"a": {"b": 1, "c": {}}, "d": [1]}) == {"a.b": 1, "a.c": None, "d": [1]}
+
+
+def test_ndjson_gzip_roundtrip(tmp_path):
+    (path,) = write_records(str(tmp_path / "out.ndjson.gz"), DOCS)
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert [json.loads(l) for l in f] == DOCS
+
+
+def test_json_array_and_no_part_files_left(tmp_path):
+    files = write_records(str(tmp_path / "out.json"), DOCS)
+    assert json.load(open(files[0], encoding="utf-8")) == DOCS
+    assert not list(tmp_path.glob("*.part"))
+
+
+def test_size_rotation_numbers_parts(tmp_path):
+    with JSONArraySink(str(tmp_path / "out.json"), rotate_bytes=50) as sink:
+        sink.write_many(DOCS)
+    assert len(sink.files) == len(DOCS)
+    assert sum(len(json.load(open(f, encoding="utf-8"))) for f in sink.files) == len(DOCS)
+
+
+def test_unknown_extension(tmp_path):
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out.csv"))
+
+
+def test_json_sinks_ignore_parquet_schema(tmp_path):
+    files = write_records(str(tmp_path / "out.jsonl"), DOCS, schema={"url": ""}, types={"x": "int64"})
+    assert len(files) == 1
+
+
+def _read_parquet(files):
+    pq = pytest.importorskip("pyarrow.parquet")
+    tables = [pq.read_table(f) for f in files]
+    assert len({t.schema for t in tables}) == 1
+    return [row for t in tables for row in t.to_pylist()]
+
+
+def test_parquet_null_column_is_promoted_not_split(tmp_path):
+    pytest.importorskip("pyarrow")
+    docs = [{"url": "a", "score": None}, {"url": "b", "score": None},
+            {"url": "c", "score": 7}, {"url": "d", "score": "n/a", "new_field": 1}]
+    files = write_records(str(tmp_path / "out.parquet"), docs, row_group_size=2)
+    assert len(files) == 1
+    rows = _read_parquet(files)
+    assert [r["score"] for r in rows] == [None, None, "7", "n/a"]
+    assert json.loads(rows[3][EXTRA_COLUMN]) == {"new_field": 1}
+
+
+def test_parquet_template_schema(tmp_path):
+    pytest.importorskip("pyarrow")
+    template = {"url": "", "engagement": {"num_upvotes": None}, "contact": {"emails": []}}
+    types = {"engagement.num_upvotes": "int64", "content_hash": "string"}
+    docs = [{"url": "a", "engagement": {"num_upvotes": None}, "contact": {"emails": []}},
+            {"url": "b", "engagement": {"num_upvotes": "12"}, "contact": {"emails": ["x@y.io"]}, "content_hash": "h"}]
+    files = write_records(str(tmp_path / "out.parquet"), docs, row_group_size=1, schema=template, types=types)
+    rows = _read_parquet(files)
+    assert rows[1]["engagement.num_upvotes"] == 12 and rows[1]["contact.emails"] == ["x@y.io"]
+    assert rows[1]["content_hash"] == "h" and rows[0][EXTRA_COLUMN] is None
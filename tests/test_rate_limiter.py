@@ -0,0 +1,72 @@
+# tests/test_rate_limiter.py
+import pytest
+
+pytest.importorskip("httpx")
+
+from common.rate_limiter import HostScheduler, parse_retry_after, request_kind
+
+URL = "https://www.reddit.com/r/python/comments/abc123/"
+
+
+def _rate(s, url=URL):
+    return s._state(url).rate
+
+
+def test_request_kind():
+    assert request_kind("https://www.reddit.com/r/python/about.json") == "json"
+    assert request_kind(URL) == "html"
+
+
+def test_single_slow_sample_does_not_cut_rate():
+    s = HostScheduler(initial_rate=4.0, increase=0.0, latency_strikes=3)
+    for _ in range(5):
+        s.record(URL, 200, 0.1)
+    s.record(URL, 200, 5.0)
+    assert _rate(s) == 4.0
+
+
+def test_sustained_inflation_cuts_rate():
+    s = HostScheduler(initial_rate=4.0, increase=0.0, latency_strikes=3)
+    for _ in range(5):
+        s.record(URL, 200, 0.1)
+    for _ in range(6):
+        s.record(URL, 200, 5.0)
+    assert _rate(s) < 4.0
+
+
+def test_kinds_have_separate_baselines():
+    s = HostScheduler(initial_rate=4.0, increase=0.0, latency_strikes=1)
+    for _ in range(5):
+        s.record(URL, 200, 0.05, kind="json")
+    # page loads are slower than API calls, but not inflated against their own baseline
+    for _ in range(5):
+        s.record(URL, 200, 1.5, kind="nav")
+    assert _rate(s) == 4.0
+
+
+def test_baseline_drifts_up():
+    s = HostScheduler(baseline_drift=0.5)
+    s.record(URL, 200, 0.1)
+    for _ in range(20):
+        s.record(URL, 200, 0.3)
+    lat = s._state(URL).latency["html"]
+    assert lat.baseline > 0.2
+
+
+def test_errors_back_off_and_pause():
+    s = HostScheduler(initial_rate=4.0)
+    s.record(URL, 429, retry_after=30)
+    st = s._state(URL)
+    assert st.rate == 2.0 and st.tokens == 0.0
+    assert s.stats()["www.reddit.com"]["paused_s"] > 25
+
+
+def test_shards_divide_rates():
+    s = HostScheduler(initial_rate=4.0, max_rate=50.0, shards=4)
+    assert s.initial_rate == 1.0 and s.max_rate == 12.5
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
@@ -0,0 +1,124 @@
+# tests/test_reddit_comments.py
+import asyncio
+
+import pytest
+
+comments = pytest.importorskip("scraper_types.reddit_scraper_comments")
+
+LINK = "https://www.reddit.com/comments/post1/"
+
+
+def _t1(cid, parent, replies=(), body=""):
+    data = {"id": cid, "parent_id": parent, "author": "u", "body": body, "score": 1}
+    if replies:
+        data["replies"] = {"kind": "Listing", "data": {"children": list(replies)}}
+    return {"kind": "t1", "data": data}
+
+
+def _more(parent, children=()):
+    return {"kind": "more", "data": {"parent_id": parent, "children": list(children), "count": len(children)}}
+
+
+def _page(children):
+    post = {"kind": "Listing", "data": {"children": [{"kind": "t3", "data": {"id": "post1"}}]}}
+    return [post, {"kind": "Listing", "data": {"children": list(children)}}]
+
+
+def _chain(ids, parent="t3_post1"):
+    """c0 -> c1 -> c2 ... one reply per level."""
+    node = None
+    for cid, par in reversed(list(zip(ids, [parent] + [f"t1_{i}" for i in ids[:-1]]))):
+        node = _t1(cid, par, [node] if node else ())
+    return node
+
+
+class _Resp:
+    status_code = 200
+    request = None
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def json(self):
+        return self.payload
+
+
+class _Client:
+    """Canned payloads by URL; morechildren answers with one t1 per requested id."""
+
+    def __init__(self, pages, more_parent="t3_post1"):
+        self.pages = pages
+        self.more_parent = more_parent
+        self.calls = []
+
+    async def get(self, url, params=None, headers=None):
+        self.calls.append((url, dict(params or {})))
+        if url == comments.MORECHILDREN_URL:
+            ids = params["children"].split(",")
+            things = [_t1(i, self.more_parent) for i in ids]
+            return _Resp({"json": {"data": {"things": things}}})
+        return _Resp(self.pages[url.split("?")[0]])
+
+
+def _collect(client, **kwargs):
+    async def run():
+        return [c async for c in comments.stream_comments(client, LINK, **kwargs)]
+    return asyncio.run(run())
+
+
+FIRST = "https://www.reddit.com/comments/post1.json"
+
+
+def test_depth_cap_skips_deeper_comments():
+    client = _Client({FIRST: _page([_chain(["a", "b", "c", "d", "e"])])})
+    out = _collect(client, max_depth=2)
+    assert [(c["id"], c["depth"]) for c in out] == [("a", 0), ("b", 1), ("c", 2)]
+    assert client.calls[0][1]["depth"] == 3
+
+
+def test_total_count_cap_is_exact():
+    client = _Client({FIRST: _page([_t1(f"c{i}", "t3_post1") for i in range(30)])})
+    assert len(_collect(client, max_comments=10)) == 10
+
+
+def test_morechildren_ids_are_batched_by_100():
+    ids = [f"m{i}" for i in range(250)]
+    client = _Client({FIRST: _page([_t1("top", "t3_post1"), _more("t3_post1", ids)])})
+    out = _collect(client, max_comments=1000)
+    batches = [len(p["children"].split(",")) for u, p in client.calls if u == comments.MORECHILDREN_URL]
+    assert batches == [100, 100, 50]
+    assert [c["id"] for c in out] == ["top"] + ids
+    assert all(c["depth"] == 0 for c in out)
+
+
+def test_more_queue_is_bounded_by_max_comments():
+    ids = [f"m{i}" for i in range(500)]
+    client = _Client({FIRST: _page([_more("t3_post1", ids)])})
+    out = _collect(client, max_comments=120)
+    batches = [len(p["children"].split(",")) for u, p in client.calls if u == comments.MORECHILDREN_URL]
+    assert len(out) == 120 and sum(batches) == 120
+
+
+def test_continue_thread_refetches_subthread_at_depth():
+    deep_stub = {"kind": "more", "data": {"parent_id": "t1_b", "children": [], "count": 0}}
+    first = _page([_t1("a", "t3_post1", [_t1("b", "t1_a", [deep_stub])])])
+    sub = _page([_t1("b", "t1_a", [_t1("c", "t1_b", [_t1("d", "t1_c")])])])
+    client = _Client({FIRST: first, "https://www.reddit.com/comments/post1/_/b.json": sub})
+    out = _collect(client, max_depth=3)
+    assert [(c["id"], c["depth"]) for c in out] == [("a", 0), ("b", 1), ("c", 2), ("d", 3)]
+
+
+def test_continue_thread_respects_depth_cap_and_is_fetched_once():
+    stub = {"kind": "more", "data": {"parent_id": "t1_b", "children": [], "count": 0}}
+    first = _page([_t1("a", "t3_post1", [_t1("b", "t1_a", [stub, stub])])])
+    sub = _page([_t1("b", "t1_a", [_t1("c", "t1_b", [_t1("d", "t1_c")])])])
+    client = _Client({FIRST: first, "https://www.reddit.com/comments/post1/_/b.json": sub})
+    out = _collect(client, max_depth=2)
+    assert [c["id"] for c in out] == ["a", "b", "c"]
+    assert sum(1 for u, _ in client.calls if u.split("?")[0].endswith("/b.json")) == 1
+
+
+def test_comment_contacts_are_extracted():
+    client = _Client({FIRST: _page([_t1("a", "t3_post1", body="mail me: dev@example.com")])})
+    (c,) = _collect(client)
+    assert c["emails"] == ["dev@example.com"]
@@ -0,0 +1,62 @@
+# tests/test_reddit_urls.py
+import pytest
+
+from common import reddit_urls
+from common.reddit_urls import (
+    canonical_post_urls, canonicalize, first_seen, iter_canonical, parse_post_url, post_key, register_post_host,
+)
+
+CANON = "https://www.reddit.com/comments/abc123/"
+
+
+@pytest.mark.parametrize("url", [
+    "https://www.reddit.com/r/Python/comments/abc123/some_title/",
+    "https://old.reddit.com/r/python/comments/ABC123/some_title/def456/?utm_source=share",
+    "http://reddit.com/comments/abc123",
+    "https://np.reddit.com/r/python/comments/abc123.json",
+    "https://www.reddit.com/gallery/abc123",
+    "https://redd.it/abc123",
+    "  https://m.reddit.com/u/someone/comments/abc123/x/  ",
+])
+def test_every_variant_maps_to_one_form(url):
+    assert canonicalize(url) == ("abc123", CANON)
+
+
+def test_parse_keeps_subreddit():
+    assert parse_post_url("https://www.reddit.com/r/Python/comments/abc123/") == ("abc123", "python")
+    assert parse_post_url("https://redd.it/abc123") == ("abc123", None)
+
+
+@pytest.mark.parametrize("url", [
+    "https://example.com/comments/abc123/",       # not reddit, not registered
+    "https://i.redd.it/abc123.jpg",               # media host
+    "https://www.reddit.com/r/python/s/AbCdEf12",  # share link
+    "https://www.reddit.com/r/python/",
+    "",
+])
+def test_non_posts_have_no_id(url):
+    assert parse_post_url(url)[0] is None
+
+
+def test_non_post_reddit_urls_are_normalized_and_others_kept():
+    assert canonicalize("https://old.reddit.com/r/python?x=1") == (None, "https://www.reddit.com/r/python/")
+    assert canonicalize("https://example.com/a?b=1") == (None, "https://example.com/a?b=1")
+
+
+def test_registered_host_parses_but_is_not_rewritten(monkeypatch):
+    monkeypatch.setattr(reddit_urls, "_EXTRA_POST_HOSTS", set())
+    url = "http://127.0.0.1:8080/reddit/r/python/comments/abc123/slug/"
+    assert post_key(url) == url
+    register_post_host("127.0.0.1")
+    assert canonicalize(url) == ("abc123", url)
+    assert post_key(url) == "abc123"
+
+
+def test_dedupe_helpers():
+    urls = ["https://redd.it/abc123", "https://www.reddit.com/r/x/comments/abc123/t/", "",
+            "https://www.reddit.com/comments/zzz999/"]
+    assert canonical_post_urls(urls) == [CANON, "https://www.reddit.com/comments/zzz999/"]
+    seen = set()
+    assert list(iter_canonical(urls, seen)) == [CANON, "https://www.reddit.com/comments/zzz999/"]
+    assert first_seen("https://old.reddit.com/comments/abc123", seen) is None
+    assert first_seen("   ", seen) is None
@@ -0,0 +1,67 @@
+# tests/test_request_router.py
+import asyncio
+
+from common.request_router import ResourceRouter
+
+
+class _Frame:
+    def __init__(self, parent=None):
+        self.parent_frame = parent
+
+
+class _Request:
+    def __init__(self, url, resource_type, frame=None, navigation=True):
+        self.url = url
+        self.resource_type = resource_type
+        self.frame = frame or _Frame()
+        self._navigation = navigation
+
+    def is_navigation_request(self):
+        return self._navigation
+
+
+class _Route:
+    def __init__(self, request, fail_abort=False):
+        self.request = request
+        self.fail_abort = fail_abort
+        self.outcome = None
+
+    async def abort(self):
+        if self.fail_abort:
+            raise RuntimeError("boom")
+        self.outcome = "abort"
+
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+def _route(router, request, **kw):
+    route = _Route(request, **kw)
+    asyncio.run(router._handle(route))
+    return route.outcome
+
+
+def test_main_frame_document_always_allowed():
+    router = ResourceRouter(allow_domains=["reddit.com"])
+    assert _route(router, _Request("https://www.reddit.com/r/x/", "document")) == "continue"
+
+
+def test_iframe_document_from_denied_domain_blocked():
+    router = ResourceRouter(allow_domains=["reddit.com"])
+    iframe = _Request("https://ad.doubleclick.net/frame", "document", frame=_Frame(parent=_Frame()))
+    assert _route(router, iframe) == "abort"
+    other = _Request("https://embed.example.com/", "document", frame=_Frame(parent=_Frame()))
+    assert _route(router, other) == "abort"
+
+
+def test_sub_resources_follow_type_and_domain_rules():
+    router = ResourceRouter(allow_domains=["reddit.com"])
+    assert router.should_block("https://www.reddit.com/a.png", "image")
+    assert not router.should_block("https://www.reddit.com/api/x", "xhr")
+    assert router.should_block("https://google-analytics.com/c", "script")
+
+
+def test_error_while_routing_falls_back_to_continue():
+    router = ResourceRouter()
+    req = _Request("https://www.reddit.com/a.png", "image", navigation=False)
+    assert _route(router, req, fail_abort=True) == "continue"
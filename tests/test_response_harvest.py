@@ -0,0 +1,30 @@
+# tests/test_response_harvest.py
+from scraper_types.reddit_response_harvest import ResponseHarvester, fill_missing
+
+URL = "https://www.reddit.com/r/python/comments/abc123/title/"
+
+
+def test_link_post_without_body_needs_no_dom_fallback():
+    h = ResponseHarvester(URL)
+    payload = {"data": {"children": [{"kind": "t3", "data": {
+        "id": "abc123", "title": "A link", "author": "bob", "subreddit": "python", "selftext": "",
+        "url_overridden_by_dest": "https://example.com/x", "score": 3}}]}}
+    assert h.ingest(payload)
+    assert h.missing() == []
+    fields = h.fields()
+    assert fields["subreddit"] == "r/python" and fields["hrefs"] == ["https://example.com/x"]
+    assert "content_lines" not in fields
+
+
+def test_missing_key_field_and_fill_from_dom():
+    h = ResponseHarvester(URL)
+    h.ingest({"t3_abc123": {"title": "T", "selftext": "line one\n\nline two"}})
+    assert h.missing() == ["author", "subreddit"]
+    merged = fill_missing(h.fields(), {"author": "alice", "subreddit": "r/python", "content_lines": ["dom"],
+                                       "hrefs": ["https://a"]})
+    assert merged["author"] == "alice" and merged["content_lines"] == ["line one", "line two"]
+
+
+def test_other_posts_are_ignored():
+    h = ResponseHarvester(URL)
+    assert not h.ingest({"id": "zzz999", "title": "other"})
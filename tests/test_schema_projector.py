@@ -0,0 +1,44 @@
+# tests/test_schema_projector.py
+import pytest
+
+from common.schema_projector import compile_schema
+
+SCHEMA = {"url": "", "post": {"title": "", "tags": []}, "contact": {"emails": []}}
+
+
+def test_projects_nested_with_aliases():
+    proj = compile_schema(SCHEMA, {"post.title": ["title", "post.title"], "contact.emails": ["emails", "more.emails"]})
+    out = proj.project({"url": "u", "title": "T", "emails": ["a@x.io"], "more": {"emails": ["a@x.io", "b@x.io"]},
+                        "extra": 1})
+    assert out == {"url": "u", "post": {"title": "T", "tags": None}, "contact": {"emails": ["a@x.io", "b@x.io"]}}
+
+
+def test_fill_missing_false_omits_missing_leaves():
+    proj = compile_schema(SCHEMA, fill_missing=False)
+    assert proj.project({"post": {"title": "T"}}) == {"post": {"title": "T"}}
+
+
+def test_use_defaults_and_constant_alias():
+    proj = compile_schema(SCHEMA, {"url": []}, use_defaults=True)
+    out = proj.project({"url": "ignored"})
+    assert out["url"] == "" and out["post"]["tags"] == []
+
+
+def test_scalar_conflict_becomes_list_and_project_many_drops_non_dicts():
+    proj = compile_schema({"a": ""}, {"a": ["x", "y"]})
+    assert proj.project_many([{"x": 1, "y": 2}, "junk", {"x": 1, "y": 1}]) == [{"a": [1, 2]}, {"a": 1}]
+
+
+def test_get_projector_cache_is_keyed_on_content_and_bounded():
+    db_utils = pytest.importorskip("common.db_utils")
+    a = db_utils.get_projector(SCHEMA, {"post.title": ["title"]})
+    # an equal alias built fresh per call hits the same entry
+    assert db_utils.get_projector(dict(SCHEMA), {"post.title": ["title"]}) is a
+    # a mutated alias gets its own projector
+    alias = {"post.title": ["title"]}
+    db_utils.get_projector(SCHEMA, alias)
+    alias["post.title"] = ["headline"]
+    assert db_utils.get_projector(SCHEMA, alias).project({"headline": "H"})["post"]["title"] == "H"
+    for i in range(db_utils._PROJECTORS_MAX * 2):
+        db_utils.get_projector(SCHEMA, {"url": [f"u{i}"]})
+    assert len(db_utils._PROJECTORS) == db_utils._PROJECTORS_MAX